@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
 
 application = get_asgi_application()
+
+# startup timings and optional warmup (dashboard.startup)
+from dashboard import startup  # noqa: E402
+
+startup.install()
@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/5.2/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
+import copy
 import os
 
 from pathlib import Path
@@ -25,7 +26,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = "django-insecure-30n650+0&jv3184q4ezec_6a2kpgvx(po4v0g&nh$mb*!6!=h6"
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# On for local development; the Docker image sets DJANGO_DEBUG=0.
+DEBUG = os.getenv("DJANGO_DEBUG", "1") == "1"
 
 
 # change if hosted somewhere else
@@ -49,10 +51,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "dashboard.middleware.DatabaseBusyMiddleware",
+    "dashboard.middleware.ReplicaPinningMiddleware",
+    "dashboard.middleware.QueryBudgetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "dashboard.middleware.ProfileMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -69,6 +75,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "dashboard.context_processors.unread_messages",
             ],
         },
     },
@@ -81,30 +88,174 @@ WSGI_APPLICATION = "app.wsgi.application"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# Pooled connections (psycopg 3 + psycopg_pool, per worker process) replace
+# persistent ones; DB_POOL=0 falls back to one persistent connection per thread.
+DB_POOL = os.getenv("DB_POOL", "1") == "1"
+
 if DATABASE_URL:
     # Fly.io (PostgreSQL)
     DATABASES = {
         "default": dj_database_url.parse(
             DATABASE_URL,
-            conn_max_age=600,
+            conn_max_age=0 if DB_POOL else 600,
         )
     }
+    # dj-database-url 0.4 still names the removed postgresql_psycopg2 backend.
+    # Django's own backend, plus reporting pool timeouts to DatabaseBusyMiddleware.
+    DATABASES["default"]["ENGINE"] = "dashboard.postgresql"
     DATABASES['default']['OPTIONS'] = {
-        "sslmode": "disable"
+        "sslmode": "disable",
+        "connect_timeout": 5,
     }
+    if DB_POOL:
+        # Django passes ConnectionPool.check_connection to the pool, so every
+        # checkout is health-checked before use
+        DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "name": "default",
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 1)),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 4)),
+            # seconds a request waits for a free connection before PoolTimeout (503)
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", 5)),
+            "max_idle": 300,
+            "max_lifetime": 1800,
+        }
 else:
     # Local development (SQLite)
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
-            "NAME": BASE_DIR / "db.sqlite3",
+            "NAME": os.getenv("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
         }
     }
 
+# Retry-After (seconds) on the 503 sent when no pooled connection frees up in time
+DB_POOL_RETRY_AFTER_SECONDS = 2
+
+# Read replica (dashboard.replicas): GET/HEAD reads in @read_replica views go
+# to it unless the user wrote within the last REPLICA_PIN_SECONDS.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+if DATABASE_URL and DATABASE_REPLICA_URL:
+    # same backend options (and pool settings) as the primary
+    DATABASES["replica"] = copy.deepcopy(DATABASES["default"])
+    parsed = dj_database_url.parse(DATABASE_REPLICA_URL)
+    DATABASES["replica"].update({key: parsed[key] for key in ("NAME", "USER", "PASSWORD", "HOST", "PORT")})
+    if "pool" in DATABASES["replica"]["OPTIONS"]:
+        DATABASES["replica"]["OPTIONS"]["pool"]["name"] = "replica"
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+elif not DATABASE_URL and os.getenv("SQLITE_REPLICA_PATH"):
+    # a second local file; refresh it from the primary with manage.py sync_replica
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.getenv("SQLITE_REPLICA_PATH"),
+    }
+DATABASE_REPLICA = "replica" if "replica" in DATABASES else None
+DATABASE_ROUTERS = ["dashboard.replicas.ReplicaRouter"]
+REPLICA_PIN_COOKIE = "primary_pin"
+REPLICA_PIN_SECONDS = 10
+
+
+# Caches
+# Every alias lives in one SQLite file (dashboard.cache.SQLiteCache), so all
+# gunicorn workers on the machine share it; each alias has its own table.
+# Set LOCAL_CACHE_BACKEND to "django.core.cache.backends.locmem.LocMemCache"
+# for a single process. The test settings (app.settings_test) use a
+# throwaway file.
+LOCAL_CACHE_BACKEND = os.getenv("LOCAL_CACHE_BACKEND", "dashboard.cache.SQLiteCache")
+LOCAL_CACHE_PATH = os.getenv("LOCAL_CACHE_PATH", "/tmp/connectus-cache.sqlite3")
+
+# The "markdown" alias holds rendered SessionTemplate HTML (dashboard.rendering),
+# bounded by MAX_ENTRIES below. In front of it, a per-process LRU bounded by bytes:
+MARKDOWN_CACHE_LOCAL_MAX_BYTES = 2 * 1024 * 1024
+
+# Process-local SessionTemplate catalog (dashboard.catalog): its version token
+# lives in this cache alias; workers also reload after MAX_AGE seconds.
+SESSION_CATALOG_CACHE = "default"
+SESSION_CATALOG_MAX_AGE = 60
+
+CACHES = {
+    "default": {
+        "BACKEND": LOCAL_CACHE_BACKEND,
+        "LOCATION": LOCAL_CACHE_PATH,
+        "OPTIONS": {
+            "TABLE": "cache_default",
+            "MAX_ENTRIES": 50000,
+        },
+    },
+    "markdown": {
+        "BACKEND": LOCAL_CACHE_BACKEND,
+        "LOCATION": LOCAL_CACHE_PATH,
+        "TIMEOUT": 7 * 24 * 3600,
+        "OPTIONS": {
+            "TABLE": "cache_markdown",
+            "MAX_ENTRIES": 2000,
+            "CULL_FREQUENCY": 4,
+        },
+    },
+}
+
+# Sessions are read from the "default" cache and written through to the
+# database, so an authenticated request normally doesn't touch django_session.
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
+
+# Real-time updates (dashboard.pubsub / dashboard.views.message_events)
+# SQLiteBroker fans events out across all workers on the machine;
+# use "dashboard.pubsub.InProcessBroker" for a single process.
+PUBSUB_BROKER = {
+    "BACKEND": os.getenv("PUBSUB_BACKEND", "dashboard.pubsub.SQLiteBroker"),
+    "OPTIONS": {},
+}
+PUBSUB_SQLITE_PATH = os.getenv("PUBSUB_SQLITE_PATH", "/tmp/connectus-pubsub.sqlite3")
+SSE_HEARTBEAT_SECONDS = 20
+SSE_MAX_SECONDS = 300
+
+
+# Per-request SQL query budgets (dashboard.middleware.QueryBudgetMiddleware),
+# keyed by URL name. Exceeding one logs a warning, or raises with
+# QUERY_BUDGET_RAISE=1 (the view tests turn it on with override_settings).
+QUERY_BUDGETS = {
+    "dashboard": 12,
+    "mentor_dashboard": 8,
+    "mentor_messages": 7,
+    "mentor_message_thread": 12,
+    "message_thread": 12,
+    "message_thread_since": 12,
+    "session_detail": 5,
+    "english_test": 6,
+    "end_test": 9,
+    "mentor_manage_sessions": 14,
+}
+QUERY_BUDGET_DEFAULT = None
+QUERY_BUDGET_RAISE = os.getenv("QUERY_BUDGET_RAISE", "0") == "1"
+
+# Build URL resolvers, templates and Markdown when the app loads instead of on
+# the first request (dashboard.startup); with gunicorn's preload_app this runs
+# once in the master.
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "1") == "1"
+
+# Worker memory samples exported by the gunicorn master (gunicorn.conf.py,
+# dashboard.workers), shown on the query report
+WORKER_STATS_PATH = os.getenv("GUNICORN_STATS_PATH", "/tmp/connectus-workers.json")
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
+# Email + password login for the site (see dashboard.backends); ModelBackend
+# keeps username login working for the admin.
+AUTHENTICATION_BACKENDS = [
+    "dashboard.backends.EmailBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
+# Password hashing for the async login/register views (dashboard.hashing):
+# threads per worker process, max queued+running hashes before answering 503,
+# and the Retry-After sent with it.
+HASHING_POOL_WORKERS = int(os.getenv("HASHING_POOL_WORKERS", "1"))
+HASHING_MAX_PENDING = int(os.getenv("HASHING_MAX_PENDING", "16"))
+HASHING_RETRY_AFTER_SECONDS = 2
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -137,6 +288,23 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = "static/"
+# fly.toml's [[statics]] serves this directory (hashed, precompressed files)
+STATIC_ROOT = BASE_DIR.parent / "static"
+STATICFILES_DIRS = [BASE_DIR / "assets" / "static"]
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "dashboard.storage.CompressedManifestStaticFilesStorage"},
+}
+
+# Marketing pages prerendered by `manage.py export_pages` (core.prerender); run it
+# after collectstatic so the pages link the hashed stylesheet.
+PRERENDERED_PAGES_DIR = STATIC_ROOT / "pages"
+
+# Stylesheet build (manage.py build_css): the Tailwind standalone CLI scans the
+# templates listed in tailwind.config.js and writes only the classes they use.
+TAILWIND_CLI = os.getenv("TAILWIND_CLI", "tailwindcss")
+TAILWIND_INPUT = BASE_DIR / "assets" / "tailwind.css"
+TAILWIND_OUTPUT = BASE_DIR / "assets" / "static" / "css" / "site.css"
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
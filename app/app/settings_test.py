@@ -0,0 +1,27 @@
+"""Settings for the test suite.
+
+    python manage.py test --settings=app.settings_test
+
+Other runners: set DJANGO_SETTINGS_MODULE=app.settings_test.
+"""
+import atexit
+import glob
+import os
+import tempfile
+
+from .settings import *  # noqa: F403
+
+# A throwaway shared-cache file per run, removed on exit, so tests never see
+# (or clear) a development server's cache.
+LOCAL_CACHE_PATH = os.path.join(tempfile.gettempdir(), f"connectus-test-cache-{os.getpid()}.sqlite3")
+for _cache in CACHES.values():  # noqa: F405
+    _cache["LOCATION"] = LOCAL_CACHE_PATH
+atexit.register(lambda: [os.remove(path) for path in glob.glob(LOCAL_CACHE_PATH + "*")])
+
+# A separate, initially empty replica database, so tests can tell which one
+# served a read. Routing is off unless a test overrides DATABASE_REPLICA.
+DATABASES["replica"] = {  # noqa: F405
+    "ENGINE": "django.db.backends.sqlite3",
+    "NAME": BASE_DIR / "replica.sqlite3",  # noqa: F405
+}
+DATABASE_REPLICA = None
@@ -16,8 +16,10 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from dashboard.views import query_report
 
 urlpatterns = [
+    path("admin/query-report/", query_report, name="query_report"),
     path("admin/", admin.site.urls),
     path("", include("core.urls")),
     path("dashboard/", include("dashboard.urls")),
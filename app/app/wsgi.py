@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
 
 application = get_wsgi_application()
+
+# startup timings and optional warmup (dashboard.startup)
+from dashboard import startup  # noqa: E402
+
+startup.install()
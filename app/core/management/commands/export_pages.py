@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.prerender import export_pages
+
+
+class Command(BaseCommand):
+    help = "Prerender the marketing pages to static HTML (with .gz/.br variants) for fly.toml's [[statics]]."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default=None, help=f"Target directory (default {settings.PRERENDERED_PAGES_DIR}).")
+
+    def handle(self, *args, **options):
+        for name, (path, page) in export_pages(options["output"]).items():
+            sizes = ", ".join(f"{suffix} {len(data)}" for suffix, data in sorted(page.variants.items()))
+            self.stdout.write(f"{name:<6} {path}  {len(page.body)} bytes ({sizes})  ETag {page.etag()}")
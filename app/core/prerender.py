@@ -0,0 +1,103 @@
+"""Prerendered marketing pages.
+
+The marketing pages have no per-request content, so ``manage.py export_pages``
+renders them once into ``settings.PRERENDERED_PAGES_DIR`` as
+``<path>/index.html`` plus ``.gz``/``.br`` variants. fly.toml's ``[[statics]]``
+serves the exported files where it can. The views in ``core.views`` are
+the fallback: they serve the exported bytes from memory, or render the
+template when nothing has been exported. Either way the response has a strong,
+content-hashed ETag, and a matching ``If-None-Match`` gets a 304.
+"""
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from dashboard.storage import compressed_variants
+
+# name -> (URL path, template)
+PAGES = {
+    "index": ("", "index.html"),
+    "faq": ("faq", "faq.html"),
+}
+# Content-Encoding for each exported variant, in order of preference
+ENCODINGS = {".br": "br", ".gz": "gzip"}
+
+
+@dataclass(frozen=True)
+class Page:
+    body: bytes
+    # {".gz": bytes, ".br": bytes}
+    variants: dict = field(default_factory=dict)
+
+    @property
+    def digest(self):
+        return hashlib.sha256(self.body).hexdigest()[:20]
+
+    def etag(self, suffix=""):
+        """Strong ETag of the identity body, or of the variant with ``suffix``."""
+        return f'"{self.digest}{suffix.replace(".", "-")}"'
+
+
+def render_page(name):
+    return Page(render_to_string(PAGES[name][1]).encode("utf-8"))
+
+
+def page_path(root, name):
+    return root.joinpath(PAGES[name][0], "index.html")
+
+
+def export_pages(root=None):
+    """Render every page into ``root``; return ``{name: (path, Page)}``."""
+    root = Path(root or settings.PRERENDERED_PAGES_DIR)
+    exported = {}
+    for name in PAGES:
+        page = render_page(name)
+        page = Page(page.body, compressed_variants(page.body))
+        path = page_path(root, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(page.body)
+        for suffix in ENCODINGS:
+            variant = path.with_name(path.name + suffix)
+            if suffix in page.variants:
+                variant.write_bytes(page.variants[suffix])
+            elif variant.exists():
+                variant.unlink()
+        exported[name] = (path, page)
+    return exported
+
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def get_page(name):
+    """Return the exported ``Page`` for ``name``, loading it once per process.
+
+    Without an export the template is rendered; with ``DEBUG`` that happens on
+    every call so template edits show up.
+    """
+    page = _loaded.get(name)
+    if page is not None:
+        return page
+    path = page_path(Path(settings.PRERENDERED_PAGES_DIR), name)
+    if not path.exists():
+        page = render_page(name)
+        if settings.DEBUG:
+            return page
+    else:
+        variants = {}
+        for suffix in ENCODINGS:
+            variant = path.with_name(path.name + suffix)
+            if variant.exists():
+                variants[suffix] = variant.read_bytes()
+        page = Page(path.read_bytes(), variants)
+    with _lock:
+        return _loaded.setdefault(name, page)
+
+
+def clear():
+    _loaded.clear()
@@ -1,3 +1,50 @@
-from django.test import TestCase
+import gzip
+import io
+import tempfile
+from pathlib import Path
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from . import prerender
+
+
+class PrerenderedPageTests(TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        prerender.clear()
+        self.addCleanup(prerender.clear)
+
+    def test_export_writes_pages_and_variants(self):
+        call_command("export_pages", output=str(self.root), stdout=io.StringIO())
+        index = self.root / "index.html"
+        faq = self.root / "faq" / "index.html"
+        self.assertIn(b"ConnectUS", index.read_bytes())
+        self.assertIn(b"FAQ", faq.read_bytes())
+        self.assertEqual(gzip.decompress((self.root / "faq" / "index.html.gz").read_bytes()), faq.read_bytes())
+
+    def test_view_serves_export_with_strong_etag(self):
+        with override_settings(PRERENDERED_PAGES_DIR=self.root):
+            exported = prerender.export_pages()
+            response = self.client.get(reverse("faq"))
+            self.assertEqual(response.content, exported["faq"][1].body)
+            etag = response["ETag"]
+            self.assertFalse(etag.startswith("W/"))
+
+            response = self.client.get(reverse("faq"), HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response["ETag"], etag)
+
+            response = self.client.get(reverse("faq"), HTTP_ACCEPT_ENCODING="gzip, deflate")
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            self.assertNotEqual(response["ETag"], etag)
+            self.assertEqual(gzip.decompress(response.content), exported["faq"][1].body)
+
+    def test_view_renders_without_export(self):
+        with override_settings(PRERENDERED_PAGES_DIR=self.root):
+            response = self.client.get(reverse("index"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "ConnectUS")
+        self.assertIn("ETag", response)
+        self.assertEqual(self.client.post(reverse("index")).status_code, 405)
@@ -1,16 +1,37 @@
-from django.shortcuts import render
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_safe
 
-# Create your views here.
-from django.shortcuts import render
+from .prerender import ENCODINGS, get_page
 
+
+def _serve(request, name):
+    """Serve a prerendered page, picking a precompressed variant the client accepts."""
+    page = get_page(name)
+    accepted = {e.split(";")[0].strip() for e in request.headers.get("Accept-Encoding", "").split(",")}
+    suffix = next((s for s, encoding in ENCODINGS.items() if s in page.variants and encoding in accepted), "")
+    etag = page.etag(suffix)
+
+    if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+    if "*" in if_none_match or etag in if_none_match:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(page.variants.get(suffix, page.body), content_type="text/html; charset=utf-8")
+        if suffix:
+            response["Content-Encoding"] = ENCODINGS[suffix]
+    response["ETag"] = etag
+    response["Cache-Control"] = "public, max-age=0, must-revalidate"
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+@require_safe
 def index(request):
-    context = {
-        "total": 42,
-    }
-    return render(request, "index.html", context)
+    return _serve(request, "index")
 
 
+@require_safe
 def faq(request):
-    """Render the FAQ page (trilingual)."""
-    
-    return render(request, "faq.html")
\ No newline at end of file
+    """The FAQ page (trilingual)."""
+    return _serve(request, "faq")
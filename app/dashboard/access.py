@@ -0,0 +1,39 @@
+"""Per-request access to the logged-in user's Profile and role.
+
+``EmailBackend.get_user`` loads the session user with its profile in one
+join; ``ProfileMiddleware`` exposes it as ``request.profile`` and the cached
+role as ``request.is_mentor`` (both lazy, so requests that never look at them
+pay nothing). Views that are mentor-only use ``@mentor_required``.
+"""
+from functools import wraps
+
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseForbidden
+
+from .models import Profile
+
+
+def get_profile(user):
+    """Return ``user``'s Profile, provisioning one for legacy users without it.
+
+    Returns ``None`` for anonymous users.
+    """
+    if not user.is_authenticated:
+        return None
+    try:
+        return user.profile
+    except Profile.DoesNotExist:
+        profile, _ = Profile.objects.get_or_create(user=user)
+        user.profile = profile
+        return profile
+
+
+def mentor_required(view_func):
+    """``login_required`` plus a 403 for users whose profile is not a mentor's."""
+    @login_required(login_url='login')
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not request.is_mentor:
+            return HttpResponseForbidden('Access denied')
+        return view_func(request, *args, **kwargs)
+    return wrapper
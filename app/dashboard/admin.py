@@ -1,11 +1,68 @@
-from django.contrib import admin
-from .models import Profile, SessionTemplate, SessionCompletion
+import io
+
+from django import forms
+from django.contrib import admin, messages
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from .models import Profile, SessionTemplate, SessionCompletion, QuestionBank, Question
+from .onboarding import ADMIN_MAX_PASSWORDS, FORMATS, OnboardingError, count_passwords, detect_format, import_cohort, read_rows
+
+
+class CohortImportForm(forms.Form):
+	file = forms.FileField(help_text="CSV with a header row, or JSON Lines. Columns: email, username, first_name, last_name, is_mentor, mentor, password.")
+	format = forms.ChoiceField(choices=[("", "From file name")] + [(f, f.upper()) for f in FORMATS], required=False)
+	dry_run = forms.BooleanField(required=False, help_text="Validate only; nothing is saved.")
+
 
 
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
 	list_display = ("user", "assigned_mentor", "intro_test_done", "end_test_done", "default_meeting_tool")
 	search_fields = ("user__username", "user__email")
+	change_list_template = "admin/dashboard/profile/change_list.html"
+
+	def get_urls(self):
+		return [
+			path("import-cohort/", self.admin_site.admin_view(self.import_cohort_view), name="dashboard_profile_import_cohort"),
+		] + super().get_urls()
+
+	def import_cohort_view(self, request):
+		"""Bulk-create a cohort from an uploaded file (see dashboard.onboarding)."""
+		if not request.user.has_perm("auth.add_user"):
+			messages.error(request, "You don't have permission to add users.")
+			return redirect("admin:dashboard_profile_changelist")
+		form = CohortImportForm(request.POST or None, request.FILES or None)
+		result = None
+		if request.method == "POST" and form.is_valid():
+			upload = form.cleaned_data["file"]
+			fmt = form.cleaned_data["format"] or detect_format(upload.name)
+			# stream the upload instead of reading it into memory
+			text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+			try:
+				if not form.cleaned_data["dry_run"]:
+					# hashing is slow; past a few dozen passwords the request would time out
+					passwords = count_passwords(read_rows(text, fmt))
+					text.seek(0)
+					if passwords > ADMIN_MAX_PASSWORDS:
+						raise OnboardingError(
+							f"{passwords} rows have a password; the upload takes at most {ADMIN_MAX_PASSWORDS}. "
+							"Import this file with manage.py import_cohort instead."
+						)
+				result = import_cohort(read_rows(text, fmt), dry_run=form.cleaned_data["dry_run"])
+			except (UnicodeDecodeError, OnboardingError) as exc:
+				form.add_error("file", str(exc))
+			else:
+				verb = "Would create" if form.cleaned_data["dry_run"] else "Created"
+				messages.success(request, f"{verb} {result.created} users ({result.mentors} mentors, {result.assigned} assigned); skipped {result.skipped} rows.")
+		context = {
+			**self.admin_site.each_context(request),
+			"title": "Import cohort",
+			"opts": self.model._meta,
+			"form": form,
+			"result": result,
+		}
+		return TemplateResponse(request, "admin/dashboard/profile/import_cohort.html", context)
 
 
 
@@ -26,3 +83,22 @@ class SessionTemplateAdmin(admin.ModelAdmin):
 class SessionCompletionAdmin(admin.ModelAdmin):
 	list_display = ("user", "template", "completed", "completed_at")
 	search_fields = ("user__username", "template__title")
+
+
+class QuestionInline(admin.TabularInline):
+	model = Question
+	extra = 0
+	fields = ("order", "text", "options", "answer", "difficulty")
+
+
+@admin.register(QuestionBank)
+class QuestionBankAdmin(admin.ModelAdmin):
+	list_display = ("title", "slug", "version", "updated_at")
+	readonly_fields = ("version",)
+	inlines = [QuestionInline]
+
+	def has_add_permission(self, request):
+		return request.user.is_superuser
+
+	def has_change_permission(self, request, obj=None):
+		return request.user.is_superuser
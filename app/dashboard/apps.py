@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class DashboardConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "dashboard"
+
+    def ready(self):
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        from .middleware import install_query_hooks
+
+        connection_created.connect(install_query_hooks)
+        for connection in connections.all(initialized_only=True):
+            install_query_hooks(sender=None, connection=connection)
@@ -0,0 +1,68 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models.functions import Lower
+
+from .hashing import amake_password, averify_password
+
+
+class EmailBackend(ModelBackend):
+    """Authenticate with ``email`` + ``password``.
+
+    The user is matched on ``lower(email)``, which is served by the
+    ``auth_user_email_lower_idx`` functional index (migration 0018), and the
+    profile is fetched in the same query so the post-login redirect does not
+    need another one.
+
+    ``get_user`` (used for every session-authenticated request) also joins
+    the profile, so ``request.user.profile`` never costs a query.
+
+    ``aauthenticate`` does the hashing in the bounded pool from
+    ``dashboard.hashing`` and may raise ``HashingBusy``.
+    """
+
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if email is None or password is None:
+            return None
+        user = self.get_by_email(email)
+        if user is None:
+            # Run the hasher anyway so unknown emails take as long as wrong passwords.
+            get_user_model()().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+    def get_by_email(self, email):
+        """Return the oldest user with this email (case-insensitive), with its profile, or None."""
+        return (
+            get_user_model()._default_manager
+            .alias(email_lower=Lower("email"))
+            .filter(email_lower=email.strip().lower())
+            .select_related("profile")
+            .order_by("pk")
+            .first()
+        )
+
+    def get_user(self, user_id):
+        user = get_user_model()._default_manager.select_related("profile").filter(pk=user_id).first()
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        user = await get_user_model()._default_manager.select_related("profile").filter(pk=user_id).afirst()
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+    async def aauthenticate(self, request, email=None, password=None, **kwargs):
+        if email is None or password is None:
+            return None
+        user = await sync_to_async(self.get_by_email)(email)
+        if user is None:
+            await amake_password(password)
+            return None
+        is_correct, must_update = await averify_password(password, user.password)
+        if not is_correct or not self.user_can_authenticate(user):
+            return None
+        if must_update:
+            user.password = await amake_password(password)
+            await user.asave(update_fields=["password"])
+        return user
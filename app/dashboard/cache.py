@@ -0,0 +1,254 @@
+"""Machine-local cache tier shared by every worker process.
+
+``SQLiteCache`` is a Django cache backend storing pickled values in a SQLite
+file (WAL mode), so all gunicorn workers on a machine see the same entries
+without running a cache server. It backs the session cache and the app's
+other aliases (see ``CACHES`` in settings); Django's ``LocMemCache`` is the
+single-process stand-in (``LOCAL_CACHE_BACKEND``).
+
+* TTL eviction: expired rows are never returned and are purged in bulk every
+  ``CULL_EVERY`` writes; past ``MAX_ENTRIES`` the soonest-to-expire
+  ``1/CULL_FREQUENCY`` of rows is dropped.
+* Stampede protection: ``get_or_set`` with a callable lets one process
+  compute a missing value while the others wait (up to ``LOCK_WAIT``
+  seconds) for it instead of all recomputing it.
+* ``incr``/``decr`` are atomic across processes.
+
+Under ASGI, ``caches`` is context-local, so Django builds a new backend
+instance for every request. The SQLite connections and the write count
+toward ``CULL_EVERY`` therefore live in a per-process ``_Store`` for each
+file and table, not on the instance.
+"""
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+_MISSING = object()
+_TABLE_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class _Store:
+    """One process's connections (one per thread) and write count for a cache table."""
+
+    def __init__(self):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.writes = 0
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def _store(path, table):
+    # keyed by pid too, so a forked worker (gunicorn --preload) starts afresh
+    key = (path, table, os.getpid())
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = _Store()
+        return _stores[key]
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.path = str(location)
+        self.table = options.get("TABLE", "cache")
+        if not _TABLE_NAME.match(self.table):
+            raise ValueError(f"Invalid cache table name {self.table!r}")
+        self.cull_every = int(options.get("CULL_EVERY", 200))
+        self.lock_timeout = float(options.get("LOCK_TIMEOUT", 10))
+        self.lock_wait = float(options.get("LOCK_WAIT", 5))
+        self.lock_poll = float(options.get("LOCK_POLL", 0.05))
+
+    def _store(self):
+        return _store(self.path, self.table)
+
+    def _conn(self):
+        local = self._store().local
+        conn = getattr(local, "conn", None)
+        if conn is not None:
+            return conn
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)"
+        )
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_expires ON {self.table} (expires)")
+        local.conn = conn
+        return conn
+
+    @staticmethod
+    def _dumps(value):
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _alive(expires, now):
+        return expires is None or expires > now
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._conn().execute(f"SELECT value, expires FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is None or not self._alive(row[1], time.time()):
+            return default
+        return pickle.loads(row[0])
+
+    def get_many(self, keys, version=None):
+        key_map = {self.make_and_validate_key(k, version=version): k for k in keys}
+        if not key_map:
+            return {}
+        now = time.time()
+        placeholders = ",".join("?" * len(key_map))
+        rows = self._conn().execute(
+            f"SELECT key, value, expires FROM {self.table} WHERE key IN ({placeholders})", list(key_map)
+        ).fetchall()
+        return {key_map[k]: pickle.loads(v) for k, v, expires in rows if self._alive(expires, now)}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._conn().execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, value, expires) VALUES (?, ?, ?)",
+            (key, self._dumps(value), self.get_backend_timeout(timeout)),
+        )
+        self._wrote()
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        rows = [(self.make_and_validate_key(k, version=version), self._dumps(v), expires) for k, v in data.items()]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(f"INSERT OR REPLACE INTO {self.table} (key, value, expires) VALUES (?, ?, ?)", rows)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        self._wrote(len(rows))
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        # insert, or take over the row only if it has expired
+        cursor = self._conn().execute(
+            f"INSERT INTO {self.table} (key, value, expires) VALUES (?, ?, ?) "
+            f"ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires = excluded.expires "
+            f"WHERE {self.table}.expires IS NOT NULL AND {self.table}.expires <= ?",
+            (key, self._dumps(value), self.get_backend_timeout(timeout), time.time()),
+        )
+        added = cursor.rowcount > 0
+        if added:
+            self._wrote()
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._conn().execute(
+            f"UPDATE {self.table} SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (self.get_backend_timeout(timeout), key, time.time()),
+        )
+        return cursor.rowcount > 0
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._conn().execute(f"DELETE FROM {self.table} WHERE key = ?", (key,)).rowcount > 0
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_and_validate_key(k, version=version) for k in keys]
+        if keys:
+            placeholders = ",".join("?" * len(keys))
+            self._conn().execute(f"DELETE FROM {self.table} WHERE key IN ({placeholders})", keys)
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._conn().execute(
+            f"SELECT 1 FROM {self.table} WHERE key = ? AND (expires IS NULL OR expires > ?)", (key, time.time())
+        ).fetchone()
+        return row is not None
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        conn = self._conn()
+        # BEGIN IMMEDIATE takes the write lock up front, so concurrent increments serialize
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(f"SELECT value, expires FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None or not self._alive(row[1], time.time()):
+                raise ValueError(f"Key '{key}' not found")
+            value = pickle.loads(row[0]) + delta
+            conn.execute(f"UPDATE {self.table} SET value = ? WHERE key = ?", (self._dumps(value), key))
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return value
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        value = self.get(key, _MISSING, version=version)
+        if value is not _MISSING:
+            return value
+        if not callable(default):
+            return super().get_or_set(key, default, timeout, version)
+
+        lock_key = f"{key}:lock"
+        if self.add(lock_key, os.getpid(), self.lock_timeout, version=version):
+            try:
+                value = default()
+                self.set(key, value, timeout, version=version)
+                return value
+            finally:
+                self.delete(lock_key, version=version)
+
+        # another process is computing it; wait for its result rather than pile on
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            time.sleep(self.lock_poll)
+            value = self.get(key, _MISSING, version=version)
+            if value is not _MISSING:
+                return value
+            if not self.has_key(lock_key, version=version):
+                break
+        value = default()
+        self.add(key, value, timeout, version=version)
+        return value
+
+    def clear(self):
+        self._conn().execute(f"DELETE FROM {self.table}")
+
+    def _wrote(self, count=1):
+        store = self._store()
+        with store.lock:
+            store.writes += count
+            cull = store.writes >= self.cull_every
+            if cull:
+                store.writes = 0
+        if cull:
+            self._cull()
+
+    def _cull(self):
+        conn = self._conn()
+        conn.execute(f"DELETE FROM {self.table} WHERE expires IS NOT NULL AND expires <= ?", (time.time(),))
+        count = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        if count <= self._max_entries:
+            return
+        if self._cull_frequency == 0:
+            self.clear()
+            return
+        # soonest-expiring first; entries without expiry go last
+        conn.execute(
+            f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM {self.table} "
+            f"ORDER BY expires IS NULL, expires LIMIT ?)",
+            (count // self._cull_frequency,),
+        )
+
+    def close(self, **kwargs):
+        # Django calls this after every request; the store's connections
+        # outlive the instance and are reused for the life of the thread
+        pass
@@ -0,0 +1,110 @@
+"""Process-local catalog of SessionTemplates.
+
+Templates only change when a superuser edits them in admin, so each worker
+keeps an immutable ``Catalog`` (ids, titles, order, progress slots) and only
+reloads it when it is stale. Staleness is decided by a version token kept in
+the shared cache (``settings.SESSION_CATALOG_CACHE``, the machine-wide
+SQLite cache by default); saving or deleting a template replaces the token. As that
+cache is per machine, a worker also reloads after
+``settings.SESSION_CATALOG_MAX_AGE`` seconds so edits made on another machine
+are picked up.
+"""
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.text import Truncator
+
+from .models import SessionTemplate
+
+VERSION_KEY = 'session-catalog:version'
+PREVIEW_CHARS = 120
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    id: int
+    title: str
+    order: int
+    progress_slot: int
+    # short plain preview of content_markdown for listings
+    preview: str
+
+    @property
+    def pk(self):
+        return self.id
+
+
+@dataclass(frozen=True)
+class Catalog:
+    version: str
+    loaded_at: float
+    entries: tuple
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    @property
+    def ids(self):
+        return [e.id for e in self.entries]
+
+
+_catalog = None
+_lock = threading.Lock()
+
+
+def _cache():
+    return caches[getattr(settings, 'SESSION_CATALOG_CACHE', 'default')]
+
+
+def _max_age():
+    return getattr(settings, 'SESSION_CATALOG_MAX_AGE', 60)
+
+
+def current_version():
+    """Return the shared version token, creating one if it is missing or was evicted."""
+    cache = _cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    """Invalidate every worker's catalog (called on SessionTemplate save/delete)."""
+    global _catalog
+    _cache().set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    with _lock:
+        _catalog = None
+
+
+def load_catalog(version):
+    rows = SessionTemplate.objects.order_by('order', '-created_at').values_list(
+        'id', 'title', 'order', 'progress_slot', 'content_markdown',
+    )
+    entries = tuple(
+        CatalogEntry(pk, title, order, slot, Truncator(content).chars(PREVIEW_CHARS))
+        for pk, title, order, slot, content in rows
+    )
+    return Catalog(version=version, loaded_at=time.monotonic(), entries=entries)
+
+
+def get_catalog():
+    """Return the current ``Catalog``, reloading it from the database only when stale."""
+    global _catalog
+    version = current_version()
+    catalog = _catalog
+    if catalog is not None and catalog.version == version and time.monotonic() - catalog.loaded_at < _max_age():
+        return catalog
+
+    catalog = load_catalog(version)
+    with _lock:
+        _catalog = catalog
+    return catalog
@@ -0,0 +1,11 @@
+def unread_messages(request):
+    """Expose the user's unread message count to every template.
+
+    Reads the counter maintained on ``Profile`` instead of counting messages,
+    so rendering the badge costs no extra query once the profile is loaded.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    profile = getattr(request, 'profile', None)
+    return {'unread_messages_count': profile.unread_messages_count if profile else 0}
@@ -0,0 +1,102 @@
+"""Metrics and error handling for pooled PostgreSQL connections.
+
+With ``OPTIONS["pool"]`` set (see ``DATABASES`` in settings), Django keeps a
+``psycopg_pool.ConnectionPool`` per database alias in each worker process. A
+request checks a connection out on its first query and returns it when the
+request finishes. Each checkout is health-checked (``CONN_HEALTH_CHECKS``),
+and a dead connection is replaced instead of failing the request. A request
+that can't get a connection within the pool ``timeout`` gets a 503 with
+``Retry-After`` from ``DatabaseBusyMiddleware``, the way a saturated hashing
+pool does. That holds wherever the checkout happened. Django turns an
+exception raised in another middleware (a session save, say) into a 500 at
+that layer, before ``DatabaseBusyMiddleware`` can see it, so the
+``dashboard.postgresql`` backend also flags timeouts on the request's
+``watch_pool_timeouts()`` state.
+
+``pool_stats()`` summarises the pool counters (this process only) for the
+staff query report and ``manage.py db_pool_check``. SQLite has no pool and
+reports nothing.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+
+try:
+    from psycopg_pool import PoolTimeout
+except ImportError:  # SQLite-only installs
+    PoolTimeout = None
+
+
+def get_pool(alias="default"):
+    """The alias's ConnectionPool, or None if it isn't pooled."""
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return None
+    return connection.pool
+
+
+def pool_stats():
+    """``{alias: {...}}`` for every pooled database, counters cumulative since the pool opened."""
+    stats = {}
+    for alias in connections:
+        pool = get_pool(alias)
+        if pool is not None:
+            stats[alias] = summarize(pool.get_stats())
+    return stats
+
+
+def summarize(raw):
+    """Turn psycopg_pool's ``get_stats()`` into the figures we report."""
+    size = raw.get("pool_size", 0)
+    queued = raw.get("requests_queued", 0)
+    wait_ms = raw.get("requests_wait_ms", 0)
+    return {
+        "min": raw.get("pool_min", 0),
+        "max": raw.get("pool_max", 0),
+        "size": size,
+        "in_use": size - raw.get("pool_available", 0),
+        "waiting": raw.get("requests_waiting", 0),
+        "checkouts": raw.get("requests_num", 0),
+        # checkouts that had to queue for a free connection, and how long they waited
+        "waits": queued,
+        "wait_ms": wait_ms,
+        "wait_ms_avg": wait_ms / queued if queued else 0.0,
+        # timeouts and other failed checkouts
+        "errors": raw.get("requests_errors", 0),
+        "connections_opened": raw.get("connections_num", 0),
+        "connect_ms": raw.get("connections_ms", 0),
+        "connection_errors": raw.get("connections_errors", 0),
+        # connections found broken by the checkout health check
+        "connections_lost": raw.get("connections_lost", 0),
+    }
+
+
+def is_pool_timeout(exc):
+    """True for a checkout timeout, raw or wrapped in Django's OperationalError."""
+    if PoolTimeout is None:
+        return False
+    return isinstance(exc, PoolTimeout) or isinstance(exc.__cause__, PoolTimeout)
+
+
+class TimeoutWatch:
+    timed_out = False
+
+
+_watch = ContextVar("db_pool_timeout_watch", default=None)
+
+
+@contextmanager
+def watch_pool_timeouts():
+    """Yield a ``TimeoutWatch``; checkout timeouts in this context (and its sync_to_async threads) set it."""
+    token = _watch.set(TimeoutWatch())
+    try:
+        yield _watch.get()
+    finally:
+        _watch.reset(token)
+
+
+def note_pool_timeout():
+    watch = _watch.get()
+    if watch is not None:
+        watch.timed_out = True
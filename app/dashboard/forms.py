@@ -2,6 +2,7 @@ from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
 from django.core.exceptions import ValidationError
+from django.db.models.functions import Lower
 from .models import MEETING_TOOL_CHOICES
 
 
@@ -44,9 +45,10 @@ class CustomUserCreationForm(UserCreationForm):
         fields = ('username', 'email', 'first_name', 'last_name', 'password1', 'password2')
 
     def clean_email(self):
-        """Check if email already exists"""
+        """Check if email already exists, ignoring case as login does"""
         email = self.cleaned_data.get('email')
-        if User.objects.filter(email=email).exists():
+        # same lookup as EmailBackend, so it uses auth_user_email_lower_idx
+        if email and User.objects.alias(email_lower=Lower('email')).filter(email_lower=email.lower()).exists():
             raise ValidationError('This email address is already registered.')
         return email
 
@@ -68,6 +70,16 @@ class CustomUserCreationForm(UserCreationForm):
             raise ValidationError('Passwords do not match.')
         return password2
 
+    def set_password_and_save(self, user, password_field_name="password1", commit=True):
+        # The async register view hashes off the request path and passes the result in.
+        password_hash = getattr(self, 'password_hash', None)
+        if password_hash is None:
+            return super().set_password_and_save(user, password_field_name, commit=commit)
+        user.password = password_hash
+        if commit:
+            user.save()
+        return user
+
     def save(self, commit=True):
         """Save the user with email"""
         user = super().save(commit=False)
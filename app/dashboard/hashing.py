@@ -0,0 +1,127 @@
+"""Bounded off-loop password hashing for the async login/register views.
+
+PBKDF2 is deliberately slow; run inline it holds a worker for hundreds of
+milliseconds, so a burst of logins stalls every other page. Here each worker
+process hashes in a small thread pool (``hashlib`` releases the GIL while it
+hashes, so the event loop keeps serving other requests). At most
+``HASHING_MAX_PENDING`` hashes may be queued or running per process; past that
+``HashingBusy`` is raised and the views answer 503 with ``Retry-After``.
+
+Timings are kept in ``hashing_stats`` and shown on the staff query report.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+
+
+class HashingBusy(Exception):
+    """Too many hashes pending in this process; the client should retry later."""
+
+
+class HashingStats:
+    """Rolling window of hash and queue-wait times (per process)."""
+
+    def __init__(self, window=500):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+        self.rejected = 0
+        self.pending = 0
+        self.peak_pending = 0
+
+    def record(self, op, seconds, waited):
+        with self._lock:
+            self._samples.setdefault(op, deque(maxlen=self.window)).append((seconds, waited))
+
+    def summary(self):
+        rows = []
+        with self._lock:
+            for op, samples in sorted(self._samples.items()):
+                hash_ms = sorted(s[0] * 1000 for s in samples)
+                wait_ms = sorted(s[1] * 1000 for s in samples)
+                n = len(samples)
+                rows.append({
+                    "op": op,
+                    "count": n,
+                    "hash_ms_avg": sum(hash_ms) / n,
+                    "hash_ms_p95": hash_ms[min(n - 1, int(n * 0.95))],
+                    "wait_ms_p95": wait_ms[min(n - 1, int(n * 0.95))],
+                    "wait_ms_max": wait_ms[-1],
+                })
+            return {
+                "ops": rows,
+                "pending": self.pending,
+                "peak_pending": self.peak_pending,
+                "rejected": self.rejected,
+            }
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self.rejected = 0
+            self.peak_pending = self.pending
+
+
+hashing_stats = HashingStats()
+
+
+class HashingPool:
+    def __init__(self, workers=1, max_pending=16, stats=hashing_stats):
+        self.max_pending = max_pending
+        self.stats = stats
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hashing")
+        self._lock = threading.Lock()
+
+    async def run(self, op, fn, *args):
+        """Run ``fn(*args)`` in the pool, or raise ``HashingBusy`` if the queue is full."""
+        stats = self.stats
+        with self._lock:
+            if stats.pending >= self.max_pending:
+                stats.rejected += 1
+                raise HashingBusy(op)
+            stats.pending += 1
+            stats.peak_pending = max(stats.peak_pending, stats.pending)
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                stats.record(op, time.perf_counter() - started, started - submitted)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            with self._lock:
+                stats.pending -= 1
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HashingPool(
+                    workers=getattr(settings, "HASHING_POOL_WORKERS", 1),
+                    max_pending=getattr(settings, "HASHING_MAX_PENDING", 16),
+                )
+    return _pool
+
+
+async def amake_password(password):
+    return await get_pool().run("make", make_password, password)
+
+
+async def averify_password(password, encoded):
+    """Return ``(is_correct, must_update)`` for ``password`` against ``encoded``."""
+    return await get_pool().run("verify", verify_password, password, encoded)
@@ -0,0 +1,168 @@
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timezone as dt_timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from dashboard.backends import EmailBackend
+from dashboard.synthetic import seed_users
+
+from .benchmark_views import percentile
+
+
+def legacy_lookup(email):
+    """The pre-EmailBackend path: iexact scan, username lookup, then the profile."""
+    user = User.objects.filter(email__iexact=email).first()
+    if user is None:
+        return None
+    user = User._default_manager.get_by_natural_key(user.username)
+    user.profile
+    return user
+
+
+def indexed_lookup(email):
+    user = EmailBackend().get_by_email(email)
+    if user is not None:
+        user.profile
+    return user
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a large user table into a throwaway test database and compare email "
+        "lookup latency of the old iexact path with EmailBackend's lower(email) index, "
+        "plus end-to-end POSTs to the login view."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1_000_000)
+        parser.add_argument("--requests", type=int, default=200, help="Timed lookups per path.")
+        parser.add_argument("--logins", type=int, default=20, help="Timed login POSTs (each pays a full password hash).")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--prefix", default="login", help="Username/email prefix for seeded users.")
+        parser.add_argument("--output", help="Write results as JSON to this path.")
+        parser.add_argument(
+            "--use-current-db", action="store_true",
+            help="Seed into the configured database instead of creating a test database.",
+        )
+
+    def handle(self, *args, **options):
+        old_name = None
+        try:
+            setup_test_environment()
+            own_environment = True
+        except RuntimeError:
+            # already inside a test run
+            own_environment = False
+        try:
+            if not options["use_current_db"]:
+                old_name = settings.DATABASES["default"]["NAME"]
+                connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            results = self.run(options)
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+            if own_environment:
+                teardown_test_environment()
+
+        self.print_results(results)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def run(self, options):
+        password = "benchmark-password"
+        total = options["users"]
+        if total < 1:
+            raise CommandError("--users must be at least 1.")
+
+        seed_started = time.perf_counter()
+
+        def progress(done, count):
+            self.stdout.write(f"  {done:>10,}/{count:,} users ({time.perf_counter() - seed_started:.1f}s)")
+
+        # one real hash shared by every user, so successful logins never trigger a rehash
+        seed_users(total, prefix=options["prefix"], password_hash=make_password(password), progress=progress)
+        seed_seconds = time.perf_counter() - seed_started
+        # with DEBUG on, seeding fills the bounded query log and CaptureQueriesContext would count 0
+        connection.queries_log.clear()
+
+        rng = random.Random(options["seed"])
+
+        def email():
+            # mixed case, as users type it
+            return f"{options['prefix']}-learner-{rng.randrange(total)}@example.com".title()
+
+        paths = {}
+        for name, lookup in (("legacy_lookup", legacy_lookup), ("indexed_lookup", indexed_lookup)):
+            timings = []
+            queries = []
+            for _ in range(options["requests"]):
+                address = email()
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    user = lookup(address)
+                    timings.append((time.perf_counter() - start) * 1000)
+                if user is None:
+                    raise CommandError(f"{name} did not find {address}")
+                queries.append(len(ctx.captured_queries))
+            paths[name] = self.summarize(timings, queries)
+
+        timings = []
+        queries = []
+        client = Client()
+        url = reverse("login")
+        for _ in range(options["logins"]):
+            client.cookies.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                response = client.post(url, {"email": email(), "password": password})
+                timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 302:
+                raise CommandError(f"login returned {response.status_code}")
+            queries.append(len(ctx.captured_queries))
+        if timings:
+            paths["login_post"] = self.summarize(timings, queries)
+
+        return {
+            "meta": {
+                "timestamp": datetime.now(dt_timezone.utc).isoformat(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "users": total,
+                "seed_seconds": round(seed_seconds, 3),
+            },
+            "paths": paths,
+        }
+
+    def summarize(self, timings, queries):
+        timings.sort()
+        return {
+            "requests": len(timings),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+            "p99_ms": round(percentile(timings, 99), 3),
+            "queries": max(queries),
+        }
+
+    def print_results(self, results):
+        self.stdout.write(f"{results['meta']['users']:,} users on {results['meta']['database']}")
+        header = f"{'path':<18}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for name, row in results["paths"].items():
+            self.stdout.write(
+                f"{name:<18}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}{row['queries']:>9}"
+            )
@@ -0,0 +1,194 @@
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone as dt_timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from dashboard.synthetic import seed_cohort
+
+
+# requests per view traced for peak memory
+MEMORY_SAMPLES = 3
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def view_scenarios(cohort):
+    """``(name, user_id, url)`` for each benchmarked view, with a user allowed to see it."""
+    mentor, mentee = cohort.pairs[0] if cohort.pairs else (cohort.mentor_ids[0], cohort.mentee_ids[0])
+    template = cohort.template_ids[0]
+    return [
+        ("dashboard", mentee, reverse("dashboard") + "?filter=all"),
+        ("session_detail", mentee, reverse("session_detail", args=[template])),
+        ("message_thread", mentee, reverse("message_thread", args=[mentor])),
+        ("mentor_dashboard", mentor, reverse("mentor_dashboard")),
+        ("mentor_messages", mentor, reverse("mentor_messages")),
+        ("mentor_message_thread", mentor, reverse("mentor_message_thread", args=[mentee])),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic cohort into a throwaway test database and benchmark the "
+        "dashboard views through the test client. Reports p50/p95/p99 latency, query "
+        "counts and peak Python memory per view, optionally saving JSON and failing "
+        "when results regress past a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mentors", type=int, default=5)
+        parser.add_argument("--mentees-per-mentor", type=int, default=40)
+        parser.add_argument("--unassigned", type=int, default=100)
+        parser.add_argument("--templates", type=int, default=20)
+        parser.add_argument("--completion-rate", type=float, default=0.5)
+        parser.add_argument("--messages-per-pair", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--prefix", default="bench", help="Username prefix for seeded users.")
+        parser.add_argument("--requests", type=int, default=50, help="Timed requests per view.")
+        parser.add_argument("--warmup", type=int, default=3, help="Untimed requests per view.")
+        parser.add_argument("--output", help="Write results as JSON to this path.")
+        parser.add_argument("--baseline", help="JSON results from an earlier run to compare against.")
+        parser.add_argument(
+            "--max-regression", type=float, default=1.25,
+            help="Fail if a view's p95 latency exceeds baseline * this factor (default 1.25).",
+        )
+        parser.add_argument(
+            "--use-current-db", action="store_true",
+            help="Seed into the configured database instead of creating a test database.",
+        )
+
+    def handle(self, *args, **options):
+        old_name = None
+        try:
+            setup_test_environment()
+            own_environment = True
+        except RuntimeError:
+            # already inside a test run
+            own_environment = False
+        try:
+            if not options["use_current_db"]:
+                old_name = settings.DATABASES["default"]["NAME"]
+                connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            results = self.run(options)
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+            if own_environment:
+                teardown_test_environment()
+
+        self.print_results(results)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+        if options["baseline"]:
+            self.check_regressions(results, options["baseline"], options["max_regression"])
+
+    def run(self, options):
+        seed_started = time.perf_counter()
+        cohort = seed_cohort(
+            mentors=options["mentors"],
+            mentees_per_mentor=options["mentees_per_mentor"],
+            unassigned=options["unassigned"],
+            templates=options["templates"],
+            completion_rate=options["completion_rate"],
+            messages_per_pair=options["messages_per_pair"],
+            seed=options["seed"],
+            prefix=options["prefix"],
+        )
+        seed_seconds = time.perf_counter() - seed_started
+        # with DEBUG on, seeding fills the bounded query log and CaptureQueriesContext would count 0
+        connection.queries_log.clear()
+
+        views = {}
+        for name, user_id, url in view_scenarios(cohort):
+            client = Client()
+            client.force_login(User.objects.get(pk=user_id))
+            for _ in range(options["warmup"]):
+                client.get(url)
+
+            timings = []
+            queries = []
+            for _ in range(options["requests"]):
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    response = client.get(url)
+                    timings.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    raise CommandError(f"{name} returned {response.status_code} for {url}")
+                queries.append(len(ctx.captured_queries))
+
+            # memory is traced in a separate pass; tracemalloc would skew the timings
+            tracemalloc.start()
+            for _ in range(MEMORY_SAMPLES):
+                client.get(url)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            timings.sort()
+            views[name] = {
+                "url": url,
+                "requests": len(timings),
+                "mean_ms": round(statistics.fmean(timings), 3),
+                "p50_ms": round(percentile(timings, 50), 3),
+                "p95_ms": round(percentile(timings, 95), 3),
+                "p99_ms": round(percentile(timings, 99), 3),
+                "queries": max(queries),
+                "peak_kb": round(peak / 1024, 1),
+            }
+
+        return {
+            "meta": {
+                "timestamp": datetime.now(dt_timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "seed_seconds": round(seed_seconds, 3),
+                "params": {k: options[k] for k in (
+                    "mentors", "mentees_per_mentor", "unassigned", "templates",
+                    "completion_rate", "messages_per_pair", "seed", "requests",
+                )},
+            },
+            "views": views,
+        }
+
+    def print_results(self, results):
+        header = f"{'view':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}{'peak KB':>10}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for name, row in results["views"].items():
+            self.stdout.write(
+                f"{name:<24}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+                f"{row['queries']:>9}{row['peak_kb']:>10.1f}"
+            )
+
+    def check_regressions(self, results, baseline_path, factor):
+        with open(baseline_path) as fh:
+            baseline = json.load(fh)
+        failures = []
+        for name, row in results["views"].items():
+            old = baseline.get("views", {}).get(name)
+            if not old:
+                continue
+            if row["p95_ms"] > old["p95_ms"] * factor:
+                failures.append(f"{name}: p95 {row['p95_ms']:.2f}ms > {old['p95_ms']:.2f}ms x {factor}")
+            if row["queries"] > old["queries"]:
+                failures.append(f"{name}: {row['queries']} queries > baseline {old['queries']}")
+        if failures:
+            raise CommandError("Benchmark regressions:\n  " + "\n  ".join(failures))
+        self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
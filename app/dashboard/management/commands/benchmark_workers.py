@@ -0,0 +1,228 @@
+import json
+import os
+import platform
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+
+from dashboard.synthetic import seed_cohort
+from dashboard.workers import MB, read_worker_stats
+
+from .benchmark_views import percentile, view_scenarios
+
+# gunicorn.conf.py overrides per mode
+MODES = {
+    "sync": {"GUNICORN_WORKER_CLASS": "sync", "GUNICORN_PRELOAD": "0"},
+    "gthread": {"GUNICORN_WORKER_CLASS": "gthread", "GUNICORN_PRELOAD": "0"},
+    "preload": {"GUNICORN_WORKER_CLASS": "gthread", "GUNICORN_PRELOAD": "1"},
+    "uvicorn": {"GUNICORN_WORKER_CLASS": "uvicorn_worker.UvicornWorker", "GUNICORN_PRELOAD": "1"},
+}
+STARTUP_TIMEOUT = 60
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic cohort into a throwaway SQLite database, start gunicorn with "
+        "gunicorn.conf.py in each mode (sync, gthread, gthread + preload, the shipped "
+        "uvicorn + preload) and drive the dashboard views over HTTP. Reports throughput, "
+        "latency percentiles and per-worker memory (RSS/PSS/private) per mode."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", default=",".join(MODES), help=f"Comma-separated subset of {', '.join(MODES)}.")
+        parser.add_argument("--workers", type=int, default=3)
+        parser.add_argument("--threads", type=int, default=4, help="Threads per gthread worker.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client connections.")
+        parser.add_argument("--requests", type=int, default=600, help="Timed requests per mode.")
+        parser.add_argument("--warmup", type=int, default=3, help="Untimed requests per view per mode.")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--mentors", type=int, default=5)
+        parser.add_argument("--mentees-per-mentor", type=int, default=40)
+        parser.add_argument("--messages-per-pair", type=int, default=100)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write results as JSON to this path.")
+        parser.add_argument(
+            "--use-current-db", action="store_true",
+            help="Seed into the configured database instead of a throwaway SQLite file.",
+        )
+
+    def handle(self, *args, **options):
+        modes = [m.strip() for m in options["modes"].split(",") if m.strip()]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Unknown mode(s): {', '.join(sorted(unknown))}")
+
+        workdir = tempfile.mkdtemp(prefix="benchmark-workers-")
+        env = dict(os.environ)
+        old_name = None
+        if not options["use_current_db"]:
+            if connection.vendor != "sqlite":
+                raise CommandError("The throwaway database is SQLite only; pass --use-current-db.")
+            # a file, not the in-memory test database, so the gunicorn workers can open it
+            old_name = settings.DATABASES["default"]["NAME"]
+            settings.DATABASES["default"].setdefault("TEST", {})["NAME"] = os.path.join(workdir, "db.sqlite3")
+            env["SQLITE_PATH"] = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            cohort = seed_cohort(
+                mentors=options["mentors"],
+                mentees_per_mentor=options["mentees_per_mentor"],
+                messages_per_pair=options["messages_per_pair"],
+                seed=options["seed"],
+                prefix="wbench",
+            )
+            targets = []
+            for name, user_id, url in view_scenarios(cohort):
+                client = Client()
+                client.force_login(User.objects.get(pk=user_id))
+                targets.append((name, url, client.cookies[settings.SESSION_COOKIE_NAME].value))
+            results = {
+                "meta": {
+                    "timestamp": datetime.now(dt_timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "django": django.get_version(),
+                    "cpus": os.cpu_count(),
+                    "params": {k: options[k] for k in ("workers", "threads", "concurrency", "requests")},
+                },
+                "modes": {mode: self.run_mode(mode, targets, env, workdir, options) for mode in modes},
+            }
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.print_results(results)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def run_mode(self, mode, targets, env, workdir, options):
+        base = f"http://127.0.0.1:{options['port']}"
+        stats_path = os.path.join(workdir, f"workers-{mode}.json")
+        env = {
+            **env,
+            **MODES[mode],
+            "PORT": str(options["port"]),
+            "GUNICORN_WORKERS": str(options["workers"]),
+            "GUNICORN_THREADS": str(options["threads"]),
+            "GUNICORN_STATS_PATH": stats_path,
+            "GUNICORN_MEMORY_CHECK_SECONDS": "1",
+            # measure, don't recycle
+            "GUNICORN_MAX_REQUESTS": "0",
+            "GUNICORN_WORKER_MIN_LIFETIME": "86400",
+            "LOCAL_CACHE_PATH": os.path.join(workdir, f"cache-{mode}.sqlite3"),
+        }
+        self.stdout.write(f"{mode}: starting gunicorn ({env['GUNICORN_WORKER_CLASS']}, preload={env['GUNICORN_PRELOAD']})")
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "--log-level", "warning"],
+            cwd=settings.BASE_DIR, env=env,
+        )
+        try:
+            self.wait_ready(server, base + "/")
+            startup = time.perf_counter() - started
+
+            for name, url, cookie in targets:
+                for _ in range(options["warmup"]):
+                    status, _ = fetch(base + url, cookie)
+                    if status != 200:
+                        raise CommandError(f"{mode}: {name} returned {status} for {url}")
+
+            jobs = [targets[i % len(targets)] for i in range(options["requests"])]
+            wall_started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+                responses = list(pool.map(lambda t: fetch(base + t[1], t[2]), jobs))
+            wall = time.perf_counter() - wall_started
+
+            # let the master take a sample after the load
+            time.sleep(2)
+            memory = read_worker_stats(stats_path) or {"workers": [], "total_pss": 0, "master": None}
+        finally:
+            server.send_signal(signal.SIGTERM)
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+        timings = sorted(ms for status, ms in responses)
+        workers = memory["workers"]
+        return {
+            "startup_s": round(startup, 3),
+            "requests": len(responses),
+            "errors": sum(status != 200 for status, _ in responses),
+            "rps": round(len(responses) / wall, 1),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+            "p99_ms": round(percentile(timings, 99), 3),
+            "workers": len(workers),
+            "total_pss_mb": round(memory["total_pss"] / MB, 1),
+            "worker_rss_max_mb": round(max((w["rss"] for w in workers), default=0) / MB, 1),
+            "worker_private_max_mb": round(max((w["uss"] or 0 for w in workers), default=0) / MB, 1),
+            "master_rss_mb": round((memory["master"] or {}).get("rss", 0) / MB, 1),
+        }
+
+    def wait_ready(self, server, url):
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"gunicorn exited with status {server.returncode}")
+            try:
+                if fetch(url)[0] == 200:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.05)
+        raise CommandError(f"gunicorn did not answer within {STARTUP_TIMEOUT}s")
+
+    def print_results(self, results):
+        header = (
+            f"{'mode':<10}{'start s':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"
+            f"{'PSS MB':>9}{'RSS/wkr':>9}{'priv/wkr':>10}"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for mode, row in results["modes"].items():
+            self.stdout.write(
+                f"{mode:<10}{row['startup_s']:>9.2f}{row['rps']:>9.1f}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+                f"{row['p99_ms']:>9.2f}{row['errors']:>8}{row['total_pss_mb']:>9.1f}"
+                f"{row['worker_rss_max_mb']:>9.1f}{row['worker_private_max_mb']:>10.1f}"
+            )
+        self.stdout.write("PSS = the workers' combined proportional memory; RSS/priv = largest worker.")
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # a redirect (to the login page) means the session wasn't accepted; report it
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def fetch(url, session_cookie=None):
+    """GET ``url``; return ``(status, milliseconds)``."""
+    request = urllib.request.Request(url)
+    if session_cookie:
+        request.add_header("Cookie", f"{settings.SESSION_COOKIE_NAME}={session_cookie}")
+    started = time.perf_counter()
+    try:
+        with _opener.open(request, timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as exc:
+        status = exc.code
+    return status, (time.perf_counter() - started) * 1000
@@ -0,0 +1,33 @@
+import shlex
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile the Tailwind stylesheet from the utility classes used in our templates "
+        "(run collectstatic afterwards to hash and compress it)."
+    )
+
+    def handle(self, *args, **options):
+        output = settings.TAILWIND_OUTPUT
+        output.parent.mkdir(parents=True, exist_ok=True)
+        cmd = shlex.split(settings.TAILWIND_CLI) + [
+            "--config", str(settings.BASE_DIR / "tailwind.config.js"),
+            "--input", str(settings.TAILWIND_INPUT),
+            "--output", str(output),
+            "--minify",
+        ]
+        try:
+            # content globs in tailwind.config.js are relative to BASE_DIR
+            result = subprocess.run(cmd, cwd=settings.BASE_DIR, capture_output=True, text=True)
+        except FileNotFoundError:
+            raise CommandError(
+                f"Tailwind CLI {settings.TAILWIND_CLI!r} not found; install the standalone "
+                "tailwindcss binary or set TAILWIND_CLI."
+            )
+        if result.returncode:
+            raise CommandError(f"Tailwind build failed:\n{result.stderr}")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {output} ({output.stat().st_size / 1024:.1f} KiB)"))
@@ -0,0 +1,103 @@
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from dashboard.dbpool import get_pool, pool_stats
+
+from .benchmark_views import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        "Exercise the configured database's connection pool from several threads "
+        "(each checkout is one short transaction, like a request) and report checkout "
+        "latency and pool metrics. Works against a local PostgreSQL (DATABASE_URL) or, "
+        "unpooled, the SQLite stand-in."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--checkouts", type=int, default=50, help="Checkouts per thread.")
+        parser.add_argument("--hold-ms", type=float, default=5, help="How long each checkout keeps its connection.")
+        parser.add_argument(
+            "--kill-idle", action="store_true",
+            help="PostgreSQL: terminate the pool's idle connections first, to see the checkout health check replace them.",
+        )
+
+    def handle(self, *args, **options):
+        pool = get_pool()
+        if pool is None:
+            self.stdout.write(f"{connection.vendor}: no connection pool; running unpooled.")
+        else:
+            pool.open(wait=True)
+            if options["kill_idle"]:
+                # fill the pool first so there are idle connections to kill
+                self.run(options)
+                self.kill_idle()
+
+        timings, errors, wall = self.run(options)
+        timings.sort()
+        total = options["threads"] * options["checkouts"]
+        self.stdout.write(f"{total} checkouts from {options['threads']} threads in {wall:.2f}s ({total / wall:.0f}/s)")
+        if timings:
+            self.stdout.write(
+                f"checkout ms: mean {statistics.fmean(timings):.2f}  p50 {percentile(timings, 50):.2f}  "
+                f"p95 {percentile(timings, 95):.2f}  max {timings[-1]:.2f}"
+            )
+        if errors:
+            self.stdout.write(self.style.WARNING(f"{len(errors)} failed checkouts, e.g. {errors[0]}"))
+        for alias, stats in pool_stats().items():
+            self.stdout.write(f"pool {alias!r}:")
+            for key, value in stats.items():
+                self.stdout.write(f"  {key:<20}{value:.2f}" if isinstance(value, float) else f"  {key:<20}{value}")
+        if errors and len(errors) == total:
+            raise CommandError("Every checkout failed.")
+
+    def run(self, options):
+        """Run the threads; return ``(checkout ms, errors, wall seconds)``."""
+        timings = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(options["checkouts"]):
+                started = time.perf_counter()
+                try:
+                    with connection.cursor() as cursor:
+                        waited = time.perf_counter() - started
+                        cursor.execute("SELECT 1")
+                        cursor.fetchone()
+                        time.sleep(options["hold_ms"] / 1000)
+                except Exception as exc:
+                    with lock:
+                        errors.append(repr(exc))
+                else:
+                    with lock:
+                        timings.append(waited * 1000)
+                finally:
+                    # what the end of a request does: hand the connection back to the pool
+                    connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options["threads"])]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return timings, errors, time.perf_counter() - started
+
+    def kill_idle(self):
+        database = settings.DATABASES["default"]["NAME"]
+        with connections["default"].cursor() as cursor:
+            cursor.execute(
+                "SELECT count(pg_terminate_backend(pid)) FROM pg_stat_activity "
+                "WHERE datname = %s AND pid <> pg_backend_pid() AND state = 'idle'",
+                [database],
+            )
+            killed = cursor.fetchone()[0]
+        connections["default"].close()
+        self.stdout.write(f"Terminated {killed} idle connection(s).")
@@ -0,0 +1,66 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count, Q
+
+from dashboard.models import Conversation, Message, Profile, SessionCompletion
+
+
+class Command(BaseCommand):
+    help = (
+        "Print EXPLAIN output for the dashboard's hot queries (unread counts, "
+        "thread pages, progress counts, inbox) so index regressions are visible. "
+        "Works on SQLite and PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, help="User id to plan the queries for (default: a mentor with mentees).")
+        parser.add_argument("--other", type=int, help="Second user id for thread queries (default: one of their mentees).")
+        parser.add_argument("--analyze", action="store_true", help="Use EXPLAIN ANALYZE (PostgreSQL only; runs the queries).")
+
+    def pick_users(self, options):
+        user_id = options["user"]
+        other_id = options["other"]
+        if user_id is None:
+            pair = (
+                Profile.objects.filter(assigned_mentor__isnull=False)
+                .values_list("assigned_mentor_id", "user_id")
+                .first()
+            )
+            user_id, fallback_other = pair or (User.objects.values_list("id", flat=True).first() or 1, None)
+            other_id = other_id or fallback_other
+        if other_id is None:
+            other_id = User.objects.exclude(id=user_id).values_list("id", flat=True).first() or user_id + 1
+        return user_id, other_id
+
+    def hot_queries(self, user_id, other_id):
+        return [
+            ("unread count", Message.objects.filter(recipient_id=user_id, read=False).order_by().values("id")),
+            ("unread from one sender (mark read)", Message.objects.filter(sender_id=other_id, recipient_id=user_id, read=False).order_by().values("id")),
+            ("thread page (newest first)", Message.objects.filter(
+                Q(sender_id=user_id, recipient_id=other_id) | Q(sender_id=other_id, recipient_id=user_id)
+            ).order_by("-created_at", "-id")[:51]),
+            ("progress count", SessionCompletion.objects.filter(user_id=user_id, completed=True).values("id")),
+            ("inbox", Conversation.for_user(user_id)[:100]),
+            ("mentor dashboard mentees", Profile.objects.filter(assigned_mentor_id=user_id)
+                .select_related("user")
+                .annotate(completed_count=Count("user__session_completions", filter=Q(user__session_completions__completed=True)))),
+        ]
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        explain_options = {}
+        if options["analyze"]:
+            if vendor != "postgresql":
+                self.stderr.write(self.style.WARNING("--analyze is only supported on PostgreSQL; ignoring."))
+            else:
+                explain_options = {"analyze": True, "buffers": True}
+
+        user_id, other_id = self.pick_users(options)
+        self.stdout.write(f"Database: {vendor}  user={user_id} other={other_id}")
+
+        for label, qs in self.hot_queries(user_id, other_id):
+            self.stdout.write("")
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {label}"))
+            self.stdout.write(str(qs.query))
+            self.stdout.write(qs.explain(**explain_options))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from dashboard import rendering
+
+
+class Command(BaseCommand):
+    help = (
+        "Empty the shared rendered-Markdown cache. Hit/miss counters are kept per worker "
+        "and shown on the staff query report (/admin/query-report/)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clear", action="store_true", help="Empty the cache.")
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            rendering.clear()
+            self.stdout.write(self.style.SUCCESS("Markdown cache cleared."))
+        else:
+            self.stdout.write("Hit/miss counters are per worker; see /admin/query-report/. Use --clear to empty the cache.")
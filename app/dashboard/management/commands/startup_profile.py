@@ -0,0 +1,136 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter: load the WSGI app the way gunicorn does, then
+# answer one request, timing each step from the first line of the script.
+CHILD = r"""
+import io, json, os, sys, time
+t0, wall0 = time.perf_counter(), time.time()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+import django
+t_django = time.perf_counter()
+from app.wsgi import application
+t_app = time.perf_counter()
+environ = {
+    "REQUEST_METHOD": "GET", "PATH_INFO": sys.argv[1], "QUERY_STRING": "", "SCRIPT_NAME": "",
+    "SERVER_NAME": "localhost", "SERVER_PORT": "80", "HTTP_HOST": "localhost",
+    "wsgi.url_scheme": "http", "wsgi.input": io.BytesIO(), "wsgi.errors": sys.stderr,
+}
+status = []
+b"".join(application(environ, lambda s, headers, exc_info=None: status.append(s)))
+t_first = time.perf_counter()
+print(json.dumps({
+    "wall0": wall0, "import_django": t_django - t0, "app_loaded": t_app - t0,
+    "first_response": t_first - t0, "status": status[0],
+}))
+"""
+
+SCENARIOS = {
+    # no .pyc anywhere: every module is compiled from source, as in an image
+    # built with PYTHONDONTWRITEBYTECODE and no compileall step
+    "no bytecode": {"bytecode": False, "warmup": "0"},
+    "bytecode": {"bytecode": True, "warmup": "0"},
+    "bytecode + warmup": {"bytecode": True, "warmup": "1"},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold start in fresh interpreters: interpreter start, Django/app load and "
+        "time to first response, with and without bytecode and warmup, plus a per-package "
+        "import time profile (python -X importtime)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/", help="URL path of the first request (default /).")
+        parser.add_argument("--runs", type=int, default=5, help="Runs per scenario; medians are reported.")
+        parser.add_argument("--top", type=int, default=15, help="Packages to list in the import profile.")
+        parser.add_argument("--output", help="Write results as JSON to this path.")
+
+    def handle(self, *args, **options):
+        # populate the bytecode cache so the "bytecode" scenarios really have it
+        self.spawn(options["path"], {"STARTUP_WARMUP": "1"})
+        empty_prefix = tempfile.mkdtemp(prefix="no-pycache-")
+
+        scenarios = {}
+        for name, spec in SCENARIOS.items():
+            env = {"STARTUP_WARMUP": spec["warmup"]}
+            if not spec["bytecode"]:
+                env.update(PYTHONPYCACHEPREFIX=empty_prefix, PYTHONDONTWRITEBYTECODE="1")
+            runs = [self.spawn(options["path"], env)[0] for _ in range(options["runs"])]
+            scenarios[name] = {
+                key: round(statistics.median(r[key] for r in runs) * 1000, 1)
+                for key in ("interpreter", "import_django", "app_loaded", "first_response", "total")
+            }
+
+        _, stderr = self.spawn(options["path"], {"STARTUP_WARMUP": "1"}, importtime=True)
+        results = {"path": options["path"], "scenarios": scenarios, "imports": self.import_profile(stderr)}
+        self.print_results(results, options["top"])
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def spawn(self, path, env, importtime=False):
+        cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", CHILD, path]
+        started = time.time()
+        proc = subprocess.run(
+            cmd, cwd=settings.BASE_DIR, env={**os.environ, **env}, capture_output=True, text=True,
+        )
+        total = time.time() - started
+        if proc.returncode:
+            raise CommandError(f"Startup run failed:\n{proc.stderr[-2000:]}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if not result["status"].startswith(("200", "30")):
+            raise CommandError(f"{path} answered {result['status']}")
+        result["interpreter"] = result["wall0"] - started
+        result["first_response"] += result["interpreter"]
+        result["app_loaded"] += result["interpreter"]
+        result["import_django"] += result["interpreter"]
+        result["total"] = total
+        return result, proc.stderr
+
+    def import_profile(self, stderr):
+        """Sum ``-X importtime`` self times per top-level package (ms), largest first."""
+        packages = defaultdict(lambda: {"ms": 0.0, "modules": 0})
+        slowest = []
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, module = (part.strip() for part in line[len("import time:"):].split("|"))
+            entry = packages[module.split(".")[0]]
+            entry["ms"] += int(self_us) / 1000
+            entry["modules"] += 1
+            slowest.append((int(self_us) / 1000, module))
+        ranked = sorted(packages.items(), key=lambda item: item[1]["ms"], reverse=True)
+        return {
+            "packages": [{"package": name, "ms": round(v["ms"], 2), "modules": v["modules"]} for name, v in ranked],
+            "modules": [{"module": m, "ms": round(ms, 2)} for ms, m in sorted(slowest, reverse=True)[:50]],
+        }
+
+    def print_results(self, results, top):
+        self.stdout.write(f"Cold start, first request GET {results['path']} (ms since spawn, medians):")
+        header = f"{'scenario':<20}{'interp':>9}{'django':>9}{'app':>9}{'1st resp':>10}{'exit':>9}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for name, row in results["scenarios"].items():
+            self.stdout.write(
+                f"{name:<20}{row['interpreter']:>9.1f}{row['import_django']:>9.1f}{row['app_loaded']:>9.1f}"
+                f"{row['first_response']:>10.1f}{row['total']:>9.1f}"
+            )
+        self.stdout.write("")
+        self.stdout.write("Import time by package (self time, bytecode + warmup):")
+        for row in results["imports"]["packages"][:top]:
+            self.stdout.write(f"  {row['package']:<28}{row['ms']:>9.1f} ms  {row['modules']:>4} modules")
+        self.stdout.write("Slowest modules:")
+        for row in results["imports"]["modules"][:top]:
+            self.stdout.write(f"  {row['module']:<40}{row['ms']:>9.1f} ms")
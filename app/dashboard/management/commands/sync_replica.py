@@ -0,0 +1,31 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database over the local replica (SQLITE_REPLICA_PATH), "
+        "standing in for replication when trying replica routing locally. Run it again to "
+        "catch the replica up; in between it lags like a real one."
+    )
+
+    def handle(self, *args, **options):
+        alias = settings.DATABASE_REPLICA
+        if not alias:
+            raise CommandError("No replica configured; set SQLITE_REPLICA_PATH.")
+        primary, replica = connections[DEFAULT_DB_ALIAS], connections[alias]
+        if primary.vendor != "sqlite" or replica.vendor != "sqlite":
+            raise CommandError("Only SQLite replicas are synced here; PostgreSQL ones use streaming replication.")
+
+        replica.close()
+        source = sqlite3.connect(primary.settings_dict["NAME"])
+        target = sqlite3.connect(replica.settings_dict["NAME"])
+        try:
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
+        self.stdout.write(f"Copied {primary.settings_dict['NAME']} to {replica.settings_dict['NAME']}.")
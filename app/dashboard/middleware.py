@@ -0,0 +1,335 @@
+import heapq
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.functional import SimpleLazyObject
+
+from .access import get_profile
+from .dbpool import is_pool_timeout, watch_pool_timeouts
+from . import replicas
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+# Connections are per thread, and under ASGI a sync view queries from a
+# sync_to_async thread rather than the one running the middleware. So every
+# connection gets run_query_hooks when it connects (see DashboardConfig.ready),
+# and that runs whatever hooks the current request's context has set; context
+# variables follow the request into sync_to_async threads.
+_query_hooks = ContextVar("query_hooks", default=())
+
+
+def run_query_hooks(execute, sql, params, many, context):
+    for hook in reversed(_query_hooks.get()):
+        execute = partial(hook, execute)
+    return execute(sql, params, many, context)
+
+
+def install_query_hooks(sender, connection, **kwargs):
+    if run_query_hooks not in connection.execute_wrappers:
+        connection.execute_wrappers.append(run_query_hooks)
+
+
+@contextmanager
+def query_hooks(*hooks):
+    """Run ``execute_wrapper``-style ``hooks`` on every query in this context, on any thread."""
+    token = _query_hooks.set(_query_hooks.get() + hooks)
+    try:
+        yield
+    finally:
+        _query_hooks.reset(token)
+
+
+class QueryRecorder:
+    """``execute_wrapper`` hook counting queries, DB time and the slowest statements."""
+
+    def __init__(self, keep=5):
+        self.keep = keep
+        self.count = 0
+        self.duration = 0.0
+        self._slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            entry = (elapsed, self.count, sql)
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, entry)
+            else:
+                heapq.heappushpop(self._slowest, entry)
+
+    @property
+    def slowest(self):
+        """``(seconds, sql)`` pairs, slowest first."""
+        return [(elapsed, sql) for elapsed, _, sql in sorted(self._slowest, reverse=True)]
+
+
+class QueryStats:
+    """Rolling per-view window of query counts and timings (per process)."""
+
+    def __init__(self, window=200):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._slowest = defaultdict(list)
+        self._over_budget = defaultdict(int)
+
+    def record(self, view, recorder, elapsed, over_budget):
+        with self._lock:
+            self._samples[view].append((recorder.count, recorder.duration, elapsed))
+            slowest = self._slowest[view]
+            slowest.extend(recorder.slowest)
+            slowest.sort(key=lambda item: item[0], reverse=True)
+            del slowest[recorder.keep:]
+            if over_budget:
+                self._over_budget[view] += 1
+
+    def summary(self):
+        budgets = getattr(settings, "QUERY_BUDGETS", {})
+        rows = []
+        with self._lock:
+            for view, samples in self._samples.items():
+                counts = sorted(s[0] for s in samples)
+                db_ms = sorted(s[1] * 1000 for s in samples)
+                total_ms = sorted(s[2] * 1000 for s in samples)
+                n = len(samples)
+                rows.append({
+                    "view": view,
+                    "requests": n,
+                    "queries_avg": sum(counts) / n,
+                    "queries_max": counts[-1],
+                    "db_ms_avg": sum(db_ms) / n,
+                    "db_ms_p95": db_ms[min(n - 1, int(n * 0.95))],
+                    "total_ms_p95": total_ms[min(n - 1, int(n * 0.95))],
+                    "budget": budgets.get(view),
+                    "over_budget": self._over_budget[view],
+                    "slowest": [(round(sec * 1000, 2), sql) for sec, sql in self._slowest[view]],
+                })
+        rows.sort(key=lambda row: row["queries_avg"], reverse=True)
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._slowest.clear()
+            self._over_budget.clear()
+
+
+query_stats = QueryStats()
+
+
+class QueryBudgetMiddleware:
+    """Record per-request SQL query count and DB time and enforce per-view budgets.
+
+    Uses ``execute_wrapper`` hooks (``query_hooks``) so it works with ``DEBUG=False``.
+    Budgets come from ``settings.QUERY_BUDGETS`` (URL name -> max queries);
+    exceeding one logs a warning, or raises ``QueryBudgetExceeded`` when
+    ``settings.QUERY_BUDGET_RAISE`` is on. It is off unless the
+    ``QUERY_BUDGET_RAISE=1`` env var is set; the view tests turn it on with
+    ``override_settings``.
+    A rolling per-view summary is kept in ``query_stats`` and shown to staff
+    at ``/admin/query-report/``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Stay async under ASGI so async views (login, register, SSE) aren't
+        # pushed through the single thread-sensitive sync executor.
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        recorder = self.recorder()
+        start = time.perf_counter()
+        with query_hooks(recorder):
+            response = self.get_response(request)
+        return self.finish(request, response, recorder, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        recorder = self.recorder()
+        start = time.perf_counter()
+        with query_hooks(recorder):
+            response = await self.get_response(request)
+        return self.finish(request, response, recorder, time.perf_counter() - start)
+
+    def recorder(self):
+        return QueryRecorder(keep=getattr(settings, "QUERY_REPORT_SLOWEST", 5))
+
+    def finish(self, request, response, recorder, elapsed):
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else None
+        if view is None:
+            return response
+
+        budget = getattr(settings, "QUERY_BUDGETS", {}).get(view, getattr(settings, "QUERY_BUDGET_DEFAULT", None))
+        over_budget = budget is not None and recorder.count > budget
+        query_stats.record(view, recorder, elapsed, over_budget)
+
+        if over_budget:
+            message = (
+                f"{view} ran {recorder.count} queries (budget {budget}) in "
+                f"{recorder.duration * 1000:.1f}ms; slowest: {recorder.slowest[:1]}"
+            )
+            if getattr(settings, "QUERY_BUDGET_RAISE", False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+class ProfileMiddleware:
+    """Attach lazy ``request.profile`` and ``request.is_mentor`` (see dashboard.access).
+
+    Must come after ``AuthenticationMiddleware``. Evaluated at most once per
+    request; with EmailBackend sessions the profile arrives with the user.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        request.profile = SimpleLazyObject(lambda: get_profile(request.user))
+        request.is_mentor = SimpleLazyObject(lambda: bool(request.profile and request.profile.is_mentor))
+        return self.get_response(request)
+
+
+class DatabaseBusyMiddleware:
+    """503 + Retry-After when no pooled database connection frees up in time (see dashboard.dbpool).
+
+    Goes near the top, so a timeout in the middleware below it (loading the
+    session, ``request.profile``) gets the 503 too. Those layers have already
+    turned it into a 500 by the time it gets here, so that case relies on the
+    backend flagging the request's ``TimeoutWatch``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with watch_pool_timeouts() as watch:
+            try:
+                response = self.get_response(request)
+            except Exception as exc:
+                # only reaches here with DEBUG_PROPAGATE_EXCEPTIONS
+                if not is_pool_timeout(exc):
+                    raise
+                return self.busy(request)
+        return self.finish(request, response, watch)
+
+    async def __acall__(self, request):
+        with watch_pool_timeouts() as watch:
+            try:
+                response = await self.get_response(request)
+            except Exception as exc:
+                if not is_pool_timeout(exc):
+                    raise
+                return self.busy(request)
+        return self.finish(request, response, watch)
+
+    def process_exception(self, request, exception):
+        if not is_pool_timeout(exception):
+            return None
+        return self.busy(request)
+
+    def finish(self, request, response, watch):
+        # a request that caught the timeout and still succeeded keeps its response
+        if watch.timed_out and response.status_code >= 500:
+            return self.busy(request)
+        return response
+
+    def busy(self, request):
+        logger.warning("No database connection free for %s within the pool timeout", request.path)
+        response = HttpResponse(
+            "The site is very busy right now. Please try again in a few seconds.",
+            status=503, content_type="text/plain; charset=utf-8",
+        )
+        response["Retry-After"] = str(getattr(settings, "DB_POOL_RETRY_AFTER_SECONDS", 2))
+        return response
+
+
+class ReplicaPinningMiddleware:
+    """Per-request replica routing state and read-your-writes pinning (see dashboard.replicas).
+
+    Goes above ``SessionMiddleware`` so session saves count as writes. A
+    request that changes rows sets ``REPLICA_PIN_COOKIE``. Until it expires,
+    that browser reads from the primary, as do all non-GET/HEAD requests.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICA:
+            return self.get_response(request)
+        with replicas.routing(self.pinned(request)) as state, query_hooks(state):
+            response = self.get_response(request)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICA:
+            return await self.get_response(request)
+        with replicas.routing(self.pinned(request)) as state, query_hooks(state):
+            response = await self.get_response(request)
+        return self.finish(response, state)
+
+    def pinned(self, request):
+        if request.method not in ("GET", "HEAD"):
+            return True
+        try:
+            return float(request.COOKIES.get(settings.REPLICA_PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def finish(self, response, state):
+        if state.wrote:
+            seconds = settings.REPLICA_PIN_SECONDS
+            # the expiry travels in the value too, for clients that ignore Max-Age
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, str(int(time.time() + seconds)), max_age=seconds,
+                secure=settings.SESSION_COOKIE_SECURE, httponly=True, samesite="Lax",
+            )
+        return response
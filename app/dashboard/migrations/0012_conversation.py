@@ -0,0 +1,99 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_conversations(apps, schema_editor):
+    Message = apps.get_model("dashboard", "Message")
+    Conversation = apps.get_model("dashboard", "Conversation")
+
+    summaries = {}
+    for msg in Message.objects.order_by("created_at", "id").iterator():
+        a, b = sorted((msg.sender_id, msg.recipient_id))
+        conv = summaries.setdefault((a, b), {"unread_for_a": 0, "unread_for_b": 0})
+        conv["last_message_id"] = msg.id
+        conv["last_message_at"] = msg.created_at
+        if not msg.read:
+            conv["unread_for_a" if msg.recipient_id == a else "unread_for_b"] += 1
+
+    Conversation.objects.bulk_create(
+        [
+            Conversation(user_a_id=a, user_b_id=b, **fields)
+            for (a, b), fields in summaries.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0011_sessiontemplate_mentor_content_markdown"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Conversation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("last_message_at", models.DateTimeField(blank=True, null=True)),
+                ("unread_for_a", models.PositiveIntegerField(default=0)),
+                ("unread_for_b", models.PositiveIntegerField(default=0)),
+                (
+                    "last_message",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="dashboard.message",
+                    ),
+                ),
+                (
+                    "user_a",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "user_b",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user_a", "-last_message_at"],
+                        name="conversation_a_recent_idx",
+                    ),
+                    models.Index(
+                        fields=["user_b", "-last_message_at"],
+                        name="conversation_b_recent_idx",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user_a", "user_b"), name="conversation_unique_pair"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_conversations, migrations.RunPython.noop),
+    ]
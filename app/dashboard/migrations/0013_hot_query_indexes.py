@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0012_conversation"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["sender", "recipient", "created_at", "id"],
+                name="message_pair_time_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                condition=models.Q(("read", False)),
+                fields=["recipient", "sender"],
+                name="message_unread_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sessioncompletion",
+            index=models.Index(
+                fields=["user", "completed"], name="completion_user_done_idx"
+            ),
+        ),
+    ]
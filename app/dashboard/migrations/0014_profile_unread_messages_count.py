@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:45
+
+from django.db import migrations, models
+
+
+def backfill_unread_counts(apps, schema_editor):
+    Message = apps.get_model("dashboard", "Message")
+    Profile = apps.get_model("dashboard", "Profile")
+
+    counts = (
+        Message.objects.filter(read=False)
+        .order_by()
+        .values("recipient_id")
+        .annotate(n=models.Count("id"))
+    )
+    for row in counts:
+        Profile.objects.filter(user_id=row["recipient_id"]).update(
+            unread_messages_count=row["n"]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0013_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="unread_messages_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_unread_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,340 @@
+from django.db import migrations
+
+# (text, options, 1-based answer, difficulty)
+INTRO_QUESTIONS = [
+    (
+        "Choose the correct form: 'There ___ many people at the party.'",
+        ["is", "are", "was", "be"],
+        2,
+        "easy",
+    ),
+    (
+        "Select the correct past tense: 'I ___ to the store yesterday.'",
+        ["go", "goed", "went", "gone"],
+        3,
+        "easy",
+    ),
+    (
+        "Which sentence is grammatically correct?",
+        [
+            "She don't like tea.",
+            "She doesn't likes tea.",
+            "She doesn't like tea.",
+            "She not like tea.",
+        ],
+        3,
+        "easy",
+    ),
+    (
+        "Choose the best word: 'He is very ___ about football.'",
+        ["interesting", "interested", "interest", "interestful"],
+        2,
+        "easy",
+    ),
+    (
+        "Fill the blank: 'If I ___ time, I would help you.'",
+        ["have", "had", "will have", "would have"],
+        2,
+        "medium",
+    ),
+    (
+        "Choose the correct preposition: 'She is good ___ mathematics.'",
+        ["in", "at", "on", "for"],
+        2,
+        "medium",
+    ),
+    (
+        "Select the sentence with the correct article usage.",
+        ["I saw a eagle.", "I saw an eagle.", "I saw the eagle.", "I saw eagle."],
+        2,
+        "medium",
+    ),
+    (
+        "Which word best fits: 'Their house is ___ than mine.'",
+        ["big", "bigger", "more big", "biggest"],
+        2,
+        "medium",
+    ),
+    (
+        "Choose the correct phrasal verb: 'She decided to ___ smoking.'",
+        ["give up", "put up", "take up", "bring up"],
+        1,
+        "medium",
+    ),
+    (
+        "Identify the correct passive form: 'They will finish the project next week.' →",
+        [
+            "The project will be finished next week.",
+            "The project will finished next week.",
+            "The project is finished next week.",
+            "The project be finished next week.",
+        ],
+        1,
+        "medium",
+    ),
+    (
+        "Choose the word closest in meaning to 'abundant'.",
+        ["scarce", "plentiful", "tiny", "rare"],
+        2,
+        "medium",
+    ),
+    (
+        "Which is the correct conditional: 'If he ___ earlier, he would have caught the train.'",
+        ["arrived", "had arrived", "has arrived", "would arrive"],
+        2,
+        "hard",
+    ),
+    (
+        "Choose the best connector: '___ she was tired, she finished her work.'",
+        ["Although", "Because", "So", "Therefore"],
+        1,
+        "hard",
+    ),
+    (
+        "Identify the error: 'Neither of the answers are correct.'",
+        ["Neither", "of", "are", "correct"],
+        3,
+        "hard",
+    ),
+    (
+        "Choose the correct tense: 'By this time next year, I ___ my degree.'",
+        ["will finish", "will have finished", "finished", "have finished"],
+        2,
+        "hard",
+    ),
+    (
+        "Pick the most formal synonym for 'get' in the sentence: 'We need to get permission.'",
+        ["obtain", "have", "fetch", "take"],
+        1,
+        "hard",
+    ),
+    (
+        "Choose the sentence with correct subject-verb agreement.",
+        [
+            "Each of the students have a book.",
+            "Each of the students has a book.",
+            "Each of the student have a book.",
+            "Each of the students are having a book.",
+        ],
+        2,
+        "medium",
+    ),
+    (
+        "Which word best completes the collocation: '___ a decision'",
+        ["Make", "Do", "Take", "Have"],
+        1,
+        "easy",
+    ),
+    (
+        "Choose the correct reported speech: 'He said, \"I am tired.\"' →",
+        [
+            "He said that he is tired.",
+            "He said that he was tired.",
+            "He said he will be tired.",
+            "He said that he had been tired.",
+        ],
+        2,
+        "medium",
+    ),
+    (
+        "Fill in the blank with the correct preposition: 'She is keen ___ learning languages.'",
+        ["in", "on", "for", "about"],
+        4,
+        "medium",
+    ),
+]
+
+END_QUESTIONS = [
+    (
+        "Choose the best option: If I ___ earlier, I would have helped.",
+        ["had arrived", "arrived", "have arrived", "would arrive"],
+        1,
+        "hard",
+    ),
+    (
+        "Which sentence is most natural?",
+        [
+            "Despite of the rain, we went out.",
+            "Although the rain, we went out.",
+            "Although it rained, we went out.",
+            "Despite it was raining, we went out.",
+        ],
+        3,
+        "hard",
+    ),
+    (
+        "Choose the best collocation: to ___ a decision.",
+        ["make", "have", "take", "do"],
+        1,
+        "medium",
+    ),
+    (
+        "Which is the correct passive: 'They will have finished the work.' →",
+        [
+            "The work will be finished by them.",
+            "The work will have been finished.",
+            "The work will be finish.",
+            "The work will have finished.",
+        ],
+        2,
+        "hard",
+    ),
+    (
+        "Select the sentence without error.",
+        [
+            "Neither of the books are interesting.",
+            "Neither of the books is interesting.",
+            "Neither the books are interesting.",
+            "Neither of the books were interesting.",
+        ],
+        2,
+        "hard",
+    ),
+    (
+        "Choose the correct modal: You ___ have told me earlier.",
+        ["should", "must", "might", "couldn't"],
+        1,
+        "medium",
+    ),
+    (
+        "Pick the best meaning of 'albeit' in context:",
+        ["although", "because", "so that", "unless"],
+        1,
+        "hard",
+    ),
+    (
+        "Choose the correct reduction: 'I have to' →",
+        ["I hafta", "I have to", "I'va", "I gotta"],
+        1,
+        "medium",
+    ),
+    (
+        "Which is more formal? 'Ask' vs 'request' → choose the most formal.",
+        ["ask", "request", "tell", "order"],
+        2,
+        "medium",
+    ),
+    (
+        "Choose the correct preposition: 'He is good ___ managing people.'",
+        ["in", "at", "on", "for"],
+        2,
+        "medium",
+    ),
+    (
+        "Identify the most appropriate link word: '___ he was tired, he continued.'",
+        ["Although", "Because", "So", "Therefore"],
+        1,
+        "hard",
+    ),
+    (
+        "Choose the right conditional: 'If she ___ known, she would have acted.'",
+        ["has", "had", "have", "was"],
+        2,
+        "hard",
+    ),
+    (
+        "Choose the correct collocation: 'to ___ a contribution'",
+        ["make", "do", "take", "have"],
+        1,
+        "medium",
+    ),
+    (
+        "Which sentence uses reported speech correctly?",
+        [
+            "She said she will come.",
+            "She said she would come.",
+            "She said she comes.",
+            "She said she'll come.",
+        ],
+        2,
+        "medium",
+    ),
+    (
+        "Choose the most precise verb: 'to improve' — which is more intense?",
+        ["enhance", "get better", "fix", "alter"],
+        1,
+        "medium",
+    ),
+    (
+        "Which word completes: 'He has a good command ___ English.'",
+        ["on", "of", "in", "for"],
+        3,
+        "medium",
+    ),
+    (
+        "Choose the sentence with correct agreement.",
+        [
+            "Each of them are ready.",
+            "Each of them is ready.",
+            "Each of them were ready.",
+            "Each of them have been ready.",
+        ],
+        2,
+        "medium",
+    ),
+    (
+        "Pick the best paraphrase for 'nevertheless'",
+        ["therefore", "however", "because", "as a result"],
+        2,
+        "medium",
+    ),
+    (
+        "Choose the correct tense: 'By next year I ___ my thesis.'",
+        ["will finish", "will have finished", "finished", "have finished"],
+        2,
+        "hard",
+    ),
+    (
+        "Select the best collocation: 'strongly ___'",
+        ["advise", "advocate", "recommend", "suggest"],
+        3,
+        "medium",
+    ),
+]
+
+BANKS = [
+    ("intro", "Beginning English Assessment", INTRO_QUESTIONS),
+    ("end", "End English Assessment (B2)", END_QUESTIONS),
+]
+
+
+def seed_question_banks(apps, schema_editor):
+    QuestionBank = apps.get_model("dashboard", "QuestionBank")
+    Question = apps.get_model("dashboard", "Question")
+    for slug, title, questions in BANKS:
+        bank, created = QuestionBank.objects.get_or_create(
+            slug=slug, defaults={"title": title}
+        )
+        if not created:
+            continue
+        Question.objects.bulk_create(
+            [
+                Question(
+                    bank=bank,
+                    order=i,
+                    text=text,
+                    options=options,
+                    answer=answer,
+                    difficulty=difficulty,
+                )
+                for i, (text, options, answer, difficulty) in enumerate(
+                    questions, start=1
+                )
+            ]
+        )
+
+
+def remove_question_banks(apps, schema_editor):
+    QuestionBank = apps.get_model("dashboard", "QuestionBank")
+    QuestionBank.objects.filter(slug__in=[slug for slug, _, _ in BANKS]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0015_question_bank"),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_question_banks, remove_question_banks),
+    ]
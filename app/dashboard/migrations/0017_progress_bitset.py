@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:55
+
+from django.db import migrations, models
+
+
+def backfill_progress(apps, schema_editor):
+    SessionTemplate = apps.get_model("dashboard", "SessionTemplate")
+    SessionCompletion = apps.get_model("dashboard", "SessionCompletion")
+    Profile = apps.get_model("dashboard", "Profile")
+
+    slots = {}
+    for slot, template in enumerate(
+        SessionTemplate.objects.order_by("order", "created_at", "id")
+    ):
+        template.progress_slot = slot
+        template.save(update_fields=["progress_slot"])
+        slots[template.id] = slot
+
+    per_user = {}
+    for user_id, template_id in (
+        SessionCompletion.objects.filter(completed=True)
+        .values_list("user_id", "template_id")
+        .iterator()
+    ):
+        per_user.setdefault(user_id, []).append(slots[template_id])
+
+    for user_id, user_slots in per_user.items():
+        buf = bytearray(max(user_slots) // 8 + 1)
+        for slot in user_slots:
+            buf[slot >> 3] |= 1 << (slot & 7)
+        Profile.objects.filter(user_id=user_id).update(
+            progress_bits=bytes(buf), completed_sessions_count=len(user_slots)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0016_seed_question_banks"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="completed_sessions_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="progress_bits",
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.AddField(
+            model_name="sessiontemplate",
+            name="progress_slot",
+            field=models.PositiveIntegerField(editable=False, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:12
+
+from django.db import migrations
+
+# auth.User belongs to another app, so the functional index is created with SQL
+# (valid on both SQLite and PostgreSQL). It serves lower(email) lookups made by
+# dashboard.backends.EmailBackend.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0017_progress_bitset"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS "auth_user_email_lower_idx" ON "auth_user" (LOWER("email"));',
+            reverse_sql='DROP INDEX IF EXISTS "auth_user_email_lower_idx";',
+        ),
+    ]
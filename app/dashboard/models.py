@@ -1,7 +1,10 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Greatest
 from django.utils import timezone
 
+from . import progress, pubsub
+
 
 # Meeting tool choices
 MEETING_TOOL_CHOICES = [
@@ -27,6 +30,8 @@ class SessionTemplate(models.Model):
 	mentor_content_markdown = models.TextField(blank=True, help_text="Mentor-only notes and guidance (Markdown allowed)")
 	order = models.PositiveIntegerField(default=0, help_text="Ordering for display")
 	created_at = models.DateTimeField(default=timezone.now)
+	# Bit position in Profile.progress_bits; assigned once, never reused (see dashboard.progress)
+	progress_slot = models.PositiveIntegerField(unique=True, null=True, editable=False)
 
 	class Meta:
 		ordering = ["order", "-created_at"]
@@ -34,6 +39,16 @@ class SessionTemplate(models.Model):
 	def __str__(self):
 		return self.title
 
+	def save(self, *args, **kwargs):
+		if self.progress_slot is None:
+			self.progress_slot = SessionTemplate.next_progress_slot()
+		super().save(*args, **kwargs)
+
+	@staticmethod
+	def next_progress_slot():
+		current = SessionTemplate.objects.aggregate(m=models.Max("progress_slot"))["m"]
+		return 0 if current is None else current + 1
+
 
 class SessionCompletion(models.Model):
 	"""Per-user completion record for a SessionTemplate."""
@@ -46,6 +61,44 @@ class SessionCompletion(models.Model):
 
 	class Meta:
 		unique_together = ("user", "template")
+		indexes = [
+			# progress counts: filter(user=..., completed=True)
+			models.Index(fields=["user", "completed"], name="completion_user_done_idx"),
+		]
+
+	@classmethod
+	def apply_completed_set(cls, user, template_ids, existing, completed_ids):
+		"""Make ``completed_ids`` the user's completed templates, writing only the rows that change.
+
+		``existing`` maps template id -> SessionCompletion for the user. The diff
+		is applied with one bulk_create and one bulk_update (completed fields
+		only) inside a single transaction. Returns the number of rows changed.
+		"""
+		now = timezone.now()
+		to_create = []
+		to_update = []
+		for template_id in template_ids:
+			comp = existing.get(template_id)
+			if template_id in completed_ids:
+				if comp is None:
+					to_create.append(cls(user=user, template_id=template_id, completed=True, completed_at=now))
+				elif not comp.completed:
+					comp.completed = True
+					comp.completed_at = comp.completed_at or now
+					to_update.append(comp)
+			elif comp is not None and comp.completed:
+				comp.completed = False
+				comp.completed_at = None
+				to_update.append(comp)
+
+		with transaction.atomic():
+			if to_create:
+				cls.objects.bulk_create(to_create)
+			if to_update:
+				cls.objects.bulk_update(to_update, ["completed", "completed_at"])
+			if to_create or to_update:
+				Profile.refresh_progress(user.id)
+		return len(to_create) + len(to_update)
 
 	def __str__(self):
 		return f"{self.user.username} - {self.template.title} ({'done' if self.completed else 'todo'})"
@@ -76,6 +129,12 @@ class Profile(models.Model):
 	updated_at = models.DateTimeField(auto_now=True)	
 	# Is this user a mentor?
 	is_mentor = models.BooleanField(default=False)
+	# Messages received but not yet read; maintained by Conversation.record_message/mark_read
+	unread_messages_count = models.PositiveIntegerField(default=0)
+	# Completed sessions as a bitset over SessionTemplate.progress_slot, plus its popcount;
+	# maintained by Profile.refresh_progress whenever a SessionCompletion changes
+	progress_bits = models.BinaryField(default=bytes, editable=False)
+	completed_sessions_count = models.PositiveIntegerField(default=0)
 
 
 	def __str__(self):
@@ -89,6 +148,19 @@ class Profile(models.Model):
 		"""
 		return SessionCompletion.objects.filter(user=self.user, completed=True)
 
+	def has_completed(self, template):
+		return progress.has_slot(self.progress_bits, template.progress_slot)
+
+	@classmethod
+	def refresh_progress(cls, user_id):
+		"""Recompute the user's progress bitset and completed count from SessionCompletion."""
+		slots = list(
+			SessionCompletion.objects.filter(user_id=user_id, completed=True).values_list("template__progress_slot", flat=True)
+		)
+		bits = progress.bits_from_slots(slots)
+		cls.objects.filter(user_id=user_id).update(progress_bits=bits, completed_sessions_count=len(slots))
+		return bits, len(slots)
+
 
 class Message(models.Model):
 	"""Simple one-to-one message between users (mentor/mentee).
@@ -106,20 +178,230 @@ class Message(models.Model):
 
 	class Meta:
 		ordering = ['-created_at']
+		indexes = [
+			# thread pages: (sender, recipient) ordered by (created_at, id), one scan per direction
+			models.Index(fields=["sender", "recipient", "created_at", "id"], name="message_pair_time_idx"),
+			# unread badge / mark-read: filter(recipient=..., [sender=...], read=False)
+			models.Index(fields=["recipient", "sender"], condition=models.Q(read=False), name="message_unread_idx"),
+		]
+
+	@classmethod
+	def between(cls, user1, user2):
+		"""All messages exchanged between two users (either direction)."""
+		return cls.objects.filter(models.Q(sender=user1, recipient=user2) | models.Q(sender=user2, recipient=user1))
 
 	def __str__(self):
 		return f"Message from {self.sender.username} to {self.recipient.username} at {self.created_at.isoformat()}"
 
+	def save(self, *args, **kwargs):
+		# the post_save signal updates the conversation and unread counters;
+		# keep them in the same transaction as the message row
+		with transaction.atomic():
+			super().save(*args, **kwargs)
+
+
+DIFFICULTY_CHOICES = [
+	("easy", "Easy"),
+	("medium", "Medium"),
+	("hard", "Hard"),
+]
+
+
+class QuestionBank(models.Model):
+	"""A multiple-choice test (e.g. the intro and end English tests).
+
+	``version`` is bumped whenever the bank or one of its questions changes;
+	workers compare it against their precompiled copy (see
+	dashboard.question_bank) and cached test pages are keyed on it.
+	"""
+
+	slug = models.SlugField(unique=True)
+	title = models.CharField(max_length=200)
+	version = models.PositiveIntegerField(default=1)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	def __str__(self):
+		return self.title
+
+	def save(self, *args, **kwargs):
+		if self.pk:
+			self.version += 1
+		super().save(*args, **kwargs)
+
+	def bump_version(self):
+		QuestionBank.objects.filter(pk=self.pk).update(version=models.F("version") + 1)
+
+
+class Question(models.Model):
+	"""One multiple-choice question; ``answer`` is the 1-based index of the correct option."""
+
+	bank = models.ForeignKey(QuestionBank, related_name="questions", on_delete=models.CASCADE)
+	order = models.PositiveIntegerField(default=0)
+	text = models.TextField()
+	options = models.JSONField(default=list, help_text="List of answer options")
+	answer = models.PositiveSmallIntegerField(help_text="1-based index of the correct option")
+	difficulty = models.CharField(max_length=10, choices=DIFFICULTY_CHOICES, default="medium")
+
+	class Meta:
+		ordering = ["order", "id"]
+
+	def __str__(self):
+		return self.text
+
+
+class Conversation(models.Model):
+	"""Denormalized summary of the messages between two users.
+
+	One row per user pair, stored with ``user_a_id < user_b_id``. It keeps a
+	pointer to the latest message and how many messages each side has not read
+	yet, so the inbox can be listed without scanning ``Message``. Rows are
+	maintained by ``record_message`` (on Message creation) and ``mark_read``.
+	"""
+
+	user_a = models.ForeignKey(settings.AUTH_USER_MODEL, related_name="+", on_delete=models.CASCADE)
+	user_b = models.ForeignKey(settings.AUTH_USER_MODEL, related_name="+", on_delete=models.CASCADE)
+	last_message = models.ForeignKey("Message", related_name="+", null=True, blank=True, on_delete=models.SET_NULL)
+	last_message_at = models.DateTimeField(null=True, blank=True)
+	unread_for_a = models.PositiveIntegerField(default=0)
+	unread_for_b = models.PositiveIntegerField(default=0)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["user_a", "user_b"], name="conversation_unique_pair"),
+		]
+		indexes = [
+			models.Index(fields=["user_a", "-last_message_at"], name="conversation_a_recent_idx"),
+			models.Index(fields=["user_b", "-last_message_at"], name="conversation_b_recent_idx"),
+		]
+
+	def __str__(self):
+		return f"Conversation {self.user_a_id} <-> {self.user_b_id}"
+
+	@staticmethod
+	def pair_ids(user1_id, user2_id):
+		return (user1_id, user2_id) if user1_id < user2_id else (user2_id, user1_id)
+
+	@classmethod
+	def for_pair(cls, user1_id, user2_id):
+		a, b = cls.pair_ids(user1_id, user2_id)
+		conversation, _ = cls.objects.get_or_create(user_a_id=a, user_b_id=b)
+		return conversation
+
+	@classmethod
+	def for_user(cls, user):
+		"""Conversations involving ``user``, most recent first."""
+		return cls.objects.filter(models.Q(user_a=user) | models.Q(user_b=user)).order_by(models.F("last_message_at").desc(nulls_last=True))
+
+	def other_user_id(self, user_id):
+		return self.user_b_id if user_id == self.user_a_id else self.user_a_id
+
+	def unread_for(self, user_id):
+		return self.unread_for_a if user_id == self.user_a_id else self.unread_for_b
+
+	@classmethod
+	def record_message(cls, message):
+		"""Point the pair's conversation at ``message`` and bump the recipient's unread count.
+
+		Runs from ``Message``'s post_save, inside the transaction ``Message.save`` opens.
+		"""
+		with transaction.atomic():
+			conversation = cls.for_pair(message.sender_id, message.recipient_id)
+			counter = "unread_for_a" if message.recipient_id == conversation.user_a_id else "unread_for_b"
+			updates = {counter: models.F(counter) + 1}
+			newer = models.Q(last_message_at__isnull=True) | models.Q(last_message_at__lte=message.created_at)
+			cls.objects.filter(pk=conversation.pk).update(**updates)
+			Profile.objects.filter(user_id=message.recipient_id).update(unread_messages_count=models.F("unread_messages_count") + 1)
+			cls.objects.filter(newer, pk=conversation.pk).update(last_message=message, last_message_at=message.created_at)
+			event = {"type": "message", "id": message.id, "from": message.sender_id, "to": message.recipient_id}
+			pubsub.publish(pubsub.user_channel(message.recipient_id), event)
+			pubsub.publish(pubsub.user_channel(message.sender_id), event)
+
+	@classmethod
+	def mark_read(cls, reader, other, up_to=None):
+		"""Mark what ``other`` sent to ``reader`` as read and lower the reader's counters.
+
+		``up_to`` limits it to messages with ids up to that one, the newest
+		the reader was shown; a view reading from a lagging replica must not
+		mark messages it never rendered. Returns the number marked read.
+		"""
+		unread = Message.objects.filter(sender=other, recipient=reader, read=False)
+		if up_to is not None:
+			unread = unread.filter(id__lte=up_to)
+		with transaction.atomic():
+			marked = unread.update(read=True, read_at=timezone.now())
+			if marked:
+				a, b = cls.pair_ids(reader.id, other.id)
+				counter = "unread_for_a" if reader.id == a else "unread_for_b"
+				left = 0 if up_to is None else Greatest(models.F(counter) - marked, 0)
+				cls.objects.filter(user_a_id=a, user_b_id=b).update(**{counter: left})
+				Profile.objects.filter(user=reader).update(
+					unread_messages_count=Greatest(models.F("unread_messages_count") - marked, 0)
+				)
+				pubsub.publish(pubsub.user_channel(reader.id), {"type": "read", "from": other.id, "count": marked})
+		if marked and Profile.user.field.remote_field.is_cached(reader):
+			# keep the request's cached profile in step so the badge renders the new count
+			profile = reader.profile
+			profile.unread_messages_count = max(profile.unread_messages_count - marked, 0)
+		return marked
+
 
 # Signal to create Profile when a new user is created.
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_or_update_user_profile(sender, instance, created, **kwargs):
+	# Only on create: every later save (e.g. the last_login update on each
+	# login) would otherwise cost a lookup. Users that predate their profile
+	# get one from dashboard.access.get_profile.
 	if created:
 		Profile.objects.create(user=instance)
-	else:
-		# ensure profile exists and update timestamp
-		Profile.objects.get_or_create(user=instance)
+
+
+@receiver(pre_save, sender=SessionTemplate)
+def invalidate_session_template_markdown(sender, instance, **kwargs):
+	"""Drop cached renders of the content being replaced when a template is edited."""
+	if not instance.pk:
+		return
+	from .rendering import invalidate_markdown
+	old = SessionTemplate.objects.filter(pk=instance.pk).values_list("content_markdown", "mentor_content_markdown").first()
+	if old:
+		invalidate_markdown(*[text for text in old if text])
+
+
+@receiver(post_delete, sender=SessionTemplate)
+def invalidate_deleted_session_template_markdown(sender, instance, **kwargs):
+	from .rendering import invalidate_markdown
+	invalidate_markdown(instance.content_markdown, instance.mentor_content_markdown)
+
+
+@receiver(post_save, sender=SessionTemplate)
+@receiver(post_delete, sender=SessionTemplate)
+def bump_session_catalog_version(sender, instance, **kwargs):
+	"""Make every worker reload its SessionTemplate catalog.
+
+	Bumped immediately for this process and again on commit, so a worker that
+	reloads in between cannot keep pre-commit rows under the new version.
+	"""
+	from .catalog import bump_version
+	bump_version()
+	transaction.on_commit(bump_version)
+
+
+@receiver(post_save, sender=Message)
+def update_conversation_on_message(sender, instance, created, **kwargs):
+	if created:
+		Conversation.record_message(instance)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def bump_question_bank_version(sender, instance, **kwargs):
+	QuestionBank(pk=instance.bank_id).bump_version()
+
+
+@receiver(post_save, sender=SessionCompletion)
+@receiver(post_delete, sender=SessionCompletion)
+def refresh_progress_on_completion_change(sender, instance, **kwargs):
+	Profile.refresh_progress(instance.user_id)
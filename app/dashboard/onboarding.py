@@ -0,0 +1,295 @@
+"""Bulk cohort onboarding from CSV or JSON Lines.
+
+Rows are streamed and processed in batches; each batch is validated with a
+handful of set-based queries (existing emails, mentor emails, username
+prefixes) and written with ``bulk_create`` in its own
+transaction, so memory stays flat however large the file is. ``bulk_create``
+sends no ``post_save``, so profiles are created directly, mentors
+pre-assigned.
+
+Recognised columns: ``email`` (required), ``username``, ``first_name``,
+``last_name``, ``is_mentor`` and ``mentor`` (a mentor's email; the mentor may
+already exist or appear earlier in the same file), and ``password``. Rows
+without a password get an unusable one. Each password is hashed at full
+strength, which dominates the run time when most rows have one: a batch's
+passwords are hashed on ``hash_workers`` threads (``hashlib`` releases the
+GIL), dry runs skip hashing, and the admin upload takes at most
+``ADMIN_MAX_PASSWORDS`` of them so it finishes within the request timeout.
+
+A bad row is skipped and reported, not fatal to its batch. ``ImportResult``
+counts every skipped row but keeps the reasons for only the first
+``MAX_ERRORS``.
+"""
+import csv
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from .models import Profile
+
+FORMATS = ("csv", "jsonl")
+TRUE_VALUES = {"1", "true", "yes", "y", "on"}
+USERNAME_MAX_LENGTH = User._meta.get_field("username").max_length
+EMAIL_MAX_LENGTH = User._meta.get_field("email").max_length
+# characters allowed by User's username validator
+USERNAME_INVALID = re.compile(r"[^\w.@+-]")
+# base names per username prefix query
+PREFIX_QUERY_CHUNK = 50
+DIGITS = "0123456789"
+# rows with a password the admin upload accepts; larger files go through
+# manage.py import_cohort, which has no request timeout
+ADMIN_MAX_PASSWORDS = 50
+# skipped rows whose reasons are kept; the rest are only counted
+MAX_ERRORS = 1000
+
+
+class OnboardingError(Exception):
+    pass
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    mentors: int = 0
+    assigned: int = 0
+    skipped: int = 0
+    # (row number, message) for the first MAX_ERRORS skipped rows
+    errors: list = field(default_factory=list)
+
+    def skip(self, number, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append((number, message))
+
+
+def read_rows(fh, fmt):
+    """Yield ``(row_number, dict)`` from a text stream in ``fmt`` (csv or jsonl)."""
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(fh), start=2):
+            yield number, row
+    elif fmt == "jsonl":
+        for number, line in enumerate(fh, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield number, {"_error": f"invalid JSON: {exc}"}
+                continue
+            yield number, row if isinstance(row, dict) else {"_error": "expected a JSON object"}
+    else:
+        raise OnboardingError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}.")
+
+
+def count_passwords(rows):
+    return sum(1 for _, row in rows if "_error" not in row and _text(row, "password"))
+
+
+def detect_format(name):
+    return "jsonl" if name.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def _text(row, key):
+    value = row.get(key)
+    return "" if value is None else str(value).strip()
+
+
+def _flag(row, key):
+    value = row.get(key)
+    if isinstance(value, bool):
+        return value
+    return _text(row, key).lower() in TRUE_VALUES
+
+
+def username_base(email):
+    """The auto-generated username stem for ``email``, as ``register`` makes it."""
+    base = USERNAME_INVALID.sub("", email.split("@")[0]) or "user"
+    # leave room for a numeric suffix
+    return base[:USERNAME_MAX_LENGTH - 6]
+
+
+def allocate_usernames(bases):
+    """Return ``{base: iterator of free usernames}``.
+
+    Each base name costs one ``startswith`` condition; conditions are OR-ed
+    together ``PREFIX_QUERY_CHUNK`` at a time, so a batch needs a few queries
+    however many distinct names it has. Matching is case-sensitive, like the
+    ``register`` loop, and index-backed (see ``_prefix``).
+    """
+    bases = sorted(bases)
+    taken = {base: set() for base in bases}
+    # only "<base>" and "<base><digits>" can collide, so index bases by their digit-less root
+    by_root = {}
+    for base in bases:
+        by_root.setdefault(base.rstrip(DIGITS), []).append(base)
+    for i in range(0, len(bases), PREFIX_QUERY_CHUNK):
+        condition = Q()
+        for base in bases[i:i + PREFIX_QUERY_CHUNK]:
+            condition |= _prefix(base)
+        for name in User.objects.filter(condition).values_list("username", flat=True):
+            for base in by_root.get(name.rstrip(DIGITS), ()):
+                if name.startswith(base):
+                    taken[base].add(name)
+    return {base: _free_names(base, names) for base, names in taken.items()}
+
+
+def _prefix(base):
+    if connection.vendor == "sqlite":
+        # SQLite's LIKE can't use the username index; with the default BINARY
+        # collation a range is the same case-sensitive prefix match and can.
+        return Q(username__gte=base, username__lt=base + "\U0010ffff")
+    return Q(username__startswith=base)
+
+
+def _free_names(base, taken):
+    if base not in taken:
+        yield base
+    i = 0
+    while True:
+        i += 1
+        candidate = f"{base}{i}"
+        if candidate not in taken:
+            yield candidate
+
+
+def import_cohort(rows, batch_size=500, dry_run=False, progress=None, hash_workers=1):
+    """Create users and profiles from ``(row_number, dict)`` pairs; return an ``ImportResult``.
+
+    ``progress``, if given, is called as ``progress(result)`` after each batch.
+    With ``dry_run`` every batch is validated and written (passwords unhashed),
+    then rolled back.
+    """
+    result = ImportResult()
+    rows = iter(rows)
+    with ThreadPoolExecutor(max_workers=hash_workers, thread_name_prefix="onboarding-hash") as hasher:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                _import_batch(batch, result, None if dry_run else hasher)
+                if dry_run:
+                    transaction.set_rollback(True)
+            if progress:
+                progress(result)
+    return result
+
+
+def _import_batch(batch, result, hasher):
+    # 1. parse and validate each row on its own
+    parsed = []
+    seen = set()
+    for number, row in batch:
+        if "_error" in row:
+            result.skip(number, row["_error"])
+            continue
+        email = _text(row, "email").lower()
+        try:
+            validate_email(email)
+        except ValidationError:
+            result.skip(number, f"invalid email {email!r}")
+            continue
+        if len(email) > EMAIL_MAX_LENGTH:
+            result.skip(number, f"email {email} is longer than {EMAIL_MAX_LENGTH} characters")
+            continue
+        if email in seen:
+            result.skip(number, f"duplicate email {email} in file")
+            continue
+        seen.add(email)
+        parsed.append({
+            "number": number,
+            "email": email,
+            "username": _text(row, "username"),
+            "first_name": _text(row, "first_name")[:150],
+            "last_name": _text(row, "last_name")[:150],
+            "is_mentor": _flag(row, "is_mentor"),
+            "mentor": _text(row, "mentor").lower(),
+            "password": _text(row, "password"),
+        })
+
+    # 2. set-based checks against the database
+    existing = set(
+        User.objects.annotate(email_lower=Lower("email"))
+        .filter(email_lower__in=[p["email"] for p in parsed])
+        .values_list("email_lower", flat=True)
+    ) if parsed else set()
+    wanted = [p["username"] for p in parsed if p["username"]]
+    taken_usernames = {
+        name.lower() for name in User.objects.alias(username_lower=Lower("username"))
+        .filter(username_lower__in=[name.lower() for name in wanted])
+        .values_list("username", flat=True)
+    } if wanted else set()
+    batch_mentors = {p["email"] for p in parsed if p["is_mentor"] and p["email"] not in existing}
+    outside = {p["mentor"] for p in parsed if p["mentor"]} - batch_mentors
+    mentor_ids = dict(
+        User.objects.annotate(email_lower=Lower("email"))
+        .filter(email_lower__in=outside, profile__is_mentor=True)
+        .values_list("email_lower", "id")
+    ) if outside else {}
+
+    valid = []
+    for p in parsed:
+        if p["email"] in existing:
+            result.skip(p["number"], f"{p['email']} is already registered")
+        elif p["username"] and p["username"].lower() in taken_usernames:
+            result.skip(p["number"], f"username {p['username']} is already taken")
+        elif p["username"] and USERNAME_INVALID.search(p["username"]):
+            result.skip(p["number"], f"invalid username {p['username']!r}")
+        elif len(p["username"]) > USERNAME_MAX_LENGTH:
+            result.skip(p["number"], f"username {p['username']} is longer than {USERNAME_MAX_LENGTH} characters")
+        elif p["mentor"] and p["mentor"] not in mentor_ids and p["mentor"] not in batch_mentors:
+            result.skip(p["number"], f"unknown mentor {p['mentor']}")
+        else:
+            if p["username"]:
+                taken_usernames.add(p["username"].lower())
+            valid.append(p)
+    if not valid:
+        return
+
+    # 3. usernames: chunked prefix queries (see allocate_usernames); explicit names reserved above
+    allocators = allocate_usernames({username_base(p["email"]) for p in valid if not p["username"]})
+    unusable = make_password(None)
+    # a dry run is rolled back, so it needn't pay for the hashing
+    passwords = [p["password"] for p in valid if p["password"]]
+    hashes = iter(hasher.map(make_password, passwords) if hasher else [unusable] * len(passwords))
+    users = []
+    for p in valid:
+        if not p["username"]:
+            allocator = allocators[username_base(p["email"])]
+            name = next(allocator)
+            while name.lower() in taken_usernames:
+                name = next(allocator)
+            taken_usernames.add(name.lower())
+            p["username"] = name
+        users.append(User(
+            username=p["username"],
+            email=p["email"],
+            first_name=p["first_name"],
+            last_name=p["last_name"],
+            password=next(hashes) if p["password"] else unusable,
+        ))
+    users = User.objects.bulk_create(users)
+
+    # 4. profiles, with mentors from this batch resolved to their new ids
+    for p, user in zip(valid, users):
+        if p["is_mentor"]:
+            mentor_ids[p["email"]] = user.id
+    profiles = []
+    for p, user in zip(valid, users):
+        mentor_id = mentor_ids.get(p["mentor"]) if p["mentor"] else None
+        profiles.append(Profile(user=user, is_mentor=p["is_mentor"], assigned_mentor_id=mentor_id))
+        result.mentors += p["is_mentor"]
+        result.assigned += mentor_id is not None
+    Profile.objects.bulk_create(profiles)
+    result.created += len(users)
@@ -0,0 +1,58 @@
+"""Keyset (cursor) pagination for message threads.
+
+Threads are paged on ``(created_at, id)`` rather than with OFFSET, so loading
+an older page or polling for new messages costs the same no matter how long
+the conversation is. Cursors are opaque url-safe strings encoding the
+position of a message.
+"""
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(message):
+    raw = f"{message.created_at.isoformat()}|{message.pk}"
+    return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return ``(created_at, id)`` for a cursor produced by ``encode_cursor``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii")
+        ts, pk = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(pk)
+    except (ValueError, UnicodeError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+def page_before(queryset, cursor=None, limit=50):
+    """Return the newest ``limit`` messages older than ``cursor``.
+
+    Messages come back in chronological order, together with the cursor for
+    the next older page (``None`` when there is nothing older).
+    """
+    qs = queryset
+    if cursor:
+        ts, pk = decode_cursor(cursor)
+        qs = qs.filter(Q(created_at__lt=ts) | Q(created_at=ts, id__lt=pk))
+    rows = list(qs.order_by("-created_at", "-id")[: limit + 1])
+    has_older = len(rows) > limit
+    rows = rows[:limit]
+    rows.reverse()
+    older_cursor = encode_cursor(rows[0]) if has_older and rows else None
+    return rows, older_cursor
+
+
+def page_after(queryset, cursor=None, limit=50):
+    """Return up to ``limit`` messages newer than ``cursor``, oldest first."""
+    qs = queryset
+    if cursor:
+        ts, pk = decode_cursor(cursor)
+        qs = qs.filter(Q(created_at__gt=ts) | Q(created_at=ts, id__gt=pk))
+    return list(qs.order_by("created_at", "id")[:limit])
@@ -0,0 +1,18 @@
+"""Django's PostgreSQL backend, reporting pool checkout timeouts to dashboard.dbpool.
+
+``DatabaseBusyMiddleware`` turns them into a 503 even when they happen
+outside the view, where Django has already made them a 500.
+"""
+from django.db.backends.postgresql import base
+
+from dashboard.dbpool import is_pool_timeout, note_pool_timeout
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        try:
+            return super().get_new_connection(conn_params)
+        except Exception as exc:
+            if is_pool_timeout(exc):
+                note_pool_timeout()
+            raise
@@ -0,0 +1,31 @@
+"""Compact per-user progress vectors.
+
+A learner's completed sessions are stored on ``Profile.progress_bits`` as a
+little-endian bitset: bit ``n`` is set when the template with
+``progress_slot == n`` is completed. Slots are assigned once per template and
+never reused, so reordering templates does not invalidate stored vectors.
+"""
+
+
+def bits_from_slots(slots):
+    """Return the bitset (bytes) with the given slot numbers set."""
+    slots = [s for s in slots if s is not None]
+    if not slots:
+        return b""
+    buf = bytearray(max(slots) // 8 + 1)
+    for slot in slots:
+        buf[slot >> 3] |= 1 << (slot & 7)
+    return bytes(buf)
+
+
+def has_slot(bits, slot):
+    if slot is None:
+        return False
+    index = slot >> 3
+    if index >= len(bits):
+        return False
+    return bool(bits[index] & (1 << (slot & 7)))
+
+
+def count_slots(bits):
+    return int.from_bytes(bytes(bits), "little").bit_count()
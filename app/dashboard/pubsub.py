@@ -0,0 +1,180 @@
+"""Pluggable publish/subscribe layer for real-time message updates.
+
+Sync code (signal handlers, views) calls ``publish()``; the async
+``message_events`` view holds a ``Subscription`` per open connection and
+awaits events on it. The backend is chosen with ``settings.PUBSUB_BROKER``:
+
+* ``InProcessBroker`` fans out to subscribers in the same process only. Good
+  for a single worker and for tests.
+* ``SQLiteBroker`` is a local stand-in for a real multi-process bus (Redis,
+  PostgreSQL LISTEN/NOTIFY): publishers append to a shared SQLite file and
+  one poller task per process fans new rows out to its local subscribers.
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+class Subscription:
+    """A single subscriber's event queue, bound to the event loop that created it."""
+
+    def __init__(self, broker, channels, maxsize=100):
+        self.broker = broker
+        self.channels = tuple(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def _deliver(self, payload):
+        # runs on self.loop; slow consumers lose their oldest events rather than grow without bound
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(payload)
+
+    async def get(self, timeout=None):
+        """Return the next event, or ``None`` if ``timeout`` seconds pass first."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Fan events out to subscribers living in this process."""
+
+    def __init__(self, **options):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, *channels):
+        sub = Subscription(self, channels)
+        with self._lock:
+            for channel in sub.channels:
+                self._subscribers[channel].add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            for channel in sub.channels:
+                subs = self._subscribers.get(channel)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._subscribers[channel]
+
+    def subscriber_count(self):
+        with self._lock:
+            return len({sub for subs in self._subscribers.values() for sub in subs})
+
+    def _fan_out(self, channel, payload):
+        with self._lock:
+            subs = list(self._subscribers.get(channel, ()))
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub._deliver, payload)
+            except RuntimeError:
+                # the subscriber's loop has shut down
+                self.unsubscribe(sub)
+
+    def publish(self, channel, payload):
+        self._fan_out(channel, payload)
+
+
+class SQLiteBroker(InProcessBroker):
+    """Multi-process stand-in: events go through a SQLite file shared on the machine."""
+
+    def __init__(self, path=None, poll_interval=0.5, retention=60, **options):
+        super().__init__(**options)
+        self.path = str(path or getattr(settings, "PUBSUB_SQLITE_PATH", "/tmp/connectus-pubsub.sqlite3"))
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._pollers = {}
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, "
+                "payload TEXT NOT NULL, created REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def publish(self, channel, payload):
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO events (channel, payload, created) VALUES (?, ?, ?)",
+            (channel, json.dumps(payload), now),
+        )
+        conn.execute("DELETE FROM events WHERE created < ?", (now - self.retention,))
+
+    def subscribe(self, *channels):
+        sub = super().subscribe(*channels)
+        loop = sub.loop
+        if loop not in self._pollers:
+            self._pollers[loop] = loop.create_task(self._poll())
+        return sub
+
+    def _last_id(self):
+        row = self._connect().execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()
+        return row[0]
+
+    def _read_since(self, last_id):
+        return self._connect().execute(
+            "SELECT id, channel, payload FROM events WHERE id > ? ORDER BY id", (last_id,)
+        ).fetchall()
+
+    async def _poll(self):
+        last_id = await asyncio.to_thread(self._last_id)
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            with self._lock:
+                idle = not self._subscribers
+            if idle:
+                # skip what is published meanwhile, so the next subscriber
+                # isn't replayed up to ``retention`` seconds of stale events
+                last_id = await asyncio.to_thread(self._last_id)
+                continue
+            rows = await asyncio.to_thread(self._read_since, last_id)
+            for row_id, channel, payload in rows:
+                last_id = row_id
+                self._fan_out(channel, json.loads(payload))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = getattr(settings, "PUBSUB_BROKER", {}) or {}
+                backend = import_string(config.get("BACKEND", "dashboard.pubsub.InProcessBroker"))
+                _broker = backend(**config.get("OPTIONS", {}))
+    return _broker
+
+
+def publish(channel, payload):
+    """Publish once the current transaction commits (immediately in autocommit)."""
+    transaction.on_commit(lambda: get_broker().publish(channel, payload))
@@ -0,0 +1,80 @@
+"""Precompiled question banks and the shared grading engine.
+
+A ``QuestionBank`` is compiled once per process into an immutable
+``CompiledTest`` (tuples only) tagged with the bank's version. Each request
+only checks the version (one indexed lookup) and recompiles when an admin edit
+has bumped it. Grading compares a submission against the precomputed answer
+vector.
+"""
+import threading
+from dataclasses import dataclass
+
+from .models import QuestionBank
+
+
+@dataclass(frozen=True)
+class CompiledQuestion:
+    number: int
+    text: str
+    options: tuple
+    difficulty: str
+
+
+@dataclass(frozen=True)
+class CompiledTest:
+    slug: str
+    title: str
+    version: int
+    questions: tuple
+    # parallel vectors: POST field name and expected value for each question
+    answer_keys: tuple
+    answers: tuple
+
+    @property
+    def total(self):
+        return len(self.answers)
+
+    def grade(self, data):
+        """Return the number of correct answers in ``data`` (a QueryDict or dict)."""
+        get = data.get
+        return sum(1 for key, answer in zip(self.answer_keys, self.answers) if get(key) == answer)
+
+
+_compiled = {}
+_lock = threading.Lock()
+
+
+def compile_bank(bank):
+    questions = []
+    answers = []
+    for number, q in enumerate(bank.questions.all(), start=1):
+        questions.append(CompiledQuestion(number, q.text, tuple(q.options), q.difficulty))
+        answers.append(str(q.answer))
+    return CompiledTest(
+        slug=bank.slug,
+        title=bank.title,
+        version=bank.version,
+        questions=tuple(questions),
+        answer_keys=tuple(f"q{n}" for n in range(1, len(answers) + 1)),
+        answers=tuple(answers),
+    )
+
+
+def get_test(slug):
+    """Return the compiled test for ``slug``, recompiling if the bank changed.
+
+    Raises ``QuestionBank.DoesNotExist`` for an unknown slug.
+    """
+    version = QuestionBank.objects.filter(slug=slug).values_list("version", flat=True).first()
+    if version is None:
+        raise QuestionBank.DoesNotExist(slug)
+
+    compiled = _compiled.get(slug)
+    if compiled is not None and compiled.version == version:
+        return compiled
+
+    bank = QuestionBank.objects.prefetch_related("questions").get(slug=slug)
+    compiled = compile_bank(bank)
+    with _lock:
+        _compiled[slug] = compiled
+    return compiled
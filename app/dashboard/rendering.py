@@ -0,0 +1,159 @@
+"""Cached Markdown rendering for SessionTemplate content.
+
+Rendered HTML is keyed by a hash of the source text and the extension set, so
+identical content is only parsed once. Two tiers are used:
+
+* a small per-process LRU (bounded by total bytes) for the hottest sessions;
+* the shared ``markdown`` cache alias (see ``CACHES`` in settings), which all
+  gunicorn workers on the machine read from. A miss is rendered through
+  ``get_or_set``, so when several workers miss on the same content at once
+  only one of them parses it.
+
+Only the local tier is a size-bounded LRU. The shared tier is bounded by
+entry count (``MAX_ENTRIES``) and a TTL. Past the limit, ``SQLiteCache``
+drops the soonest-expiring entries, not the least recently used ones. That
+avoids a write on every shared read; the hot entries are served by the LRU
+in front of it anyway.
+
+Hit/miss counters are per process, so counting never writes to the shared
+cache on the read path; ``render_stats()`` returns them for the staff query
+report.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.safestring import mark_safe
+
+MARKDOWN_EXTENSIONS = ('fenced_code', 'nl2br')
+
+CACHE_ALIAS = 'markdown'
+KEY_PREFIX = 'md:'
+
+_local = OrderedDict()
+_local_bytes = 0
+_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def _local_max_bytes():
+    return getattr(settings, 'MARKDOWN_CACHE_LOCAL_MAX_BYTES', 2 * 1024 * 1024)
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def cache_key(text, extensions=MARKDOWN_EXTENSIONS):
+    """Return the cache key for ``text`` rendered with ``extensions``."""
+    h = hashlib.sha256()
+    h.update('\x00'.join(sorted(extensions)).encode('utf-8'))
+    h.update(b'\x01')
+    h.update(text.encode('utf-8'))
+    return KEY_PREFIX + h.hexdigest()
+
+
+def _local_get(key):
+    with _lock:
+        html = _local.get(key)
+        if html is not None:
+            _local.move_to_end(key)
+        return html
+
+
+def _local_set(key, html):
+    global _local_bytes
+    size = len(html)
+    limit = _local_max_bytes()
+    if size > limit:
+        return
+    with _lock:
+        old = _local.pop(key, None)
+        if old is not None:
+            _local_bytes -= len(old)
+        _local[key] = html
+        _local_bytes += size
+        while _local_bytes > limit:
+            _, evicted = _local.popitem(last=False)
+            _local_bytes -= len(evicted)
+
+
+def _local_delete(key):
+    global _local_bytes
+    with _lock:
+        old = _local.pop(key, None)
+        if old is not None:
+            _local_bytes -= len(old)
+
+
+def _count(hit):
+    global _hits, _misses
+    with _lock:
+        if hit:
+            _hits += 1
+        else:
+            _misses += 1
+
+
+def render_markdown(text, extensions=MARKDOWN_EXTENSIONS):
+    """Render Markdown to safe HTML, serving repeated content from cache."""
+    text = text or ''
+    if not text:
+        return mark_safe('')
+
+    key = cache_key(text, extensions)
+    html = _local_get(key)
+    if html is None:
+        html = _cache().get(key)
+        if html is not None:
+            _local_set(key, html)
+    if html is not None:
+        _count(hit=True)
+        return mark_safe(html)
+
+    import markdown as md
+    html = _cache().get_or_set(key, lambda: md.markdown(text, extensions=list(extensions)))
+    _local_set(key, html)
+    _count(hit=False)
+    return mark_safe(html)
+
+
+def invalidate_markdown(*texts, extensions=MARKDOWN_EXTENSIONS):
+    """Drop cached renders for the given source texts (e.g. a template's old content)."""
+    keys = [cache_key(t, extensions) for t in texts if t]
+    for key in keys:
+        _local_delete(key)
+    if keys:
+        _cache().delete_many(keys)
+
+
+def render_stats():
+    """Return this process's hit/miss counters for the Markdown cache."""
+    hits, misses = _hits, _misses
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': (hits / total) if total else 0.0,
+        'local_entries': len(_local),
+        'local_bytes': _local_bytes,
+    }
+
+
+def reset_stats():
+    global _hits, _misses
+    with _lock:
+        _hits = _misses = 0
+
+
+def clear():
+    """Empty both cache tiers and reset counters."""
+    global _local_bytes
+    with _lock:
+        _local.clear()
+        _local_bytes = 0
+    _cache().clear()
+    reset_stats()
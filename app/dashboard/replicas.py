@@ -0,0 +1,97 @@
+"""Read-replica routing with read-your-writes pinning.
+
+When ``settings.DATABASE_REPLICA`` names a database alias (it is set when
+DATABASE_REPLICA_URL, or SQLITE_REPLICA_PATH locally, is configured),
+``ReplicaRouter`` sends reads from views decorated with ``@read_replica`` to
+that replica, for GET and HEAD requests only. Everything else uses the
+primary: writes, reads in other views, POSTs, and management commands.
+
+``ReplicaPinningMiddleware`` keeps the replica's lag from hiding a user's own
+changes:
+
+* once a request has changed rows on the primary, its remaining reads stay
+  there too;
+* the response then sets a cookie, and for ``REPLICA_PIN_SECONDS`` that
+  browser's requests read from the primary.
+
+``Routing`` is the per-request state. It is held in a context variable, so
+sync views run through ``sync_to_async`` see the same object.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE")
+
+_routing = ContextVar("replica_routing", default=None)
+
+
+class Routing:
+    """One request's routing state; also an ``execute_wrapper`` hook spotting writes."""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.replica_ok = False
+        self.wrote = False
+
+    def __call__(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        if (
+            not self.wrote
+            and context["connection"].alias == DEFAULT_DB_ALIAS
+            and sql.lstrip()[:6].upper() in WRITE_STATEMENTS
+        ):
+            # -1 means the driver can't tell; assume rows changed
+            self.wrote = context["cursor"].rowcount != 0
+        return result
+
+
+@contextmanager
+def routing(pinned=False):
+    token = _routing.set(Routing(pinned))
+    try:
+        yield _routing.get()
+    finally:
+        _routing.reset(token)
+
+
+def replica_alias():
+    """The alias reads should go to right now, or None for the primary."""
+    alias = getattr(settings, "DATABASE_REPLICA", None)
+    state = _routing.get()
+    if alias and state is not None and state.replica_ok and not (state.pinned or state.wrote):
+        return alias
+    return None
+
+
+def read_replica(view_func):
+    """Let a read-only view's GET/HEAD queries go to the replica."""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        state = _routing.get()
+        if state is None or request.method not in ("GET", "HEAD"):
+            return view_func(request, *args, **kwargs)
+        state.replica_ok = True
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            state.replica_ok = False
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return replica_alias() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica holds the same rows as the primary
+        aliases = {DEFAULT_DB_ALIAS, getattr(settings, "DATABASE_REPLICA", None)}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
@@ -0,0 +1,84 @@
+"""Cold-start timing and warmup.
+
+Fly stops idle machines, so the first visitor after a stop waits for the
+interpreter, ``django.setup()`` and every first-use import. ``app.asgi`` and
+``app.wsgi`` call ``install()`` once the application is built:
+
+* ``timings`` records, per process, the seconds from interpreter start to
+  each phase ("app loaded", "warmup", "first response"). The query report
+  shows them, and the first response is logged;
+* with ``settings.STARTUP_WARMUP`` on, ``warmup()`` builds the URL
+  resolvers, compiles every project template and imports Markdown before
+  the first request. Under ``preload_app`` this happens once in the gunicorn
+  master, and the workers inherit it.
+
+``manage.py startup_profile`` measures the same phases, plus per-import
+times, in fresh interpreters.
+"""
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.core.signals import request_finished
+
+logger = logging.getLogger(__name__)
+
+# phase -> seconds since this process started
+timings = {}
+
+
+def process_started_at():
+    """Wall-clock start time of this process (a forked worker: its fork), or None off Linux."""
+    try:
+        with open("/proc/self/stat") as fh:
+            # the command name may contain spaces; fields resume after its ")"
+            start_ticks = int(fh.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/stat") as fh:
+            boot = next(int(line.split()[1]) for line in fh if line.startswith("btime"))
+    except (OSError, StopIteration, IndexError, ValueError):
+        return None
+    return boot + start_ticks / os.sysconf("SC_CLK_TCK")
+
+
+def mark(phase):
+    started = process_started_at()
+    timings[phase] = round(time.time() - started, 3) if started else None
+
+
+def warmup():
+    """Do the first-request work now: URL resolvers, project templates, Markdown."""
+    from django.template import engines
+    from django.template.utils import get_app_template_dirs
+    from django.urls import get_resolver
+
+    from .rendering import MARKDOWN_EXTENSIONS
+
+    # imports the URLconf (and every view module) and fills the reverse lookup tables
+    get_resolver().reverse_dict
+    engine = engines["django"]
+    for directory in get_app_template_dirs("templates"):
+        if not str(directory).startswith(str(settings.BASE_DIR)):
+            # only our apps' templates; admin ones load on the rare admin hit
+            continue
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.endswith(".html"):
+                    engine.get_template(os.path.relpath(os.path.join(root, name), directory))
+
+    import markdown
+    markdown.Markdown(extensions=list(MARKDOWN_EXTENSIONS))
+
+
+def _first_response(**kwargs):
+    request_finished.disconnect(_first_response)
+    mark("first response")
+    logger.info("Worker %s startup (s since process start): %s", os.getpid(), timings)
+
+
+def install():
+    mark("app loaded")
+    if getattr(settings, "STARTUP_WARMUP", False):
+        warmup()
+        mark("warmup")
+    request_finished.connect(_first_response)
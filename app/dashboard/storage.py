@@ -0,0 +1,67 @@
+"""Static files storage for the precompiled stylesheet and admin assets.
+
+``collectstatic`` writes content-hashed copies (``ManifestStaticFilesStorage``)
+plus ``.gz`` and, when the optional ``brotli`` package is installed, ``.br``
+variants next to them, so the ``[[statics]]`` mapping in ``fly.toml`` can serve
+them without compressing per request.
+
+Templates get hashed URLs once a manifest has been collected and ``DEBUG`` is
+off. With ``DEBUG`` on, names are left as is so the static finders can serve
+them, even if a stale local manifest exists.
+"""
+import gzip
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, StaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+COMPRESSIBLE = (".css", ".js", ".svg", ".map", ".txt", ".json", ".html")
+# below this, compressed variants save too little to be worth a file
+MIN_COMPRESS_BYTES = 256
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def url(self, name, force=False):
+        if not self.hashed_files:
+            return StaticFilesStorage.url(self, name)
+        return super().url(name, force=not settings.DEBUG)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(self.hashed_files.values())):
+            for variant in self.compress(name):
+                yield name, variant, True
+
+    def compress(self, name):
+        """Write compressed variants of ``name``; return their names."""
+        if not name.endswith(COMPRESSIBLE):
+            return []
+        with self.open(name) as fh:
+            data = fh.read()
+        written = []
+        for suffix, encoded in compressed_variants(data).items():
+            with open(self.path(name + suffix), "wb") as out:
+                out.write(encoded)
+            written.append(name + suffix)
+        return written
+
+
+def compressed_variants(data):
+    """Return ``{".gz": bytes, ".br": bytes}`` for ``data``, skipping variants that don't pay off."""
+    if len(data) < MIN_COMPRESS_BYTES:
+        return {}
+    encoders = {".gz": lambda d: gzip.compress(d, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoders[".br"] = lambda d: brotli.compress(d, quality=11)
+    variants = {}
+    for suffix, encode in encoders.items():
+        encoded = encode(data)
+        if len(encoded) < len(data):
+            variants[suffix] = encoded
+    return variants
@@ -0,0 +1,258 @@
+"""Synthetic cohort data for benchmarks and local load testing.
+
+Learners are generated in chunks: each chunk's users, profiles, completions,
+messages and conversations are written with ``bulk_create`` in one
+transaction and then dropped, so memory stays flat even for millions of rows.
+Model signals are muted while generating; the denormalized fields they
+normally maintain (``Conversation`` rows, ``Profile.unread_messages_count``,
+``Profile.progress_bits``) are filled in directly. Output is deterministic for a given ``seed`` and
+``base_time``.
+"""
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save
+
+from .catalog import bump_version as bump_catalog_version
+from .progress import bits_from_slots
+from .models import (
+    Conversation, Message, Profile, SessionCompletion, SessionTemplate,
+    create_or_update_user_profile, update_conversation_on_message,
+)
+
+SAMPLE_MARKDOWN = """## Warm-up
+
+Talk for five minutes about **your week**. Useful phrases:
+
+- *I've been busy with...*
+- *The highlight was...*
+
+```
+Past simple vs. present perfect
+```
+
+Finish with three questions for your partner.
+"""
+
+# Fixture passwords are hashed once with few iterations; Django upgrades
+# the hash to the configured strength on the user's first real login.
+FAST_HASH_ITERATIONS = 1000
+
+DEFAULT_BASE_TIME = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+# ids kept on the returned Cohort for driving requests; totals are always exact
+SAMPLE_SIZE = 100
+
+
+@dataclass
+class Cohort:
+    mentor_ids: list = field(default_factory=list)
+    # samples (first SAMPLE_SIZE) of assigned mentees and of (mentor_id, mentee_id) pairs with messages
+    mentee_ids: list = field(default_factory=list)
+    template_ids: list = field(default_factory=list)
+    pairs: list = field(default_factory=list)
+    totals: dict = field(default_factory=dict)
+
+
+@contextmanager
+def muted_signals():
+    """Disconnect the per-row receivers (profile provisioning, conversation upkeep)."""
+    post_save.disconnect(create_or_update_user_profile, sender=settings.AUTH_USER_MODEL)
+    post_save.disconnect(update_conversation_on_message, sender=Message)
+    try:
+        yield
+    finally:
+        post_save.connect(create_or_update_user_profile, sender=settings.AUTH_USER_MODEL)
+        post_save.connect(update_conversation_on_message, sender=Message)
+
+
+def fixture_password_hash(password):
+    """Hash ``password`` once, cheaply, for reuse across every generated user."""
+    if not password:
+        return "!"
+    return PBKDF2PasswordHasher().encode(password, "syntheticsalt", iterations=FAST_HASH_ITERATIONS)
+
+
+def _users(prefix, kind, start, stop, password_hash, base_time):
+    return [
+        User(
+            username=f"{prefix}-{kind}-{i}",
+            email=f"{prefix}-{kind}-{i}@example.com",
+            first_name=f"{kind.title()}{i}",
+            password=password_hash,
+            date_joined=base_time,
+        )
+        for i in range(start, stop)
+    ]
+
+
+def seed_cohort(mentors=5, mentees_per_mentor=20, unassigned=20, templates=12,
+                completion_rate=0.5, messages_per_pair=30, unread_rate=0.2,
+                seed=0, prefix="bench", chunk_size=2000, password=None,
+                base_time=DEFAULT_BASE_TIME, batch_size=1000, progress=None):
+    """Create a synthetic cohort and return a ``Cohort`` describing it.
+
+    ``progress``, if given, is called as ``progress(done, total)`` after each
+    chunk of learners.
+    """
+    rng = random.Random(seed)
+    password_hash = fixture_password_hash(password)
+    cohort = Cohort()
+    totals = dict.fromkeys(("users", "profiles", "templates", "completions", "messages", "conversations"), 0)
+    assigned_total = mentors * mentees_per_mentor
+    learner_total = assigned_total + unassigned
+
+    with muted_signals():
+        with transaction.atomic():
+            mentor_users = []
+            for start in range(0, mentors, chunk_size):
+                chunk = User.objects.bulk_create(_users(prefix, "mentor", start, min(start + chunk_size, mentors), password_hash, base_time), batch_size=batch_size)
+                Profile.objects.bulk_create([Profile(user=u, is_mentor=True, created_at=base_time) for u in chunk], batch_size=batch_size)
+                mentor_users.extend(u.id for u in chunk)
+            cohort.mentor_ids = mentor_users
+            totals["users"] += mentors
+            totals["profiles"] += mentors
+
+            base_order = SessionTemplate.objects.count()
+            base_slot = SessionTemplate.next_progress_slot()
+            template_objs = SessionTemplate.objects.bulk_create([
+                SessionTemplate(
+                    title=f"{prefix} session {i + 1}",
+                    order=base_order + i,
+                    progress_slot=base_slot + i,
+                    content_markdown=SAMPLE_MARKDOWN * rng.randint(1, 4),
+                    mentor_content_markdown=SAMPLE_MARKDOWN,
+                    created_at=base_time,
+                )
+                for i in range(templates)
+            ])
+            cohort.template_ids = [t.id for t in template_objs]
+            totals["templates"] = templates
+        # bulk_create skips the SessionTemplate signals
+        bump_catalog_version()
+
+        mentor_unread = {}
+        for start in range(0, learner_total, chunk_size):
+            stop = min(start + chunk_size, learner_total)
+            with transaction.atomic():
+                _seed_learner_chunk(
+                    rng, cohort, totals, mentor_unread, start, stop,
+                    assigned_total, mentees_per_mentor, template_objs,
+                    completion_rate, messages_per_pair, unread_rate,
+                    prefix, password_hash, base_time, batch_size,
+                )
+            if progress:
+                progress(stop, learner_total)
+
+        # mentors' unread counts accumulate across chunks; write them grouped by value
+        by_count = {}
+        for user_id, count in mentor_unread.items():
+            by_count.setdefault(count, []).append(user_id)
+        for count, user_ids in by_count.items():
+            for i in range(0, len(user_ids), batch_size):
+                Profile.objects.filter(user_id__in=user_ids[i:i + batch_size]).update(unread_messages_count=count)
+
+    cohort.totals = totals
+    return cohort
+
+
+def seed_users(count, prefix="login", password_hash="!", chunk_size=10000, batch_size=2000,
+               base_time=DEFAULT_BASE_TIME, progress=None):
+    """Create ``count`` plain learners (user + profile) and nothing else.
+
+    Used for lookup/login benchmarks where only the size of the user table
+    matters. Every user gets ``password_hash`` as-is; emails are
+    ``{prefix}-learner-{i}@example.com``.
+    """
+    with muted_signals():
+        for start in range(0, count, chunk_size):
+            stop = min(start + chunk_size, count)
+            with transaction.atomic():
+                users = User.objects.bulk_create(_users(prefix, "learner", start, stop, password_hash, base_time), batch_size=batch_size)
+                Profile.objects.bulk_create([Profile(user=u, created_at=base_time) for u in users], batch_size=batch_size)
+            if progress:
+                progress(stop, count)
+
+
+def _seed_learner_chunk(rng, cohort, totals, mentor_unread, start, stop,
+                        assigned_total, mentees_per_mentor, template_objs,
+                        completion_rate, messages_per_pair, unread_rate,
+                        prefix, password_hash, base_time, batch_size):
+    users = User.objects.bulk_create(_users(prefix, "learner", start, stop, password_hash, base_time), batch_size=batch_size)
+
+    profiles = []
+    completions = []
+    msgs = []
+    learner_unread = {}
+    for offset, user in enumerate(users):
+        index = start + offset
+        mentor_id = cohort.mentor_ids[index // mentees_per_mentor] if index < assigned_total else None
+        profiles.append(Profile(
+            user=user,
+            assigned_mentor_id=mentor_id,
+            intro_test_done=rng.random() < 0.7,
+            next_meeting_at=base_time + timedelta(days=rng.randint(1, 14)) if mentor_id and rng.random() < 0.5 else None,
+            created_at=base_time,
+        ))
+        slots = []
+        for template in template_objs:
+            if rng.random() < completion_rate:
+                completions.append(SessionCompletion(user=user, template=template, completed=True, completed_at=base_time))
+                slots.append(template.progress_slot)
+        profiles[-1].progress_bits = bits_from_slots(slots)
+        profiles[-1].completed_sessions_count = len(slots)
+
+        if mentor_id is None:
+            continue
+        if len(cohort.mentee_ids) < SAMPLE_SIZE:
+            cohort.mentee_ids.append(user.id)
+        if not messages_per_pair:
+            continue
+        if len(cohort.pairs) < SAMPLE_SIZE:
+            cohort.pairs.append((mentor_id, user.id))
+        first = base_time - timedelta(minutes=messages_per_pair)
+        for n in range(messages_per_pair):
+            sender, recipient = (user.id, mentor_id) if rng.random() < 0.5 else (mentor_id, user.id)
+            is_read = rng.random() >= unread_rate
+            msgs.append(Message(
+                sender_id=sender, recipient_id=recipient,
+                body=f"Message {n} " + "lorem ipsum " * rng.randint(1, 12),
+                created_at=first + timedelta(minutes=n), read=is_read,
+            ))
+            if not is_read:
+                counts = learner_unread if recipient == user.id else mentor_unread
+                counts[recipient] = counts.get(recipient, 0) + 1
+
+    for profile in profiles:
+        profile.unread_messages_count = learner_unread.get(profile.user.id, 0)
+    Profile.objects.bulk_create(profiles, batch_size=batch_size)
+    SessionCompletion.objects.bulk_create(completions, batch_size=batch_size)
+    msgs = Message.objects.bulk_create(msgs, batch_size=batch_size)
+
+    # each learner talks to one mentor, so a chunk's pairs never span chunks
+    conversations = {}
+    for m in msgs:
+        a, b = Conversation.pair_ids(m.sender_id, m.recipient_id)
+        conv = conversations.get((a, b))
+        if conv is None:
+            conv = conversations[(a, b)] = Conversation(user_a_id=a, user_b_id=b)
+        conv.last_message_id = m.id
+        conv.last_message_at = m.created_at
+        if not m.read:
+            if m.recipient_id == a:
+                conv.unread_for_a += 1
+            else:
+                conv.unread_for_b += 1
+    Conversation.objects.bulk_create(conversations.values(), batch_size=batch_size)
+
+    totals["users"] += len(users)
+    totals["profiles"] += len(profiles)
+    totals["completions"] += len(completions)
+    totals["messages"] += len(msgs)
+    totals["conversations"] += len(conversations)
@@ -1,3 +1,1084 @@
-from django.test import TestCase
+import asyncio
+import contextvars
+import gzip
+import io
+import json
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import mock, skipIf
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import OperationalError, connection
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils import timezone
+
+from .forms import CustomUserCreationForm
+from .models import SessionTemplate, SessionCompletion, Message, Conversation, Question, Profile
+from .question_bank import get_test
+from .catalog import get_catalog
+from .synthetic import seed_cohort
+from .pubsub import InProcessBroker, SQLiteBroker
+from .middleware import QueryBudgetExceeded, query_stats
+from .hashing import HashingBusy, HashingPool, HashingStats
+from .onboarding import import_cohort, read_rows
+from .cache import SQLiteCache
+from . import rendering, replicas, startup, storage
+from .workers import MB, WorkerMonitor, memory_info, read_worker_stats
+from .dbpool import PoolTimeout, is_pool_timeout, note_pool_timeout, pool_stats, summarize
+
+
+def make_user(username, is_mentor=False, mentor=None):
+    user = User.objects.create_user(username=username, email=f"{username}@example.com")
+    profile = user.profile
+    profile.is_mentor = is_mentor
+    profile.assigned_mentor = mentor
+    profile.save()
+    return user
+
+
+@override_settings(QUERY_BUDGET_RAISE=True)
+class MentorDashboardQueryTests(TestCase):
+    def setUp(self):
+        self.mentor = make_user("mentor", is_mentor=True)
+        self.templates = [SessionTemplate.objects.create(title=f"Session {i}", order=i) for i in range(3)]
+        get_catalog()
+
+    def add_mentees(self, count, start=0):
+        for i in range(start, start + count):
+            mentee = make_user(f"mentee{i}", mentor=self.mentor)
+            SessionCompletion.objects.create(user=mentee, template=self.templates[0], completed=True, completed_at=timezone.now())
+            SessionCompletion.objects.create(user=mentee, template=self.templates[1], completed=False)
+        for i in range(start, start + count):
+            make_user(f"candidate{i}")
+
+    def count_queries(self):
+        self.client.force_login(self.mentor)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("mentor_dashboard"))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_query_count_independent_of_mentee_count(self):
+        self.add_mentees(2)
+        few, _ = self.count_queries()
+        self.add_mentees(40, start=2)
+        many, response = self.count_queries()
+        self.assertEqual(few, many)
+        self.assertEqual(len(response.context["mentees"]), 42)
+
+    def test_completed_count_only_counts_completed(self):
+        self.add_mentees(1)
+        _, response = self.count_queries()
+        item = response.context["mentees"][0]
+        self.assertEqual(item["completed_count"], 1)
+        self.assertEqual(item["total_templates"], 3)
+
+    def test_candidates_are_paginated(self):
+        self.add_mentees(30)
+        _, response = self.count_queries()
+        page = response.context["candidates"]
+        self.assertEqual(len(page), 25)
+        self.assertEqual(page.paginator.count, 30)
+
+    def test_query_budget(self):
+        self.add_mentees(20)
+        self.client.force_login(self.mentor)
+        # user + profile, mentees, candidate count + page (session and templates come from caches)
+        with self.assertNumQueries(4):
+            self.client.get(reverse("mentor_dashboard"))
+
+
+@override_settings(QUERY_BUDGET_RAISE=True)
+class ConversationSummaryTests(TestCase):
+    def setUp(self):
+        self.mentor = make_user("mentor", is_mentor=True)
+        self.mentee = make_user("mentee", mentor=self.mentor)
+
+    def test_message_creation_updates_summary(self):
+        Message.objects.create(sender=self.mentee, recipient=self.mentor, body="hi")
+        last = Message.objects.create(sender=self.mentee, recipient=self.mentor, body="again")
+        conv = Conversation.objects.get()
+        self.assertEqual(conv.last_message, last)
+        self.assertEqual(conv.unread_for(self.mentor.id), 2)
+        self.assertEqual(conv.unread_for(self.mentee.id), 0)
+
+    def test_message_and_counters_commit_together(self):
+        with mock.patch("dashboard.models.pubsub.publish", side_effect=RuntimeError("broker down")):
+            with self.assertRaises(RuntimeError):
+                Message.objects.create(sender=self.mentee, recipient=self.mentor, body="hi")
+        self.assertFalse(Message.objects.exists())
+        self.assertFalse(Conversation.objects.exists())
+        self.mentor.profile.refresh_from_db()
+        self.assertEqual(self.mentor.profile.unread_messages_count, 0)
+
+    def test_opening_thread_resets_unread(self):
+        Message.objects.create(sender=self.mentee, recipient=self.mentor, body="hi")
+        self.client.force_login(self.mentor)
+        self.client.get(reverse("mentor_message_thread", args=[self.mentee.id]))
+        conv = Conversation.objects.get()
+        self.assertEqual(conv.unread_for(self.mentor.id), 0)
+        self.assertFalse(Message.objects.filter(read=False).exists())
+
+    def test_unread_counter_follows_messages(self):
+        Message.objects.create(sender=self.mentee, recipient=self.mentor, body="one")
+        Message.objects.create(sender=self.mentee, recipient=self.mentor, body="two")
+        self.mentor.profile.refresh_from_db()
+        self.assertEqual(self.mentor.profile.unread_messages_count, 2)
+
+        self.client.force_login(self.mentor)
+        response = self.client.get(reverse("mentor_message_thread", args=[self.mentee.id]))
+        self.assertEqual(response.context["unread_messages_count"], 0)
+        self.mentor.profile.refresh_from_db()
+        self.assertEqual(self.mentor.profile.unread_messages_count, 0)
+
+    def test_inbox_query_count_independent_of_mentee_count(self):
+        self.client.force_login(self.mentor)
+        Message.objects.create(sender=self.mentee, recipient=self.mentor, body="hi")
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(reverse("mentor_messages"))
+        for i in range(10):
+            other = make_user(f"extra{i}", mentor=self.mentor)
+            Message.objects.create(sender=other, recipient=self.mentor, body="hello")
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(reverse("mentor_messages"))
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+        conversations = response.context["conversations"]
+        self.assertEqual(len(conversations), 11)
+        self.assertEqual(conversations[0]["user"].username, "extra9")
+
+
+@override_settings(QUERY_BUDGET_RAISE=True)
+class ThreadPaginationTests(TestCase):
+    def setUp(self):
+        self.mentor = make_user("mentor", is_mentor=True)
+        self.mentee = make_user("mentee", mentor=self.mentor)
+        now = timezone.now()
+        # identical timestamps force the id tie-breaker to be used
+        self.messages = [
+            Message.objects.create(sender=self.mentee, recipient=self.mentor, body=f"m{i}", created_at=now - timedelta(minutes=i // 2))
+            for i in range(120)
+        ]
+        self.client.force_login(self.mentee)
+
+    def test_pages_cover_thread_without_overlap(self):
+        url = reverse("message_thread", args=[self.mentor.id])
+        response = self.client.get(url)
+        seen = [m.id for m in response.context["thread"]]
+        cursor = response.context["older_cursor"]
+        while cursor:
+            response = self.client.get(url, {"before": cursor})
+            seen = [m.id for m in response.context["thread"]] + seen
+            cursor = response.context["older_cursor"]
+        self.assertEqual(len(seen), 120)
+        self.assertEqual(len(set(seen)), 120)
+
+    def test_since_returns_only_newer_messages(self):
+        response = self.client.get(reverse("message_thread", args=[self.mentor.id]))
+        cursor = response.context["latest_cursor"]
+        new = Message.objects.create(sender=self.mentor, recipient=self.mentee, body="new")
+        data = self.client.get(reverse("message_thread_since", args=[self.mentor.id]), {"after": cursor}).json()
+        self.assertEqual([m["id"] for m in data["messages"]], [new.id])
+        self.assertTrue(Message.objects.get(pk=new.pk).read)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("message_thread_since", args=[self.mentor.id]), {"after": "nope"})
+        self.assertEqual(response.status_code, 400)
+
+
+@skipIf(connection.vendor != "sqlite", "plans are checked against SQLite's planner")
+class HotQueryIndexTests(TestCase):
+    def setUp(self):
+        self.mentor = make_user("mentor", is_mentor=True)
+        self.mentee = make_user("mentee", mentor=self.mentor)
+        Message.objects.create(sender=self.mentee, recipient=self.mentor, body="hi")
+
+    def plans(self):
+        out = io.StringIO()
+        call_command("explain_hot_queries", stdout=out)
+        plans, label = {}, None
+        for line in out.getvalue().splitlines():
+            if line.startswith("== "):
+                label = line[3:]
+                plans[label] = ""
+            elif label:
+                plans[label] += line + "\n"
+        return plans
+
+    def test_hot_queries_use_the_new_indexes(self):
+        plans = self.plans()
+        self.assertIn("USING INDEX message_unread_idx", plans["unread count"])
+        self.assertIn("USING INDEX message_unread_idx", plans["unread from one sender (mark read)"])
+        self.assertIn("USING INDEX message_pair_time_idx", plans["thread page (newest first)"])
+        self.assertIn("USING COVERING INDEX completion_user_done_idx", plans["progress count"])
+        self.assertIn("completion_user_done_idx", plans["mentor dashboard mentees"])
+
+
+class PubSubTests(TestCase):
+    def test_in_process_fan_out(self):
+        async def run():
+            broker = InProcessBroker()
+            sub = broker.subscribe("user:1")
+            other = broker.subscribe("user:2")
+            broker.publish("user:1", {"type": "message", "id": 7})
+            event = await sub.get(timeout=1)
+            missing = await other.get(timeout=0.05)
+            sub.close()
+            other.close()
+            return event, missing, broker.subscriber_count()
+
+        event, missing, remaining = asyncio.run(run())
+        self.assertEqual(event["id"], 7)
+        self.assertIsNone(missing)
+        self.assertEqual(remaining, 0)
+
+    def test_sqlite_broker_crosses_instances(self):
+        path = os.path.join(tempfile.mkdtemp(), "pubsub.sqlite3")
+
+        async def run():
+            # two brokers on one file stand in for two worker processes
+            listener = SQLiteBroker(path=path, poll_interval=0.01)
+            sender = SQLiteBroker(path=path, poll_interval=0.01)
+            sub = listener.subscribe("user:1")
+            await asyncio.sleep(0.05)
+            sender.publish("user:1", {"type": "message", "id": 9})
+            event = await sub.get(timeout=2)
+            sub.close()
+            return event
+
+        self.assertEqual(asyncio.run(run())["id"], 9)
+
+    def test_sqlite_broker_does_not_replay_events_from_while_idle(self):
+        path = os.path.join(tempfile.mkdtemp(), "pubsub.sqlite3")
+
+        async def run():
+            listener = SQLiteBroker(path=path, poll_interval=0.01)
+            sender = SQLiteBroker(path=path, poll_interval=0.01)
+            # start the poller, then leave it with no subscribers
+            listener.subscribe("user:1").close()
+            await asyncio.sleep(0.05)
+            sender.publish("user:1", {"type": "message", "id": 1})
+            await asyncio.sleep(0.05)
+            sub = listener.subscribe("user:1")
+            await asyncio.sleep(0.05)
+            sender.publish("user:1", {"type": "message", "id": 2})
+            event = await sub.get(timeout=2)
+            sub.close()
+            return event
+
+        self.assertEqual(asyncio.run(run())["id"], 2)
+
+
+class EventStreamTests(TransactionTestCase):
+    # the async view reads from another thread, so test data must be committed
+
+    def test_event_stream_starts_with_unread_count(self):
+        mentor = make_user("mentor", is_mentor=True)
+        mentee = make_user("mentee", mentor=mentor)
+        Message.objects.create(sender=mentee, recipient=mentor, body="hi")
+        self.client.force_login(mentor)
+
+        async def first_events():
+            from django.test import AsyncClient
+            client = AsyncClient()
+            client.cookies = self.client.cookies
+            response = await client.get(reverse("message_events"))
+            chunks = []
+            iterator = response.streaming_content.__aiter__()
+            for _ in range(2):
+                chunks.append(await iterator.__anext__())
+            await iterator.aclose()
+            return response, b"".join(chunks).decode()
+
+        response, body = asyncio.run(first_events())
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertIn('event: unread\ndata: {"count": 1}', body)
+
+
+@override_settings(QUERY_BUDGET_RAISE=True)
+class QuestionBankTests(TestCase):
+    def setUp(self):
+        self.user = make_user("learner")
+        self.client.force_login(self.user)
+
+    def test_seeded_bank_grades_submission(self):
+        test = get_test("intro")
+        self.assertEqual(test.total, 20)
+        perfect = dict(zip(test.answer_keys, test.answers))
+        self.assertEqual(test.grade(perfect), 20)
+        self.assertEqual(test.grade({}), 0)
+
+        self.client.post(reverse("english_test"), perfect)
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.intro_test_score, 20)
+        self.assertTrue(self.user.profile.intro_test_done)
+
+    def test_editing_a_question_recompiles(self):
+        first = get_test("intro")
+        question = Question.objects.filter(bank__slug="intro").first()
+        question.answer = 1 if question.answer != 1 else 2
+        question.save()
+        second = get_test("intro")
+        self.assertGreater(second.version, first.version)
+        self.assertEqual(second.answers[0], str(question.answer))
+        self.assertIs(get_test("intro"), second)
+
+    def test_page_renders_questions(self):
+        response = self.client.get(reverse("english_test"))
+        self.assertContains(response, 'name="q20"')
+
+
+@override_settings(QUERY_BUDGET_RAISE=True)
+class ManageSessionsTests(TestCase):
+    def setUp(self):
+        self.mentor = make_user("mentor", is_mentor=True)
+        self.mentee = make_user("mentee", mentor=self.mentor)
+        self.templates = [SessionTemplate.objects.create(title=f"Session {i}", order=i) for i in range(4)]
+        SessionCompletion.objects.create(user=self.mentee, template=self.templates[0], completed=True, completed_at=timezone.now())
+        SessionCompletion.objects.create(user=self.mentee, template=self.templates[1], completed=True, completed_at=timezone.now())
+        self.client.force_login(self.mentor)
+
+    def test_applies_diff_in_bulk(self):
+        url = reverse("mentor_manage_sessions", args=[self.mentee.id])
+        keep, drop, add_a, add_b = self.templates
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(url, {"completed": [keep.id, add_a.id, add_b.id]}, follow=False)
+        self.assertEqual(response.status_code, 302)
+        done = set(SessionCompletion.objects.filter(user=self.mentee, completed=True).values_list("template_id", flat=True))
+        self.assertEqual(done, {keep.id, add_a.id, add_b.id})
+        writes = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith(("INSERT", 'UPDATE "dashboard_sessioncompletion'))]
+        self.assertEqual(len(writes), 2)
+
+        response = self.client.get(url)
+        self.assertIn("(3 changed)", str(list(response.context["messages"])[0]))
+
+
+@override_settings(QUERY_BUDGET_RAISE=True)
+class ProgressBitsetTests(TestCase):
+    def setUp(self):
+        self.mentee = make_user("mentee")
+        self.templates = [SessionTemplate.objects.create(title=f"Session {i}", order=i) for i in range(10)]
+        self.client.force_login(self.mentee)
+
+    def profile(self):
+        return Profile.objects.get(user=self.mentee)
+
+    def test_completion_changes_update_bits(self):
+        first, ninth = self.templates[0], self.templates[9]
+        SessionCompletion.objects.create(user=self.mentee, template=first, completed=True, completed_at=timezone.now())
+        done = SessionCompletion.objects.create(user=self.mentee, template=ninth, completed=True, completed_at=timezone.now())
+        profile = self.profile()
+        self.assertEqual(profile.completed_sessions_count, 2)
+        self.assertTrue(profile.has_completed(ninth))
+        self.assertFalse(profile.has_completed(self.templates[1]))
+
+        done.completed = False
+        done.save()
+        self.assertEqual(self.profile().completed_sessions_count, 1)
+
+        # slots survive reordering
+        first.order = 99
+        first.save()
+        self.assertTrue(self.profile().has_completed(first))
+
+    def test_dashboard_filters_from_bitset(self):
+        SessionCompletion.objects.create(user=self.mentee, template=self.templates[3], completed=True, completed_at=timezone.now())
+        response = self.client.get(reverse("dashboard"))
+        todo = [item["template"].id for item in response.context["session_items"]]
+        self.assertEqual(len(todo), 9)
+        self.assertNotIn(self.templates[3].id, todo)
+        self.assertEqual(response.context["sessions_completed"], 1)
+
+        response = self.client.get(reverse("dashboard") + "?filter=completed")
+        items = response.context["session_items"]
+        self.assertEqual([item["template"].id for item in items], [self.templates[3].id])
+        self.assertIsNotNone(items[0]["completion"].completed_at)
+
+    def test_reset_progress_clears_bits(self):
+        SessionCompletion.objects.create(user=self.mentee, template=self.templates[0], completed=True, completed_at=timezone.now())
+        self.client.post(reverse("reset_progress"))
+        profile = self.profile()
+        self.assertEqual(profile.completed_sessions_count, 0)
+        self.assertFalse(profile.has_completed(self.templates[0]))
+
+
+@override_settings(QUERY_BUDGET_RAISE=True)
+class MarkdownRenderingTests(TestCase):
+    def setUp(self):
+        rendering.clear()
+        self.addCleanup(rendering.clear)
+
+    def test_hits_misses_and_counters(self):
+        html = rendering.render_markdown("# Title")
+        self.assertIn("<h1>Title</h1>", html)
+        # a local-tier hit never touches the shared cache, not even to count
+        with mock.patch("dashboard.rendering._cache") as shared:
+            self.assertEqual(rendering.render_markdown("# Title"), html)
+        shared.assert_not_called()
+        rendering._local.clear()
+        self.assertEqual(rendering.render_markdown("# Title"), html)
+        stats = rendering.render_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+        self.assertAlmostEqual(stats["hit_rate"], 2 / 3)
+        rendering.reset_stats()
+        self.assertEqual(rendering.render_stats()["hits"], 0)
+
+    def test_admin_edit_invalidates_old_render(self):
+        template = SessionTemplate.objects.create(title="Intro", order=1, content_markdown="*old*")
+        old_key = rendering.cache_key("*old*")
+        rendering.render_markdown("*old*")
+        self.assertIsNotNone(rendering._cache().get(old_key))
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", None))
+        response = self.client.post(reverse("admin:dashboard_sessiontemplate_change", args=[template.pk]), {
+            "title": "Intro", "order": 1, "content_markdown": "*new*", "mentor_content_markdown": "",
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertIsNone(rendering._cache().get(old_key))
+        self.assertNotIn(old_key, rendering._local)
+        response = self.client.get(reverse("session_detail", args=[template.pk]))
+        self.assertContains(response, "<em>new</em>")
+
+
+class SessionCatalogTests(TestCase):
+    def test_reloads_only_when_version_changes(self):
+        first = SessionTemplate.objects.create(title="First", order=1, content_markdown="x" * 300)
+        catalog = get_catalog()
+        self.assertEqual([e.title for e in catalog], ["First"])
+        self.assertLessEqual(len(catalog.entries[0].preview), 120)
+        with self.assertNumQueries(0):
+            self.assertIs(get_catalog(), catalog)
+
+        SessionTemplate.objects.create(title="Zeroth", order=0)
+        self.assertEqual([e.title for e in get_catalog()], ["Zeroth", "First"])
+        first.delete()
+        self.assertEqual([e.title for e in get_catalog()], ["Zeroth"])
+
+    @override_settings(SESSION_CATALOG_MAX_AGE=0)
+    def test_reloads_after_max_age(self):
+        catalog = get_catalog()
+        self.assertIsNot(get_catalog(), catalog)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class EmailLoginTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="learner", email="Learner@Example.com", password="pass")
+
+    def test_backend_matches_email_case_insensitively_in_one_query(self):
+        with self.assertNumQueries(1):
+            user = authenticate(email="  LEARNER@example.COM", password="pass")
+            self.assertEqual(user, self.user)
+            self.assertFalse(user.profile.is_mentor)
+        self.assertIsNone(authenticate(email="learner@example.com", password="wrong"))
+        self.assertIsNone(authenticate(email="nobody@example.com", password="pass"))
+
+    def test_login_view(self):
+        response = self.client.post(reverse("login"), {"email": "learner@example.com", "password": "pass"})
+        self.assertRedirects(response, reverse("dashboard"), fetch_redirect_response=False)
+        response = self.client.post(reverse("login"), {"email": "learner@example.com", "password": "nope"})
+        self.assertEqual(response.context["form_error"], "Invalid email or password.")
+
+    def test_registration_rejects_email_differing_only_in_case(self):
+        form = CustomUserCreationForm(data={
+            "username": "other", "email": "LEARNER@example.com",
+            "password1": "a-long-passphrase-1", "password2": "a-long-passphrase-1",
+        })
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors["email"], ["This email address is already registered."])
+
+    def test_benchmark_command(self):
+        out = os.path.join(tempfile.mkdtemp(), "login.json")
+        call_command("benchmark_login", use_current_db=True, users=20, requests=3, logins=0, output=out, stdout=io.StringIO())
+        with open(out) as fh:
+            paths = json.load(fh)["paths"]
+        self.assertEqual(paths["indexed_lookup"]["queries"], 1)
+        self.assertEqual(paths["legacy_lookup"]["queries"], 3)
+
+
+class HashingPoolTests(TestCase):
+    def test_rejects_past_max_pending(self):
+        stats = HashingStats()
+        pool = HashingPool(workers=1, max_pending=1, stats=stats)
+        release = threading.Event()
+
+        async def scenario():
+            first = asyncio.ensure_future(pool.run("verify", release.wait))
+            await asyncio.sleep(0)
+            with self.assertRaises(HashingBusy):
+                await pool.run("verify", release.wait)
+            release.set()
+            await first
+
+        asyncio.run(scenario())
+        summary = stats.summary()
+        self.assertEqual(summary["rejected"], 1)
+        self.assertEqual(summary["pending"], 0)
+        self.assertEqual(summary["ops"][0]["count"], 1)
+
+    @override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+    def test_login_and_register_back_off_when_saturated(self):
+        User.objects.create_user(username="learner", email="learner@example.com", password="pass")
+        with mock.patch("dashboard.hashing.get_pool", return_value=HashingPool(max_pending=0, stats=HashingStats())):
+            response = self.client.post(reverse("login"), {"email": "learner@example.com", "password": "pass"})
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response["Retry-After"], "2")
+            response = self.client.post(reverse("register"), {
+                "email": "new@example.com", "password1": "a-Long-passw0rd", "password2": "a-Long-passw0rd",
+                "terms": "on", "is_mentor": "on",
+            })
+            self.assertEqual(response.status_code, 503)
+        self.assertFalse(User.objects.filter(email="new@example.com").exists())
+
+    @override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+    def test_register_hashes_in_pool(self):
+        response = self.client.post(reverse("register"), {
+            "email": "new@example.com", "password1": "a-Long-passw0rd", "password2": "a-Long-passw0rd",
+            "terms": "on", "is_mentor": "on",
+        })
+        self.assertRedirects(response, reverse("dashboard"), fetch_redirect_response=False)
+        self.assertTrue(User.objects.get(email="new@example.com").check_password("a-Long-passw0rd"))
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class CohortImportTests(TestCase):
+    def setUp(self):
+        self.mentor = make_user("mentor", is_mentor=True)
+        make_user("ana")
+
+    def test_csv_import_allocates_usernames_and_assigns_mentors(self):
+        rows = ["email,first_name,is_mentor,mentor"]
+        rows.append("coach@example.com,Coach,yes,")
+        rows += [f"ana@school{i}.org,Ana{i},,coach@example.com" for i in range(5)]
+        rows += ["bob@example.com,Bob,,mentor@example.com", "not-an-email,X,,", "bob@example.com,Dup,,", "eve@example.com,Eve,,nobody@example.com"]
+        out, err = io.StringIO(), io.StringIO()
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as fh:
+            fh.write("\n".join(rows))
+        call_command("import_cohort", fh.name, batch_size=3, stdout=out, stderr=err)
+
+        self.assertIn("Created 7 users", out.getvalue())
+        self.assertEqual(err.getvalue().count("row "), 3)
+        names = set(User.objects.filter(email__startswith="ana@school").values_list("username", flat=True))
+        self.assertEqual(names, {"ana1", "ana2", "ana3", "ana4", "ana5"})
+        coach = User.objects.get(email="coach@example.com")
+        self.assertTrue(coach.profile.is_mentor)
+        self.assertEqual(Profile.objects.filter(assigned_mentor=coach).count(), 5)
+        self.assertEqual(User.objects.get(email="bob@example.com").profile.assigned_mentor, self.mentor)
+
+    def test_jsonl_dry_run_and_one_prefix_query_per_base(self):
+        lines = [json.dumps({"email": f"sam@host{i}.example.com", "password": "pw"}) for i in range(4)]
+        lines.append(json.dumps({"email": "x@example.com", "username": "ana"}))
+        result = import_cohort(read_rows(io.StringIO("\n".join(lines)), "jsonl"), dry_run=True)
+        self.assertEqual(result.created, 4)
+        self.assertEqual(result.errors, [(5, "username ana is already taken")])
+        self.assertFalse(User.objects.filter(email__startswith="sam").exists())
+
+        with CaptureQueriesContext(connection) as ctx:
+            import_cohort(read_rows(io.StringIO("\n".join(lines[:4])), "jsonl"))
+        prefix_queries = [q for q in ctx.captured_queries if 'SELECT "auth_user"."username"' in q["sql"]]
+        self.assertEqual(len(prefix_queries), 1)
+
+    def test_overlong_username_skips_only_its_row(self):
+        lines = [
+            json.dumps({"email": "long@example.com", "username": "x" * 151}),
+            json.dumps({"email": "kim@example.com", "username": "kim"}),
+        ]
+        result = import_cohort(read_rows(io.StringIO("\n".join(lines)), "jsonl"))
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.errors, [(1, f"username {'x' * 151} is longer than 150 characters")])
+        self.assertTrue(User.objects.filter(username="kim").exists())
+
+    def test_stored_errors_are_capped(self):
+        lines = [json.dumps({"email": f"bad{i}"}) for i in range(5)]
+        with mock.patch("dashboard.onboarding.MAX_ERRORS", 2):
+            result = import_cohort(read_rows(io.StringIO("\n".join(lines)), "jsonl"), batch_size=2)
+        self.assertEqual(result.skipped, 5)
+        self.assertEqual([number for number, _ in result.errors], [1, 2])
+
+    def test_passwords_hashed_in_pool_and_skipped_on_dry_run(self):
+        lines = [json.dumps({"email": f"pat{i}@example.com", "password": f"pw{i}"}) for i in range(3)]
+        with mock.patch("dashboard.onboarding.make_password", wraps=make_password) as hasher:
+            import_cohort(read_rows(io.StringIO("\n".join(lines)), "jsonl"), dry_run=True)
+            self.assertEqual([c.args for c in hasher.call_args_list], [(None,)])
+            import_cohort(read_rows(io.StringIO("\n".join(lines)), "jsonl"), hash_workers=2)
+        for i in range(3):
+            self.assertTrue(User.objects.get(email=f"pat{i}@example.com").check_password(f"pw{i}"))
+
+    @mock.patch("dashboard.admin.ADMIN_MAX_PASSWORDS", 1)
+    def test_admin_upload_sends_large_password_files_to_the_command(self):
+        admin = User.objects.create_superuser("admin", "admin@example.com", None)
+        self.client.force_login(admin)
+        data = b"email,password\na@example.com,pw\nb@example.com,pw\n"
+        response = self.client.post(
+            reverse("admin:dashboard_profile_import_cohort"), {"file": SimpleUploadedFile("c.csv", data)}
+        )
+        self.assertContains(response, "manage.py import_cohort")
+        self.assertFalse(User.objects.filter(email="a@example.com").exists())
+        response = self.client.post(
+            reverse("admin:dashboard_profile_import_cohort"), {"file": SimpleUploadedFile("c.csv", data), "dry_run": "on"}
+        )
+        self.assertEqual(response.context["result"].created, 2)
+
+    def test_admin_upload(self):
+        admin = User.objects.create_superuser("admin", "admin@example.com", None)
+        self.client.force_login(admin)
+        upload = SimpleUploadedFile("cohort.csv", b"email,mentor\nnew@example.com,mentor@example.com\n")
+        response = self.client.post(reverse("admin:dashboard_profile_import_cohort"), {"file": upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(User.objects.get(email="new@example.com").profile.assigned_mentor, self.mentor)
+
+
+@override_settings(QUERY_BUDGET_RAISE=True)
+class RequestProfileTests(TestCase):
+    def setUp(self):
+        self.mentor = make_user("mentor", is_mentor=True)
+        self.learner = make_user("learner", mentor=self.mentor)
+
+    def test_user_save_does_not_touch_profile(self):
+        with self.assertNumQueries(1):
+            self.learner.save()
+
+    def test_session_user_arrives_with_profile(self):
+        self.client.force_login(self.learner)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("dashboard"))
+        profile_lookups = [q for q in ctx.captured_queries if q["sql"].startswith('SELECT "dashboard_profile"')]
+        self.assertEqual(profile_lookups, [])
+
+    def test_user_without_profile_is_provisioned(self):
+        Profile.objects.filter(user=self.learner).delete()
+        self.client.force_login(self.learner)
+        self.assertEqual(self.client.get(reverse("dashboard")).status_code, 200)
+        self.assertTrue(Profile.objects.filter(user=self.learner).exists())
+
+    def test_mentor_required(self):
+        url = reverse("mentor_dashboard")
+        self.assertRedirects(self.client.get(url), reverse("login") + "?next=" + url, fetch_redirect_response=False)
+        self.client.force_login(self.learner)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(self.mentor)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+
+@override_settings(QUERY_BUDGET_RAISE=True)
+class SharedCacheTests(TestCase):
+    def make_cache(self, path, **options):
+        return SQLiteCache(path, {"OPTIONS": {"TABLE": "cache_test", **options}})
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "cache.sqlite3")
+        self.cache = self.make_cache(self.path)
+
+    def test_shared_between_instances(self):
+        # two instances on one file stand in for two worker processes
+        other = self.make_cache(self.path)
+        self.cache.set("k", {"a": 1})
+        self.assertEqual(other.get("k"), {"a": 1})
+        self.assertFalse(other.add("k", 2))
+        self.cache.set("n", 1)
+        self.assertEqual(other.incr("n", 2), 3)
+        self.assertEqual(self.cache.get_many(["k", "n", "missing"]), {"k": {"a": 1}, "n": 3})
+        self.assertTrue(other.delete("k"))
+        self.assertIsNone(self.cache.get("k"))
+
+    def test_ttl_expiry(self):
+        self.cache.set("k", "v", timeout=60)
+        later = time.time() + 3600
+        with mock.patch("dashboard.cache.time.time", return_value=later):
+            self.assertIsNone(self.cache.get("k"))
+            self.assertFalse(self.cache.has_key("k"))
+            # an expired key can be added again
+            self.assertTrue(self.cache.add("k", "new", timeout=60))
+        self.assertEqual(self.cache.get("k"), "new")
+
+    def test_cull_drops_expired_and_excess_rows(self):
+        cache = self.make_cache(self.path, MAX_ENTRIES=10, CULL_FREQUENCY=2, CULL_EVERY=5)
+        cache.set_many({f"old{i}": i for i in range(3)}, timeout=-1)
+        cache.set_many({f"k{i}": i for i in range(12)})
+        rows = cache._conn().execute("SELECT COUNT(*) FROM cache_test").fetchone()[0]
+        self.assertEqual(rows, 6)
+
+    def test_cull_counts_writes_across_request_instances(self):
+        # under ASGI each request context gets its own instance from `caches`
+        options = {"TABLE": "cache_test", "MAX_ENTRIES": 10, "CULL_FREQUENCY": 2, "CULL_EVERY": 4}
+        backend = {"BACKEND": "dashboard.cache.SQLiteCache", "LOCATION": self.path, "OPTIONS": options}
+
+        async def write(i):
+            cache = caches["cull_test"]
+            await sync_to_async(cache.set)(f"k{i}", i)
+            return cache
+
+        with override_settings(CACHES={**settings.CACHES, "cull_test": backend}):
+            # a fresh context per write, as each ASGI request task has
+            instances = [contextvars.Context().run(async_to_sync(write), i) for i in range(12)]
+            self.assertEqual(len({id(cache) for cache in instances}), 12)
+            self.assertEqual(len({id(cache._conn()) for cache in instances}), 1)
+        rows = self.cache._conn().execute("SELECT COUNT(*) FROM cache_test").fetchone()[0]
+        self.assertEqual(rows, 6)
+
+    def test_get_or_set_computes_once(self):
+        calls = []
+
+        def slow():
+            calls.append(1)
+            threading.Event().wait(0.2)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.make_cache(self.path, LOCK_POLL=0.01).get_or_set("k", slow)))
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, ["value"] * 4)
+        self.assertEqual(len(calls), 1)
+
+    def test_sessions_served_from_cache(self):
+        self.assertEqual(settings.SESSION_ENGINE, "django.contrib.sessions.backends.cached_db")
+        user = make_user("learner")
+        self.client.force_login(user)
+        self.client.get(reverse("dashboard"))
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("dashboard"))
+        session_queries = [q for q in ctx.captured_queries if "django_session" in q["sql"]]
+        self.assertEqual(session_queries, [])
+
+
+class StaticAssetTests(TestCase):
+    def test_collectstatic_hashes_and_compresses(self):
+
+        source, root = tempfile.mkdtemp(), tempfile.mkdtemp()
+        os.makedirs(os.path.join(source, "css"))
+        with open(os.path.join(source, "css", "site.css"), "w") as fh:
+            fh.write(".p-4{padding:1rem}" * 50)
+        with override_settings(STATICFILES_DIRS=[source], STATIC_ROOT=root, INSTALLED_APPS=["dashboard", "django.contrib.staticfiles"]):
+            call_command("collectstatic", interactive=False, verbosity=0)
+            url = static("css/site.css")
+            # a manifest left over from a local collectstatic doesn't leak into DEBUG pages
+            with override_settings(DEBUG=True):
+                self.assertEqual(static("css/site.css"), "/static/css/site.css")
+        self.assertRegex(url, r"^/static/css/site\.[0-9a-f]{12}\.css$")
+        hashed = os.path.join(root, url[len("/static/"):])
+        with open(hashed, "rb") as fh:
+            original = fh.read()
+        with gzip.open(hashed + ".gz") as fh:
+            self.assertEqual(fh.read(), original)
+        if storage.brotli is not None:
+            self.assertTrue(os.path.exists(hashed + ".br"))
+
+    def test_templates_use_built_stylesheet(self):
+        response = self.client.get(reverse("login"))
+        self.assertContains(response, '<link rel="stylesheet" href="/static/css/site.css" />', html=False)
+        self.assertNotContains(response, "cdn.tailwindcss.com")
+
+
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        query_stats.reset()
+        self.mentor = make_user("mentor", is_mentor=True)
+        self.client.force_login(self.mentor)
+
+    @override_settings(QUERY_BUDGETS={"mentor_dashboard": 2}, QUERY_BUDGET_RAISE=True)
+    def test_exceeding_budget_raises(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse("mentor_dashboard"))
+
+    async def test_records_queries_under_asgi(self):
+        # sync views run on a sync_to_async thread with its own connection
+        self.async_client.cookies = self.client.cookies
+        response = await self.async_client.get(reverse("mentor_dashboard"))
+        self.assertEqual(response.status_code, 200)
+        row = next(row for row in query_stats.summary() if row["view"] == "mentor_dashboard")
+        self.assertGreater(row["queries_avg"], 0)
+        with override_settings(QUERY_BUDGETS={"mentor_dashboard": 2}, QUERY_BUDGET_RAISE=True):
+            with self.assertRaises(QueryBudgetExceeded):
+                await self.async_client.get(reverse("mentor_dashboard"))
+
+    def test_report_lists_recorded_views(self):
+        self.client.get(reverse("mentor_dashboard"))
+        self.mentor.is_staff = True
+        self.mentor.save()
+        response = self.client.get(reverse("query_report"))
+        self.assertEqual(response.status_code, 200)
+        views = [row["view"] for row in response.context["rows"]]
+        self.assertIn("mentor_dashboard", views)
+
+
+class WorkerMonitorTests(TestCase):
+    def make_monitor(self, sizes, **kwargs):
+        server = mock.Mock(WORKERS={pid: object() for pid in sizes})
+
+        def measure(pid):
+            return {"rss": 60 * MB, "pss": sizes.get(pid, 20 * MB), "uss": sizes.get(pid, 20 * MB)}
+
+        options = {"worker_max_bytes": 100 * MB, "total_max_bytes": 400 * MB, "min_lifetime": 0, **kwargs}
+        return WorkerMonitor(server, measure=measure, **options)
+
+    @mock.patch("dashboard.workers.os.kill")
+    def test_recycles_one_worker_over_budget(self, kill):
+        monitor = self.make_monitor({11: 50 * MB, 12: 150 * MB, 13: 120 * MB})
+        monitor.check()
+        kill.assert_called_once_with(12, signal.SIGTERM)
+        # 12 is still draining, so 13 waits for the next check after it is gone
+        monitor.check()
+        self.assertEqual(kill.call_count, 1)
+        del monitor.server.WORKERS[12]
+        monitor.check()
+        kill.assert_called_with(13, signal.SIGTERM)
+
+    @mock.patch("dashboard.workers.os.kill")
+    def test_total_budget_and_min_lifetime(self, kill):
+        monitor = self.make_monitor({11: 90 * MB, 12: 80 * MB}, total_max_bytes=150 * MB, min_lifetime=3600)
+        monitor.check()
+        kill.assert_not_called()
+        monitor.min_lifetime = 0
+        monitor.check()
+        kill.assert_called_once_with(11, signal.SIGTERM)
+
+    def test_exports_samples_for_the_report(self):
+        path = os.path.join(tempfile.mkdtemp(), "workers.json")
+        self.make_monitor({11: 30 * MB}, stats_path=path).check()
+        stats = read_worker_stats(path)
+        self.assertEqual([w["pid"] for w in stats["workers"]], [11])
+        self.assertEqual(stats["total_pss"], 30 * MB)
+
+        staff = make_user("staff")
+        staff.is_staff = True
+        staff.save()
+        self.client.force_login(staff)
+        with override_settings(WORKER_STATS_PATH=path):
+            response = self.client.get(reverse("query_report"))
+        self.assertContains(response, "30.0\xa0MB")
+
+    def test_memory_info(self):
+        info = memory_info(os.getpid())
+        self.assertGreater(info["rss"], 0)
+        self.assertIsNone(memory_info(2 ** 22 + 1))
+
+
+class DatabasePoolTests(TestCase):
+    def test_summarize(self):
+        stats = summarize({
+            "pool_min": 1, "pool_max": 4, "pool_size": 3, "pool_available": 1, "requests_num": 10,
+            "requests_queued": 4, "requests_wait_ms": 10, "connections_lost": 1,
+        })
+        self.assertEqual(stats["in_use"], 2)
+        self.assertEqual(stats["checkouts"], 10)
+        self.assertEqual(stats["wait_ms_avg"], 2.5)
+        self.assertEqual(stats["connections_lost"], 1)
+        self.assertEqual(summarize({})["wait_ms_avg"], 0.0)
+
+    @skipIf(PoolTimeout is None, "psycopg_pool is not installed")
+    def test_checkout_timeout_is_a_503(self):
+        try:
+            raise OperationalError("couldn't get a connection") from PoolTimeout("timeout")
+        except OperationalError as exc:
+            error = exc
+        self.assertTrue(is_pool_timeout(error))
+        self.assertFalse(is_pool_timeout(OperationalError("server closed the connection")))
+        User.objects.create_user(username="learner", password="pass")
+        self.client.login(username="learner", password="pass")
+        with mock.patch("dashboard.views.get_catalog", side_effect=error):
+            response = self.client.get(reverse("dashboard"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "2")
+
+    def timeout_in_middleware(self, request):
+        # what dashboard.postgresql does when a checkout times out
+        note_pool_timeout()
+        raise OperationalError("couldn't get a connection") from PoolTimeout("timeout")
+
+    @skipIf(PoolTimeout is None, "psycopg_pool is not installed")
+    def test_checkout_timeout_outside_the_view_is_a_503(self):
+        # ProfileMiddleware's layer turns the error into a 500 before
+        # DatabaseBusyMiddleware sees it
+        self.client.raise_request_exception = False
+        with mock.patch("dashboard.middleware.ProfileMiddleware.__call__", self.timeout_in_middleware):
+            response = self.client.get(reverse("dashboard"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "2")
+
+        with mock.patch("dashboard.middleware.ProfileMiddleware.__call__", side_effect=OperationalError("gone")):
+            self.assertEqual(self.client.get(reverse("dashboard")).status_code, 500)
+
+    @skipIf(PoolTimeout is None, "psycopg_pool is not installed")
+    async def test_checkout_timeout_outside_the_view_is_a_503_under_asgi(self):
+        self.async_client.raise_request_exception = False
+        with mock.patch("dashboard.middleware.ProfileMiddleware.__call__", self.timeout_in_middleware):
+            response = await self.async_client.get(reverse("dashboard"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "2")
+
+    def test_stats(self):
+        call_command("db_pool_check", threads=2, checkouts=3, hold_ms=0, stdout=io.StringIO())
+        stats = pool_stats()
+        if connection.vendor != "postgresql" or "pool" not in connection.settings_dict["OPTIONS"]:
+            self.assertEqual(stats, {})
+        else:
+            self.assertGreaterEqual(stats["default"]["checkouts"], 6)
+
+
+@override_settings(DATABASE_REPLICA="replica", QUERY_BUDGET_RAISE=True)
+class ReplicaRoutingTests(TestCase):
+    # the test "replica" is a separate database that replication never fills,
+    # so a row saved only there shows which one answered
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.user = make_user("learner")
+        self.on_primary = SessionTemplate.objects.create(title="On the primary", order=1)
+        self.on_replica = SessionTemplate(pk=1000, title="Only on the replica", order=2, progress_slot=99)
+        self.on_replica.save(using="replica")
+        self.client.force_login(self.user)
+
+    def detail(self, template):
+        return self.client.get(reverse("session_detail", args=[template.pk])).status_code
+
+    def test_read_only_views_read_from_replica(self):
+        self.assertEqual(self.detail(self.on_replica), 200)
+        self.assertEqual(self.detail(self.on_primary), 404)
+        self.assertNotIn(settings.REPLICA_PIN_COOKIE, self.client.cookies)
+        with override_settings(DATABASE_REPLICA=None):
+            self.assertEqual(self.detail(self.on_primary), 200)
+
+    def test_writes_pin_the_user_to_the_primary(self):
+        response = self.client.post(reverse("complete_session", args=[self.on_primary.pk]))
+        self.assertEqual(response.cookies[settings.REPLICA_PIN_COOKIE]["max-age"], settings.REPLICA_PIN_SECONDS)
+        self.assertEqual(self.detail(self.on_primary), 200)
+        self.assertEqual(self.detail(self.on_replica), 404)
+
+        self.client.cookies[settings.REPLICA_PIN_COOKIE] = str(int(time.time()) - 1)
+        self.assertEqual(self.detail(self.on_replica), 200)
+
+    async def test_writes_pin_the_user_under_asgi(self):
+        # sync views run on a sync_to_async thread with its own connection
+        self.async_client.cookies = self.client.cookies
+        response = await self.async_client.post(reverse("complete_session", args=[self.on_primary.pk]))
+        self.assertIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+        response = await self.async_client.get(reverse("session_detail", args=[self.on_replica.pk]))
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.get(reverse("session_detail", args=[self.on_primary.pk]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_thread_from_a_lagging_replica_marks_only_what_was_shown(self):
+        mentor = make_user("mentor", is_mentor=True)
+        Profile.objects.filter(user=self.user).update(assigned_mentor=mentor)
+        shown = Message.objects.create(sender=mentor, recipient=self.user, body="replicated")
+        Message.objects.create(sender=mentor, recipient=self.user, body="not replicated yet")
+        # copy what replication had caught up on; bulk_create sends no signals
+        User.objects.using("replica").bulk_create(User.objects.all())
+        Profile.objects.using("replica").bulk_create(Profile.objects.all())
+        Message.objects.using("replica").bulk_create(Message.objects.filter(pk=shown.pk))
+
+        response = self.client.get(reverse("message_thread", args=[mentor.id]))
+        self.assertEqual([m.body for m in response.context["thread"]], ["replicated"])
+        unread = Message.objects.filter(recipient=self.user, read=False)
+        self.assertEqual([m.body for m in unread], ["not replicated yet"])
+        self.assertEqual(Profile.objects.get(user=self.user).unread_messages_count, 1)
+        a, b = Conversation.pair_ids(self.user.id, mentor.id)
+        counter = "unread_for_a" if self.user.id == a else "unread_for_b"
+        self.assertEqual(getattr(Conversation.objects.get(user_a_id=a, user_b_id=b), counter), 1)
+
+    def test_only_changed_rows_count_as_writes(self):
+        with replicas.routing() as state, connection.execute_wrapper(state):
+            state.replica_ok = True
+            self.assertEqual(SessionTemplate.objects.all().db, "replica")
+            Message.objects.filter(read=False).update(read=True)
+            self.assertFalse(state.wrote)
+            SessionTemplate.objects.filter(pk=self.on_primary.pk).update(order=5)
+            self.assertTrue(state.wrote)
+            # read-your-writes within the request too
+            self.assertEqual(SessionTemplate.objects.all().db, "default")
+        self.assertEqual(SessionTemplate.objects.all().db, "default")
+
+    def test_sync_replica_needs_a_replica(self):
+        with override_settings(DATABASE_REPLICA=None), self.assertRaises(CommandError):
+            call_command("sync_replica", stdout=io.StringIO())
+
+
+class StartupTests(TestCase):
+    def setUp(self):
+        self.addCleanup(startup.timings.clear)
+
+    def test_process_start_and_marks(self):
+        self.assertLess(startup.process_started_at(), time.time())
+        startup.mark("app loaded")
+        self.assertGreater(startup.timings["app loaded"], 0)
+
+    def test_install_warms_up_and_records_first_response(self):
+        from django.core.signals import request_finished
+
+        with override_settings(STARTUP_WARMUP=True):
+            startup.install()
+        self.assertIn("warmup", startup.timings)
+        self.assertIn("markdown", sys.modules)
+        request_finished.send(sender=None)
+        first = startup.timings["first response"]
+        request_finished.send(sender=None)
+        self.assertEqual(startup.timings["first response"], first)
+
+    def test_profile_command(self):
+        out = os.path.join(tempfile.mkdtemp(), "startup.json")
+        call_command("startup_profile", runs=1, output=out, stdout=io.StringIO())
+        with open(out) as fh:
+            results = json.load(fh)
+        self.assertEqual(set(results["scenarios"]), {"no bytecode", "bytecode", "bytecode + warmup"})
+        self.assertIn("django", [row["package"] for row in results["imports"]["packages"]])
+
+
+class BenchmarkCommandTests(TestCase):
+    def test_small_run_writes_json_and_checks_baseline(self):
+        out = os.path.join(tempfile.mkdtemp(), "bench.json")
+        call_command(
+            "benchmark_views", use_current_db=True, mentors=1, mentees_per_mentor=2, unassigned=2,
+            templates=2, messages_per_pair=3, requests=2, warmup=0, output=out, stdout=io.StringIO(),
+        )
+        with open(out) as fh:
+            results = json.load(fh)
+        self.assertEqual(set(results["views"]), {
+            "dashboard", "session_detail", "message_thread",
+            "mentor_dashboard", "mentor_messages", "mentor_message_thread",
+        })
+        self.assertIn("p99_ms", results["views"]["dashboard"])
+
+        results["views"]["dashboard"]["queries"] = 1
+        with open(out, "w") as fh:
+            json.dump(results, fh)
+        with self.assertRaises(CommandError):
+            call_command(
+                "benchmark_views", use_current_db=True, mentors=1, mentees_per_mentor=2, unassigned=2,
+                templates=2, messages_per_pair=3, requests=2, warmup=0, baseline=out,
+                seed=1, prefix="bench2", stdout=io.StringIO(),
+            )
+
+
+class SyntheticDataTests(TestCase):
+    def test_generation_is_deterministic_and_restores_signals(self):
+        first = seed_cohort(mentors=2, mentees_per_mentor=3, unassigned=2, templates=3, messages_per_pair=4, seed=7, prefix="a", chunk_size=2)
+        second = seed_cohort(mentors=2, mentees_per_mentor=3, unassigned=2, templates=3, messages_per_pair=4, seed=7, prefix="b", chunk_size=5)
+        self.assertEqual(first.totals, second.totals)
+        self.assertEqual(Conversation.objects.count(), 12)
+        unread = Message.objects.filter(recipient_id=first.mentor_ids[0], read=False).count()
+        self.assertEqual(Profile.objects.get(user_id=first.mentor_ids[0]).unread_messages_count, unread)
+        learner = Profile.objects.get(user_id=first.mentee_ids[0])
+        self.assertEqual(learner.completed_sessions_count, SessionCompletion.objects.filter(user_id=learner.user_id, completed=True).count())
+
+        # signals are reconnected afterwards
+        self.assertTrue(hasattr(make_user("after"), "profile"))
@@ -20,6 +20,8 @@ urlpatterns = [
     path('mentor/messages/', views.mentor_messages, name='mentor_messages'),
     path('mentor/messages/<int:user_id>/', views.mentor_message_thread, name='mentor_message_thread'),
     path('messages/thread/<int:user_id>/', views.message_thread, name='message_thread'),
+    path('messages/thread/<int:user_id>/since/', views.message_thread_since, name='message_thread_since'),
+    path('messages/events/', views.message_events, name='message_events'),
     path('logout/', logout_then_login, {'login_url': '/dashboard/login/'}, name='logout'),
     path('', views.dashboard, name='dashboard'),
 ]
\ No newline at end of file
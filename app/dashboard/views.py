@@ -1,231 +1,189 @@
 from django.shortcuts import render, redirect
-from django.contrib.auth import authenticate, login as auth_login
+from asgiref.sync import sync_to_async
+from django.contrib.auth import aauthenticate, alogin
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.models import User
 from django.contrib import messages
 from .forms import CustomUserCreationForm
+from .rendering import render_markdown, render_stats, reset_stats
+from .pagination import page_before, page_after, encode_cursor, InvalidCursor
+from .pubsub import get_broker, user_channel
+from .middleware import query_stats
+from .progress import has_slot
+from .catalog import get_catalog
+from .access import get_profile, mentor_required
+from .hashing import HashingBusy, amake_password, hashing_stats
+from .workers import read_worker_stats
+from .dbpool import pool_stats
+from .replicas import read_replica
+from . import startup
 from django.utils import timezone
 from datetime import datetime
+import json
+import os
+import time
+from django.conf import settings
 from django.views.decorators.http import require_http_methods
 from django.shortcuts import get_object_or_404
-from django.utils.safestring import mark_safe
-import markdown as md
-from .models import SessionTemplate, SessionCompletion, Profile, MEETING_TOOL_CHOICES, Message
-from django.db.models import Q
+from .models import SessionTemplate, SessionCompletion, Profile, MEETING_TOOL_CHOICES, Message, Conversation, QuestionBank
+from .question_bank import get_test
+from django.db.models import Q, Count
+from django.core.paginator import Paginator
 from django.utils import timezone
-from django.http import HttpResponseForbidden
+from django.http import Http404, HttpResponseForbidden, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 
+# Page size for the mentor dashboard's "Available Students" list
+CANDIDATES_PER_PAGE = 25
+# Messages per page in a thread (older ones load via cursor links)
+THREAD_PAGE_SIZE = 50
+# Shown with a 503 when the password hashing pool is saturated
+BUSY_MESSAGE = "We're signing in a lot of people right now. Please try again in a few seconds."
 
-@login_required(login_url='login')
-@require_http_methods(["GET", "POST"])
-def english_test(request):
-    """Render and grade a 20-question English test (20 options each).
 
-    For simplicity the questions and correct answers are defined here. On POST
-    we compute score, save it to the user's profile, mark intro_test_done and
-    redirect back to the dashboard.
+def _take_test(request, slug, template_name, field_prefix, label):
+    """Render a test from its question bank, or grade a submission and store the score.
+
+    ``field_prefix`` names the Profile fields to fill (``<prefix>_score``,
+    ``<prefix>_taken_at``, ``<prefix>_done``).
     """
-    # Sample questions: each question has 20 options; correct index stored in answers list
-        # Curated question bank (20 questions) with difficulties.
-        # Each question has a small set of options (4) and a difficulty tag.
-    qb = [
-            {"text": "Choose the correct form: 'There ___ many people at the party.'", "options": ["is", "are", "was", "be"], "answer": "2", "difficulty": "easy"},
-            {"text": "Select the correct past tense: 'I ___ to the store yesterday.'", "options": ["go", "goed", "went", "gone"], "answer": "3", "difficulty": "easy"},
-            {"text": "Which sentence is grammatically correct?", "options": ["She don't like tea.", "She doesn't likes tea.", "She doesn't like tea.", "She not like tea."], "answer": "3", "difficulty": "easy"},
-            {"text": "Choose the best word: 'He is very ___ about football.'", "options": ["interesting", "interested", "interest", "interestful"], "answer": "2", "difficulty": "easy"},
-            {"text": "Fill the blank: 'If I ___ time, I would help you.'", "options": ["have", "had", "will have", "would have"], "answer": "2", "difficulty": "medium"},
-            {"text": "Choose the correct preposition: 'She is good ___ mathematics.'", "options": ["in", "at", "on", "for"], "answer": "2", "difficulty": "medium"},
-            {"text": "Select the sentence with the correct article usage.", "options": ["I saw a eagle.", "I saw an eagle.", "I saw the eagle.", "I saw eagle."], "answer": "2", "difficulty": "medium"},
-            {"text": "Which word best fits: 'Their house is ___ than mine.'", "options": ["big", "bigger", "more big", "biggest"], "answer": "2", "difficulty": "medium"},
-            {"text": "Choose the correct phrasal verb: 'She decided to ___ smoking.'", "options": ["give up", "put up", "take up", "bring up"], "answer": "1", "difficulty": "medium"},
-            {"text": "Identify the correct passive form: 'They will finish the project next week.' →", "options": ["The project will be finished next week.", "The project will finished next week.", "The project is finished next week.", "The project be finished next week."], "answer": "1", "difficulty": "medium"},
-            {"text": "Choose the word closest in meaning to 'abundant'.", "options": ["scarce", "plentiful", "tiny", "rare"], "answer": "2", "difficulty": "medium"},
-            {"text": "Which is the correct conditional: 'If he ___ earlier, he would have caught the train.'", "options": ["arrived", "had arrived", "has arrived", "would arrive"], "answer": "2", "difficulty": "hard"},
-            {"text": "Choose the best connector: '___ she was tired, she finished her work.'", "options": ["Although", "Because", "So", "Therefore"], "answer": "1", "difficulty": "hard"},
-            {"text": "Identify the error: 'Neither of the answers are correct.'", "options": ["Neither", "of", "are", "correct"], "answer": "3", "difficulty": "hard"},
-            {"text": "Choose the correct tense: 'By this time next year, I ___ my degree.'", "options": ["will finish", "will have finished", "finished", "have finished"], "answer": "2", "difficulty": "hard"},
-            {"text": "Pick the most formal synonym for 'get' in the sentence: 'We need to get permission.'", "options": ["obtain", "have", "fetch", "take"], "answer": "1", "difficulty": "hard"},
-            {"text": "Choose the sentence with correct subject-verb agreement.", "options": ["Each of the students have a book.", "Each of the students has a book.", "Each of the student have a book.", "Each of the students are having a book."], "answer": "2", "difficulty": "medium"},
-            {"text": "Which word best completes the collocation: '___ a decision'", "options": ["Make", "Do", "Take", "Have"], "answer": "1", "difficulty": "easy"},
-            {"text": "Choose the correct reported speech: 'He said, \"I am tired.\"' →", "options": ["He said that he is tired.", "He said that he was tired.", "He said he will be tired.", "He said that he had been tired."], "answer": "2", "difficulty": "medium"},
-            {"text": "Fill in the blank with the correct preposition: 'She is keen ___ learning languages.'", "options": ["in", "on", "for", "about"], "answer": "4", "difficulty": "medium"},
-        ]
-
-    questions = []
-    answers = []
-    for idx, item in enumerate(qb, start=1):
-        questions.append({"id": idx, "text": item['text'], "options": item['options'], "difficulty": item['difficulty']})
-        answers.append(str(item['answer']))
+    try:
+        test = get_test(slug)
+    except QuestionBank.DoesNotExist:
+        raise Http404('Test not found')
 
     if request.method == 'POST':
-        score = 0
-        total = len(questions)
-        for idx, q in enumerate(questions, start=1):
-            key = f"q{idx}"
-            val = request.POST.get(key)
-            if val and val == answers[idx-1]:
-                score += 1
+        score = test.grade(request.POST)
+        total = test.total
 
         # Save to profile
-        try:
-            profile = request.user.profile
-        except Exception:
-            profile = None
+        profile = request.profile
         if profile:
-            profile.intro_test_score = score
-            profile.intro_test_taken_at = timezone.now()
-            profile.intro_test_done = True
-            profile.save()
+            setattr(profile, f'{field_prefix}_score', score)
+            setattr(profile, f'{field_prefix}_taken_at', timezone.now())
+            setattr(profile, f'{field_prefix}_done', True)
+            profile.save(update_fields=[f'{field_prefix}_score', f'{field_prefix}_taken_at', f'{field_prefix}_done', 'updated_at'])
 
-        messages.success(request, f'You scored {score}/{total} on the introductory English test.')
+        messages.success(request, f'You scored {score}/{total} on the {label}.')
         return redirect('dashboard')
 
-    context = {"questions": questions}
-    return render(request, 'english_test.html', context)
+    # the question list is cached per bank version in the template
+    context = {"test": test}
+    return render(request, template_name, context)
+
+
+@login_required(login_url='login')
+@require_http_methods(["GET", "POST"])
+def english_test(request):
+    """Render and grade the introductory English test (question bank "intro").
+
+    On POST we compute score, save it to the user's profile, mark
+    intro_test_done and redirect back to the dashboard.
+    """
+    return _take_test(request, 'intro', 'english_test.html', 'intro_test', 'introductory English test')
 
 
 @login_required(login_url='login')
 @require_http_methods(["GET", "POST"])
 def end_test(request):
-    """Advanced (B2-level) end-of-course test.
+    """Advanced (B2-level) end-of-course test (question bank "end").
 
     Only available if the user has completed all SessionTemplate items.
     """
-    total_templates = SessionTemplate.objects.count()
-    completed_count = SessionCompletion.objects.filter(user=request.user, completed=True).count()
+    total_templates = len(get_catalog())
+    # completed count is kept on the profile (see Profile.refresh_progress)
+    completed_count = request.profile.completed_sessions_count
     if total_templates == 0 or completed_count < total_templates:
         messages.error(request, "You must complete all sessions before taking the end test.")
         return redirect('dashboard')
 
-    # B2-style question bank (shortened for brevity; use 20 Qs)
-    qb = [
-        {"text": "Choose the best option: If I ___ earlier, I would have helped.", "options": ["had arrived", "arrived", "have arrived", "would arrive"], "answer": "1", "difficulty": "hard"},
-        {"text": "Which sentence is most natural?", "options": ["Despite of the rain, we went out.", "Although the rain, we went out.", "Although it rained, we went out.", "Despite it was raining, we went out."], "answer": "3", "difficulty": "hard"},
-        {"text": "Choose the best collocation: to ___ a decision.", "options": ["make", "have", "take", "do"], "answer": "1", "difficulty": "medium"},
-        {"text": "Which is the correct passive: 'They will have finished the work.' →", "options": ["The work will be finished by them.", "The work will have been finished.", "The work will be finish.", "The work will have finished."], "answer": "2", "difficulty": "hard"},
-        {"text": "Select the sentence without error.", "options": ["Neither of the books are interesting.", "Neither of the books is interesting.", "Neither the books are interesting.", "Neither of the books were interesting."], "answer": "2", "difficulty": "hard"},
-        {"text": "Choose the correct modal: You ___ have told me earlier.", "options": ["should", "must", "might", "couldn't"], "answer": "1", "difficulty": "medium"},
-        {"text": "Pick the best meaning of 'albeit' in context:", "options": ["although", "because", "so that", "unless"], "answer": "1", "difficulty": "hard"},
-        {"text": "Choose the correct reduction: 'I have to' →", "options": ["I hafta", "I have to", "I'va", "I gotta"], "answer": "1", "difficulty": "medium"},
-        {"text": "Which is more formal? 'Ask' vs 'request' → choose the most formal.", "options": ["ask", "request", "tell", "order"], "answer": "2", "difficulty": "medium"},
-        {"text": "Choose the correct preposition: 'He is good ___ managing people.'", "options": ["in", "at", "on", "for"], "answer": "2", "difficulty": "medium"},
-        {"text": "Identify the most appropriate link word: '___ he was tired, he continued.'", "options": ["Although", "Because", "So", "Therefore"], "answer": "1", "difficulty": "hard"},
-        {"text": "Choose the right conditional: 'If she ___ known, she would have acted.'", "options": ["has", "had", "have", "was"], "answer": "2", "difficulty": "hard"},
-        {"text": "Choose the correct collocation: 'to ___ a contribution'", "options": ["make", "do", "take", "have"], "answer": "1", "difficulty": "medium"},
-        {"text": "Which sentence uses reported speech correctly?", "options": ["She said she will come.", "She said she would come.", "She said she comes.", "She said she'll come."], "answer": "2", "difficulty": "medium"},
-        {"text": "Choose the most precise verb: 'to improve' — which is more intense?", "options": ["enhance", "get better", "fix", "alter"], "answer": "1", "difficulty": "medium"},
-        {"text": "Which word completes: 'He has a good command ___ English.'", "options": ["on", "of", "in", "for"], "answer": "3", "difficulty": "medium"},
-        {"text": "Choose the sentence with correct agreement.", "options": ["Each of them are ready.", "Each of them is ready.", "Each of them were ready.", "Each of them have been ready."], "answer": "2", "difficulty": "medium"},
-        {"text": "Pick the best paraphrase for 'nevertheless'", "options": ["therefore", "however", "because", "as a result"], "answer": "2", "difficulty": "medium"},
-        {"text": "Choose the correct tense: 'By next year I ___ my thesis.'", "options": ["will finish", "will have finished", "finished", "have finished"], "answer": "2", "difficulty": "hard"},
-        {"text": "Select the best collocation: 'strongly ___'", "options": ["advise", "advocate", "recommend", "suggest"], "answer": "3", "difficulty": "medium"},
-    ]
-
-    questions = []
-    answers = []
-    for idx, item in enumerate(qb, start=1):
-        questions.append({"id": idx, "text": item['text'], "options": item['options'], "difficulty": item['difficulty']})
-        answers.append(str(item['answer']))
-
-    if request.method == 'POST':
-        score = 0
-        total = len(questions)
-        for idx, q in enumerate(questions, start=1):
-            key = f"q{idx}"
-            val = request.POST.get(key)
-            if val and val == answers[idx-1]:
-                score += 1
-
-        # Save to profile
-        try:
-            profile = request.user.profile
-        except Exception:
-            profile = None
-        if profile:
-            profile.end_test_score = score
-            profile.end_test_taken_at = timezone.now()
-            profile.end_test_done = True
-            profile.save()
-
-        messages.success(request, f'You scored {score}/{total} on the end (B2) English test.')
-        return redirect('dashboard')
-
-    context = {"questions": questions}
-    return render(request, 'end_test.html', context)
+    return _take_test(request, 'end', 'end_test.html', 'end_test', 'end (B2) English test')
 
 
 @login_required(login_url='login')
+@read_replica
 def session_detail(request, pk):
     """Render a single session: title, markdown content, scheduled info."""
     # session detail now displays a SessionTemplate
     template = get_object_or_404(SessionTemplate, pk=pk)
 
     # render markdown from template content (learner-facing)
-    raw = template.content_markdown or ''
-    html = mark_safe(md.markdown(raw, extensions=['fenced_code', 'nl2br']))
+    # (cached by content hash, see dashboard.rendering)
+    html = render_markdown(template.content_markdown)
 
     # render mentor-only markdown if present
     mentor_raw = getattr(template, 'mentor_content_markdown', '') or ''
-    mentor_html = mark_safe(md.markdown(mentor_raw, extensions=['fenced_code', 'nl2br'])) if mentor_raw else ''
+    mentor_html = render_markdown(mentor_raw) if mentor_raw else ''
 
     # Provide optional meeting info derived from the current user's profile
     meeting = None
-    try:
-        prof = request.user.profile
-        if prof.next_meeting_at or prof.next_meeting_url or prof.next_meeting_tool:
-            class M:
-                pass
-            meeting = M()
-            meeting.scheduled_at = prof.next_meeting_at
-            meeting.meeting_url = prof.next_meeting_url or prof.default_meeting_url
-            meeting.meeting_tool = prof.next_meeting_tool or prof.default_meeting_tool
-            meeting.mentor = prof.assigned_mentor
-            meeting.get_meeting_tool_display = (dict(MEETING_TOOL_CHOICES).get(meeting.meeting_tool) if meeting.meeting_tool else '')
-    except Exception:
-        meeting = None
+    prof = request.profile
+    if prof.next_meeting_at or prof.next_meeting_url or prof.next_meeting_tool:
+        class M:
+            pass
+        meeting = M()
+        meeting.scheduled_at = prof.next_meeting_at
+        meeting.meeting_url = prof.next_meeting_url or prof.default_meeting_url
+        meeting.meeting_tool = prof.next_meeting_tool or prof.default_meeting_tool
+        meeting.mentor = prof.assigned_mentor
+        meeting.get_meeting_tool_display = (dict(MEETING_TOOL_CHOICES).get(meeting.meeting_tool) if meeting.meeting_tool else '')
 
     context = {
         'session': template,
         'content_html': html,
         'mentor_content_html': mentor_html,
-        'is_mentor': getattr(request.user, 'profile', None) and getattr(request.user.profile, 'is_mentor', False),
+        'is_mentor': bool(request.is_mentor),
         'meeting': meeting,
     }
     return render(request, 'session_detail.html', context)
 
 
-def register(request):
-    """Handle user registration"""
+async def register(request):
+    """Handle user registration
+
+    Async so the password hash runs in the bounded pool from dashboard.hashing
+    instead of holding a worker; answers 503 when that pool is saturated.
+    """
     if request.method == 'POST':
         form = CustomUserCreationForm(request.POST)
-        if form.is_valid():
+        if await sync_to_async(form.is_valid)():
+            try:
+                form.password_hash = await amake_password(form.cleaned_data['password1'])
+            except HashingBusy:
+                form.add_error(None, BUSY_MESSAGE)
+                return await _busy(request, 'register.html', {'form': form, "role": request.GET.get('role', 'learner')})
             # Create the user
-            user = form.save()
-            auth_login(request, user)
-            
+            user = await sync_to_async(form.save)()
+            await alogin(request, user, backend='dashboard.backends.EmailBackend')
+
             messages.success(request, f'Welcome {user.email}! Your account has been created.')
             return redirect('dashboard')
     else:
         form = CustomUserCreationForm()
-    
-    return render(request, 'register.html', {'form': form, "role": request.GET.get('role', 'learner')})
 
+    return await sync_to_async(render)(request, 'register.html', {'form': form, "role": request.GET.get('role', 'learner')})
 
 
-@login_required(login_url='login')
+async def _busy(request, template_name, context):
+    """503 + Retry-After while the hashing pool is saturated."""
+    response = await sync_to_async(render)(request, template_name, context, status=503)
+    response['Retry-After'] = str(getattr(settings, 'HASHING_RETRY_AFTER_SECONDS', 2))
+    return response
+
+
+@mentor_required
+@read_replica
 def mentor_dashboard(request):
     """Dashboard for mentors: list assigned students and allow assigning unassigned students."""
-    try:
-        if not request.user.profile.is_mentor:
-            return HttpResponseForbidden('Access denied')
-    except Exception:
-        return HttpResponseForbidden('Access denied')
-
-    # mentees assigned to this mentor
-    from .models import Profile
-    mentee_profiles = Profile.objects.filter(assigned_mentor=request.user)
+    # mentees assigned to this mentor, with user and completed-session count in one query
+    mentee_profiles = (
+        Profile.objects.filter(assigned_mentor=request.user)
+        .select_related('user')
+        .annotate(completed_count=Count('user__session_completions', filter=Q(user__session_completions__completed=True)))
+        .order_by('user__username')
+    )
     # session template totals
-    total_templates = SessionTemplate.objects.count()
+    total_templates = len(get_catalog())
     mentees = []
     for prof in mentee_profiles:
         # Build a lightweight next_meeting object from profile fields (if present)
@@ -241,52 +199,44 @@ def mentor_dashboard(request):
             # convenience display property
             nm.get_meeting_tool_display = (dict(MEETING_TOOL_CHOICES).get(nm.meeting_tool) if nm.meeting_tool else '')
 
-        completed_count = SessionCompletion.objects.filter(user=prof.user, completed=True).count()
         mentees.append({
             'profile': prof,
             'next_meeting': nm,
-            'completed_count': completed_count,
+            'completed_count': prof.completed_count,
             'total_templates': total_templates,
         })
 
-    # candidates: users who are not mentors and have no assigned_mentor
-    candidates = Profile.objects.filter(assigned_mentor__isnull=True, is_mentor=False).exclude(user=request.user)
+    # candidates: users who are not mentors and have no assigned_mentor (paginated)
+    candidates_qs = (
+        Profile.objects.filter(assigned_mentor__isnull=True, is_mentor=False)
+        .exclude(user=request.user)
+        .select_related('user')
+        .order_by('created_at', 'id')
+    )
+    candidates = Paginator(candidates_qs, CANDIDATES_PER_PAGE).get_page(request.GET.get('page'))
 
     context = {
         'mentees': mentees,
         'candidates': candidates,
-        'unread_messages_count': Message.objects.filter(recipient=request.user, read=False).count()
     }
     return render(request, 'mentor_dashboard.html', context)
 
 
-@login_required(login_url='login')
+@mentor_required
 @require_http_methods(["POST"])
 def mentor_assign_student(request, user_id):
     """Assign a student (Profile) to the current mentor."""
-    try:
-        if not request.user.profile.is_mentor:
-            return HttpResponseForbidden('Access denied')
-    except Exception:
-        return HttpResponseForbidden('Access denied')
-
     profile = get_object_or_404(Profile, user__id=user_id)
     profile.assigned_mentor = request.user
-    profile.save()
+    profile.save(update_fields=['assigned_mentor', 'updated_at'])
     messages.success(request, f"Assigned {profile.user.get_full_name() or profile.user.username} to you.")
     return redirect('mentor_dashboard')
 
 
 
-@login_required(login_url='login')
+@mentor_required
 def mentor_set_meeting(request, user_id):
     """Allow a mentor to set the next meeting for a mentee (date + link + tool)."""
-    try:
-        if not request.user.profile.is_mentor:
-            return HttpResponseForbidden('Access denied')
-    except Exception:
-        return HttpResponseForbidden('Access denied')
-
     profile = get_object_or_404(Profile, user__id=user_id)
     if profile.assigned_mentor_id != request.user.id:
         return HttpResponseForbidden('Not your mentee')
@@ -318,7 +268,7 @@ def mentor_set_meeting(request, user_id):
         profile.next_meeting_at = scheduled_at
         profile.next_meeting_url = meeting_url
         profile.next_meeting_tool = meeting_tool
-        profile.save()
+        profile.save(update_fields=['next_meeting_at', 'next_meeting_url', 'next_meeting_tool', 'updated_at'])
 
         messages.success(request, 'Next meeting updated.')
         return redirect('mentor_dashboard')
@@ -331,41 +281,22 @@ def mentor_set_meeting(request, user_id):
     return render(request, 'mentor_set_meeting.html', context)
 
 
-@login_required(login_url='login')
+@mentor_required
 def mentor_manage_sessions(request, user_id):
-    try:
-        if not request.user.profile.is_mentor:
-            return HttpResponseForbidden('Access denied')
-    except Exception:
-        return HttpResponseForbidden('Access denied')
-
     profile = get_object_or_404(Profile, user__id=user_id)
     if profile.assigned_mentor_id != request.user.id:
         return HttpResponseForbidden('Not your mentee')
 
-    templates = list(SessionTemplate.objects.all().order_by('order'))
+    templates = get_catalog().entries
     completions_qs = SessionCompletion.objects.filter(user=profile.user)
     completions = {c.template_id: c for c in completions_qs}
     completed_ids = {c.template_id for c in completions_qs if c.completed}
 
     if request.method == 'POST':
         completed_ids = set(int(i) for i in request.POST.getlist('completed'))
-        for t in templates:
-            comp = completions.get(t.id)
-            if t.id in completed_ids:
-                if not comp:
-                    SessionCompletion.objects.create(user=profile.user, template=t, completed=True, completed_at=timezone.now())
-                else:
-                    comp.completed = True
-                    comp.completed_at = comp.completed_at or timezone.now()
-                    comp.save()
-            else:
-                if comp and comp.completed:
-                    comp.completed = False
-                    comp.completed_at = None
-                    comp.save()
-
-        messages.success(request, f"Updated sessions for {profile.user.get_full_name() or profile.user.username}.")
+        changed = SessionCompletion.apply_completed_set(profile.user, get_catalog().ids, completions, completed_ids)
+
+        messages.success(request, f"Updated sessions for {profile.user.get_full_name() or profile.user.username} ({changed} changed).")
         return redirect('mentor_manage_sessions', user_id=user_id)
 
     context = {
@@ -381,13 +312,7 @@ def mentor_manage_sessions(request, user_id):
 @require_http_methods(["POST"])
 def send_message(request):
     """Allow a learner to send a message to their assigned mentor."""
-    try:
-        profile = request.user.profile
-    except Exception:
-        messages.error(request, "Profile not found.")
-        return redirect('dashboard')
-
-    mentor = profile.assigned_mentor
+    mentor = request.profile.assigned_mentor
     if not mentor:
         messages.error(request, "You don't have an assigned mentor to message.")
         return redirect('dashboard')
@@ -402,53 +327,58 @@ def send_message(request):
     return redirect('dashboard')
 
 
-@login_required(login_url='login')
+@mentor_required
+@read_replica
 def mentor_messages(request):
     """List conversations (mentees) for the current mentor."""
-    try:
-        if not request.user.profile.is_mentor:
-            return HttpResponseForbidden('Access denied')
-    except Exception:
-        return HttpResponseForbidden('Access denied')
-
-    # mentees assigned to this mentor
-    mentee_profiles = Profile.objects.filter(assigned_mentor=request.user)
+    # Conversations with current mentees, most recent first, from the
+    # denormalized Conversation summaries (one query, no per-mentee lookups).
+    me = request.user
+    summaries = (
+        Conversation.for_user(me)
+        .filter(Q(user_a=me, user_b__profile__assigned_mentor=me) | Q(user_b=me, user_a__profile__assigned_mentor=me))
+        .select_related('user_a', 'user_b', 'last_message')
+    )
     conversations = []
-    for prof in mentee_profiles:
-        last_msg = Message.objects.filter(Q(sender=prof.user, recipient=request.user) | Q(sender=request.user, recipient=prof.user)).order_by('-created_at').first()
-        unread = Message.objects.filter(sender=prof.user, recipient=request.user, read=False).count()
+    for conv in summaries:
+        other = conv.user_b if conv.user_a_id == me.id else conv.user_a
         conversations.append({
-            'profile': prof,
-            'last_message': last_msg,
-            'unread': unread,
+            'user': other,
+            'last_message': conv.last_message,
+            'unread': conv.unread_for(me.id),
+        })
+
+    # Mentees we have not exchanged messages with yet are listed last
+    seen = [c['user'].id for c in conversations]
+    for prof in Profile.objects.filter(assigned_mentor=me).exclude(user_id__in=seen).select_related('user'):
+        conversations.append({
+            'user': prof.user,
+            'last_message': None,
+            'unread': 0,
         })
 
-    context = {'conversations': conversations,
-    'unread_messages_count': Message.objects.filter(recipient=request.user, read=False).count()
-               }
+    context = {'conversations': conversations}
     return render(request, 'mentor_messages.html', context)
 
 
-@login_required(login_url='login')
+@mentor_required
+@read_replica
 def mentor_message_thread(request, user_id):
     """View message thread between mentor and a specific mentee and allow replies."""
-    try:
-        if not request.user.profile.is_mentor:
-            return HttpResponseForbidden('Access denied')
-    except Exception:
-        return HttpResponseForbidden('Access denied')
-
     prof = get_object_or_404(Profile, user__id=user_id)
     if prof.assigned_mentor_id != request.user.id:
         return HttpResponseForbidden('Not your mentee')
 
-    # fetch messages in chronological order
-    thread_qs = Message.objects.filter(Q(sender=request.user, recipient=prof.user) | Q(sender=prof.user, recipient=request.user)).order_by('created_at')
+    # fetch the newest page of messages (or an older page via ?before=<cursor>)
+    try:
+        thread, older_cursor = page_before(Message.between(request.user, prof.user), request.GET.get('before'), THREAD_PAGE_SIZE)
+    except InvalidCursor:
+        return HttpResponseBadRequest('Invalid cursor')
 
-    # Mark incoming messages as read
-    incoming_unread = thread_qs.filter(recipient=request.user, read=False)
-    if incoming_unread.exists():
-        incoming_unread.update(read=True, read_at=timezone.now())
+    # Mark the incoming messages shown as read. The thread may come from a
+    # lagging replica, so newer ones on the primary stay unread.
+    if thread:
+        Conversation.mark_read(request.user, prof.user, up_to=max(m.id for m in thread))
 
     if request.method == 'POST':
         body = request.POST.get('body', '').strip()
@@ -461,14 +391,31 @@ def mentor_message_thread(request, user_id):
 
     context = {
         'other_user': prof.user,
-        'thread': thread_qs,
-    
-    'unread_messages_count': Message.objects.filter(recipient=request.user, read=False).count()
+        'thread': thread,
+        'older_cursor': older_cursor,
+        'latest_cursor': encode_cursor(thread[-1]) if thread else '',
     }
     return render(request, 'mentor_message_thread.html', context)
 
 
+def _check_connected(user, other):
+    """Return a 403 response unless ``user`` and ``other`` are a mentor/mentee pair."""
+    req_profile = get_profile(user)
+    other_profile = get_profile(other)
+
+    allowed = False
+    if req_profile.assigned_mentor_id == other.id:
+        allowed = True
+    if other_profile.assigned_mentor_id == user.id:
+        allowed = True
+
+    if not allowed:
+        return HttpResponseForbidden('Not connected')
+    return None
+
+
 @login_required(login_url='login')
+@read_replica
 def message_thread(request, user_id):
     """Generic message thread view for mentor/mentee pairs.
 
@@ -477,27 +424,18 @@ def message_thread(request, user_id):
     other = get_object_or_404(User, id=user_id)
 
     # Check relationship: either request.user has assigned_mentor == other, or other has assigned_mentor == request.user
-    try:
-        req_profile = request.user.profile
-        other_profile = other.profile
-    except Exception:
-        return HttpResponseForbidden('Access denied')
-
-    allowed = False
-    if req_profile.assigned_mentor_id == other.id:
-        allowed = True
-    if other_profile.assigned_mentor_id == request.user.id:
-        allowed = True
-
-    if not allowed:
-        return HttpResponseForbidden('Not connected')
+    denied = _check_connected(request.user, other)
+    if denied:
+        return denied
 
-    thread_qs = Message.objects.filter(Q(sender=request.user, recipient=other) | Q(sender=other, recipient=request.user)).order_by('created_at')
+    try:
+        thread, older_cursor = page_before(Message.between(request.user, other), request.GET.get('before'), THREAD_PAGE_SIZE)
+    except InvalidCursor:
+        return HttpResponseBadRequest('Invalid cursor')
 
-    # mark incoming unread messages as read
-    incoming_unread = thread_qs.filter(recipient=request.user, read=False)
-    if incoming_unread.exists():
-        incoming_unread.update(read=True, read_at=timezone.now())
+    # mark the incoming messages shown as read (not newer ones a lagging replica hid)
+    if thread:
+        Conversation.mark_read(request.user, other, up_to=max(m.id for m in thread))
 
     if request.method == 'POST':
         body = request.POST.get('body', '').strip()
@@ -510,61 +448,141 @@ def message_thread(request, user_id):
 
     context = {
         'other_user': other,
-        'thread': thread_qs,
-        'unread_messages_count': Message.objects.filter(recipient=request.user, read=False).count()
+        'thread': thread,
+        'older_cursor': older_cursor,
+        'latest_cursor': encode_cursor(thread[-1]) if thread else '',
     }
     return render(request, 'mentor_message_thread.html', context)
 
 
 @login_required(login_url='login')
-@require_http_methods(["POST"])
-def mentor_unassign_student(request, user_id):
+@require_http_methods(["GET"])
+@read_replica
+def message_thread_since(request, user_id):
+    """Return messages in a thread newer than ``?after=<cursor>`` as JSON.
+
+    Lets an open thread page poll for new messages without reloading the
+    whole conversation. Without a cursor the newest page is returned.
+    """
+    other = get_object_or_404(User, id=user_id)
+    denied = _check_connected(request.user, other)
+    if denied:
+        return denied
+
+    thread_qs = Message.between(request.user, other)
+    after = request.GET.get('after')
     try:
-        if not request.user.profile.is_mentor:
-            return HttpResponseForbidden('Access denied')
-    except Exception:
-        return HttpResponseForbidden('Access denied')
+        if after:
+            rows = page_after(thread_qs, after, THREAD_PAGE_SIZE)
+        else:
+            rows, _ = page_before(thread_qs, None, THREAD_PAGE_SIZE)
+    except InvalidCursor:
+        return HttpResponseBadRequest('Invalid cursor')
+
+    if any(m.recipient_id == request.user.id and not m.read for m in rows):
+        Conversation.mark_read(request.user, other, up_to=max(m.id for m in rows))
+
+    return JsonResponse({
+        'messages': [
+            {
+                'id': m.id,
+                'body': m.body,
+                'created_at': m.created_at.isoformat(),
+                'mine': m.sender_id == request.user.id,
+            }
+            for m in rows
+        ],
+        'cursor': encode_cursor(rows[-1]) if rows else after,
+    })
 
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@login_required(login_url='login')
+@require_http_methods(["GET"])
+async def message_events(request):
+    """Server-Sent Events stream of message and unread-badge updates.
+
+    Async so that idle connections only cost a coroutine under the ASGI
+    server, not a worker. Each connection subscribes to the user's pub/sub
+    channel (see dashboard.pubsub); connections are closed after
+    ``SSE_MAX_SECONDS`` and the browser reconnects on its own.
+    """
+    user = await request.auser()
+    broker = get_broker()
+    heartbeat = getattr(settings, 'SSE_HEARTBEAT_SECONDS', 20)
+    max_seconds = getattr(settings, 'SSE_MAX_SECONDS', 300)
+
+    async def unread_count():
+        count = await Profile.objects.filter(user_id=user.id).values_list('unread_messages_count', flat=True).afirst()
+        return count or 0
+
+    async def stream():
+        sub = broker.subscribe(user_channel(user.id))
+        try:
+            yield "retry: 5000\n\n"
+            yield _sse('unread', {'count': await unread_count()})
+            deadline = time.monotonic() + max_seconds
+            while time.monotonic() < deadline:
+                event = await sub.get(timeout=heartbeat)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event.get('type') == 'message':
+                    yield _sse('message', event)
+                yield _sse('unread', {'count': await unread_count()})
+        finally:
+            sub.close()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@mentor_required
+@require_http_methods(["POST"])
+def mentor_unassign_student(request, user_id):
     profile = get_object_or_404(Profile, user__id=user_id)
     if profile.assigned_mentor_id == request.user.id:
         profile.assigned_mentor = None
-        profile.save()
+        profile.save(update_fields=['assigned_mentor', 'updated_at'])
         messages.success(request, f"Unassigned {profile.user.get_full_name() or profile.user.username}.")
     return redirect('mentor_dashboard')
 
-def login_view(request):
-    """Handle user login via email"""
+async def login_view(request):
+    """Handle user login via email
+
+    Async for the same reason as ``register``: EmailBackend.aauthenticate
+    checks the password in the hashing pool.
+    """
     if request.method == "POST":
         email = request.POST.get("email", "").strip().lower()
         password = request.POST.get("password", "")
 
-        # Try to resolve email → username
-        user_obj = User.objects.filter(email__iexact=email).first()
-
-        if user_obj:
-            user = authenticate(
-                request,
-                username=user_obj.username,
-                password=password,
-            )
-        else:
-            user = None
+        # EmailBackend resolves the user and profile in one indexed query
+        try:
+            user = await aauthenticate(request, email=email, password=password)
+        except HashingBusy:
+            return await _busy(request, "login.html", {"form_error": BUSY_MESSAGE, "email": email})
 
         if user:
-            auth_login(request, user)
+            await alogin(request, user)
             messages.success(
                 request,
                 f"Welcome back, {user.first_name or user.email}!"
             )
 
-            # Mentor redirect (safe, explicit)
+            # Mentor redirect (safe, explicit); the profile came with the user
             if hasattr(user, "profile") and user.profile.is_mentor:
                 return redirect("mentor_dashboard")
 
             return redirect("dashboard")
 
         # Authentication failed
-        return render(
+        return await sync_to_async(render)(
             request,
             "login.html",
             {
@@ -573,69 +591,68 @@ def login_view(request):
             },
         )
 
-    return render(request, "login.html")
+    return await sync_to_async(render)(request, "login.html")
 
 
 @login_required(login_url='login')
+@read_replica
 def dashboard(request):
     """User dashboard view"""
     # If the current user is a mentor, redirect to the mentor dashboard.
-    try:
-        if hasattr(request.user, 'profile') and request.user.profile.is_mentor:
-            return redirect('mentor_dashboard')
-    except Exception:
-        # If profile lookup fails, continue to render normal dashboard
-        pass
+    if request.is_mentor:
+        return redirect('mentor_dashboard')
     # Find the user's next scheduled Session (if any)
     # Build next_meeting from the user's profile
     next_meeting = None
-    try:
-        prof = request.user.profile
-        if prof.next_meeting_at or prof.next_meeting_url or prof.next_meeting_tool:
-            class NM:
-                pass
-            next_meeting = NM()
-            next_meeting.scheduled_at = prof.next_meeting_at
-            next_meeting.meeting_url = prof.next_meeting_url or prof.default_meeting_url
-            next_meeting.meeting_tool = prof.next_meeting_tool or prof.default_meeting_tool
-            next_meeting.mentor = prof.assigned_mentor
-            next_meeting.get_meeting_tool_display = (dict(MEETING_TOOL_CHOICES).get(next_meeting.meeting_tool) if next_meeting.meeting_tool else '')
-    except Exception:
-        next_meeting = None
-
-    # Pull session templates and per-user completion status
-    templates = list(SessionTemplate.objects.all().order_by('order'))
-    completions_qs = SessionCompletion.objects.filter(user=request.user)
-    completions = {c.template_id: c for c in completions_qs}
+    prof = request.profile
+    if prof.next_meeting_at or prof.next_meeting_url or prof.next_meeting_tool:
+        class NM:
+            pass
+        next_meeting = NM()
+        next_meeting.scheduled_at = prof.next_meeting_at
+        next_meeting.meeting_url = prof.next_meeting_url or prof.default_meeting_url
+        next_meeting.meeting_tool = prof.next_meeting_tool or prof.default_meeting_tool
+        next_meeting.mentor = prof.assigned_mentor
+        next_meeting.get_meeting_tool_display = (dict(MEETING_TOOL_CHOICES).get(next_meeting.meeting_tool) if next_meeting.meeting_tool else '')
+
+    # Session templates come from the process-local catalog; completion state from the profile's progress bitset
+    templates = get_catalog().entries
+    bits = prof.progress_bits
+    completed_templates = prof.completed_sessions_count
+
+    # Filtering: allow toggling between todo/completed/all via ?filter=
+    f = request.GET.get('filter', 'todo')
+    if f == 'todo':
+        # nothing to show about completions here, so skip loading them
+        completions = {}
+        templates_shown = [t for t in templates if not has_slot(bits, t.progress_slot)]
+    else:
+        completions = {c.template_id: c for c in SessionCompletion.objects.filter(user=request.user, completed=True)}
+        if f == 'completed':
+            templates_shown = [t for t in templates if has_slot(bits, t.progress_slot)]
+        else:
+            templates_shown = templates
 
     # Build combined list for template with user's completion (if any)
     session_items = []
-    for t in templates:
+    for t in templates_shown:
         session_items.append({
             'template': t,
             'completion': completions.get(t.id)
         })
-    # Filtering: allow toggling between todo/completed/all via ?filter=
-    f = request.GET.get('filter', 'todo')
-    if f == 'todo':
-        session_items = [si for si in session_items if not (si['completion'] and si['completion'].completed)]
-    elif f == 'completed':
-        session_items = [si for si in session_items if si['completion'] and si['completion'].completed]
 
-    total_templates = SessionTemplate.objects.count()
-    completed_templates = SessionCompletion.objects.filter(user=request.user, completed=True).count()
+    total_templates = len(templates)
     allow_end_test = (total_templates > 0 and completed_templates >= total_templates)
 
     context = {
         'user': request.user,
         'session_items': session_items,
-        'sessions_completed': sum(1 for c in completions.values() if c.completed),
+        'sessions_completed': completed_templates,
         'total_time': '45 min',
         'connections': 2,
         'next_meeting': next_meeting,
         'filter': f,
         'allow_end_test': allow_end_test,
-        'unread_messages_count': Message.objects.filter(recipient=request.user, read=False).count(),
     }
     return render(request, 'dashboard.html', context)
 
@@ -645,10 +662,7 @@ def dashboard(request):
 def reset_progress(request):
     """Reset the current user's progress: clear test results and session completions."""
     user = request.user
-    try:
-        profile = user.profile
-    except Exception:
-        profile = None
+    profile = request.profile
 
     # Clear profile test flags and scores
     if profile:
@@ -658,7 +672,6 @@ def reset_progress(request):
         profile.end_test_done = False
         profile.end_test_score = None
         profile.end_test_taken_at = None
-        profile.save()
 
     # Reset session completions and clear any scheduled meeting info on the profile
     SessionCompletion.objects.filter(user=user).update(completed=False, completed_at=None)
@@ -667,7 +680,14 @@ def reset_progress(request):
         profile.next_meeting_url = None
         profile.next_meeting_tool = None
         profile.next_meeting_notes = ''
-        profile.save()
+        profile.progress_bits = b''
+        profile.completed_sessions_count = 0
+        profile.save(update_fields=[
+            'intro_test_done', 'intro_test_score', 'intro_test_taken_at',
+            'end_test_done', 'end_test_score', 'end_test_taken_at',
+            'next_meeting_at', 'next_meeting_url', 'next_meeting_tool', 'next_meeting_notes',
+            'progress_bits', 'completed_sessions_count', 'updated_at',
+        ])
 
     messages.success(request, "Your progress has been reset.")
     return redirect('dashboard')
@@ -699,4 +719,27 @@ def complete_session_template(request, pk):
 
 
 
+@staff_member_required
+def query_report(request):
+    """Staff-only rolling summary of per-view query counts and DB time (this worker)."""
+    if request.method == 'POST' and request.POST.get('action') == 'reset':
+        query_stats.reset()
+        hashing_stats.reset()
+        reset_stats()
+        return redirect('query_report')
+    context = {
+        'title': 'Query budget report',
+        'rows': query_stats.summary(),
+        'hashing': hashing_stats.summary(),
+        'markdown': render_stats(),
+        'workers': read_worker_stats(settings.WORKER_STATS_PATH),
+        'db_pools': pool_stats(),
+        'startup': startup.timings,
+        'warmup': settings.STARTUP_WARMUP,
+        'window': query_stats.window,
+        'pid': os.getpid(),
+    }
+    return render(request, 'admin/query_report.html', context)
+
+
 # Note: `login_view` handles rendering and POST; no separate `login` function needed.
\ No newline at end of file
@@ -0,0 +1,172 @@
+"""Memory accounting and recycling for gunicorn workers (see gunicorn.conf.py).
+
+The gunicorn master runs a ``WorkerMonitor`` thread that samples each worker's
+memory from ``/proc`` every few seconds:
+
+* ``rss``: resident memory, including pages still shared copy-on-write with
+  the preloaded master;
+* ``pss``: proportional share, so the workers' PSS adds up to what they
+  really cost the VM;
+* ``uss``: private memory, what the worker has grown on its own.
+
+A worker whose USS passes the per-worker budget gets SIGTERM, which gunicorn
+treats as a graceful stop: in-flight requests finish (``graceful_timeout``)
+and a fresh worker is forked. So does the largest worker when the total PSS
+passes the machine budget. One worker is recycled at a time, and only after
+it has run for ``min_lifetime`` seconds, so a budget set too low can't turn
+into a restart loop. Recycling by request count is gunicorn's own
+``max_requests``.
+
+Each sample is written as JSON to ``stats_path``; ``read_worker_stats`` reads
+it back for the staff query report. This module must not import Django: the
+master loads it before (or without) the app.
+"""
+import json
+import os
+import signal
+import threading
+import time
+
+MB = 1024 * 1024
+
+
+def memory_info(pid):
+    """Return ``{"rss", "pss", "uss"}`` in bytes for ``pid``, or None if it is gone.
+
+    ``pss``/``uss`` come from ``smaps_rollup`` and are None where it is unavailable.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as fh:
+            fields = {}
+            for line in fh:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1]) * 1024
+        return {
+            "rss": fields.get("Rss", 0),
+            "pss": fields.get("Pss", 0),
+            "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        }
+    except FileNotFoundError:
+        if not os.path.exists(f"/proc/{pid}"):
+            return None
+    except PermissionError:
+        pass
+    try:
+        with open(f"/proc/{pid}/statm") as fh:
+            resident = int(fh.read().split()[1])
+    except (FileNotFoundError, ProcessLookupError):
+        return None
+    return {"rss": resident * os.sysconf("SC_PAGE_SIZE"), "pss": None, "uss": None}
+
+
+class WorkerMonitor:
+    """Sample gunicorn workers' memory and gracefully recycle those over budget.
+
+    ``server`` is gunicorn's Arbiter (``WORKERS`` maps pid to worker, ``log``
+    is its logger); ``measure`` defaults to ``memory_info``.
+    """
+
+    def __init__(self, server, worker_max_bytes, total_max_bytes, stats_path=None, interval=10,
+                 min_lifetime=60, measure=memory_info):
+        self.server = server
+        self.worker_max_bytes = worker_max_bytes
+        self.total_max_bytes = total_max_bytes
+        self.stats_path = stats_path
+        self.interval = interval
+        self.min_lifetime = min_lifetime
+        self.measure = measure
+        self.recycled = []
+        self._first_seen = {}
+        self._recycling = None
+        self._stop = threading.Event()
+
+    def start(self):
+        thread = threading.Thread(target=self._run, name="worker-monitor", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                self.server.log.exception("Worker memory check failed")
+
+    def sample(self):
+        now = time.time()
+        current = dict(self.server.WORKERS)
+        self._first_seen = {pid: self._first_seen.get(pid, now) for pid in current}
+        workers = []
+        for pid in current:
+            info = self.measure(pid)
+            if info is not None:
+                workers.append({"pid": pid, "uptime": now - self._first_seen[pid], **info})
+        return {
+            "timestamp": now,
+            "master": self.measure(os.getpid()),
+            "workers": workers,
+            "total_pss": sum(w["pss"] if w["pss"] is not None else w["rss"] for w in workers),
+            "worker_max_bytes": self.worker_max_bytes,
+            "total_max_bytes": self.total_max_bytes,
+            "recycled": self.recycled[-20:],
+        }
+
+    def check(self):
+        """Take a sample, recycle at most one worker, export; return the sample."""
+        stats = self.sample()
+        victim, reason = self._pick(stats)
+        if victim is not None:
+            self._recycle(victim, reason)
+            stats["recycled"] = self.recycled[-20:]
+        if self.stats_path:
+            self._export(stats)
+        return stats
+
+    def _pick(self, stats):
+        if self._recycling in self.server.WORKERS:
+            # still draining the last one
+            return None, None
+        self._recycling = None
+        workers = stats["workers"]
+        candidates = [w for w in workers if w["uptime"] >= self.min_lifetime]
+        if not candidates:
+            return None, None
+        for w in sorted(candidates, key=_own_bytes, reverse=True):
+            if _own_bytes(w) > self.worker_max_bytes:
+                return w, f"private memory {_own_bytes(w) / MB:.0f}MB > {self.worker_max_bytes / MB:.0f}MB"
+        if stats["total_pss"] > self.total_max_bytes and len(workers) > 1:
+            w = max(candidates, key=_own_bytes)
+            return w, f"workers total {stats['total_pss'] / MB:.0f}MB > {self.total_max_bytes / MB:.0f}MB"
+        return None, None
+
+    def _recycle(self, worker, reason):
+        self.server.log.warning("Recycling worker %s: %s", worker["pid"], reason)
+        try:
+            os.kill(worker["pid"], signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        self._recycling = worker["pid"]
+        self.recycled.append({"pid": worker["pid"], "at": time.time(), "reason": reason})
+
+    def _export(self, stats):
+        tmp = f"{self.stats_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as fh:
+            json.dump(stats, fh)
+        os.replace(tmp, self.stats_path)
+
+
+def _own_bytes(worker):
+    return worker["uss"] if worker["uss"] is not None else worker["rss"]
+
+
+def read_worker_stats(path):
+    """The last sample exported by the master's ``WorkerMonitor``, or None."""
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return None
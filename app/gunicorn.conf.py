@@ -0,0 +1,63 @@
+"""gunicorn settings for the Fly VM (512MB, 1 shared CPU).
+
+gunicorn reads this file from the working directory (/code/app). The app is
+preloaded in the master and its heap frozen before forking, so workers share
+Django, the templates and the URLconf copy-on-write. The master's
+``dashboard.workers.WorkerMonitor`` watches each worker's memory and
+gracefully recycles any that go over budget. ``max_requests`` recycles them
+by request count. Compare modes with ``manage.py benchmark_workers``.
+
+Environment overrides:
+``GUNICORN_WORKERS``, ``GUNICORN_WORKER_CLASS`` (``uvicorn_worker.UvicornWorker``,
+``sync`` or ``gthread``), ``GUNICORN_THREADS``, ``GUNICORN_PRELOAD`` (1/0),
+``GUNICORN_MAX_REQUESTS``, ``GUNICORN_WORKER_MAX_MB``, ``GUNICORN_TOTAL_MAX_MB``,
+``GUNICORN_MEMORY_CHECK_SECONDS``, ``GUNICORN_WORKER_MIN_LIFETIME``,
+``GUNICORN_STATS_PATH``.
+"""
+import gc
+import os
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = _env_int("GUNICORN_WORKERS", 3)
+# ASGI via uvicorn workers so the SSE endpoint (dashboard/messages/events/) holds
+# idle connections as coroutines instead of tying up a sync worker each.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "uvicorn_worker.UvicornWorker")
+# gunicorn silently turns "sync" into gthread when threads > 1
+threads = _env_int("GUNICORN_THREADS", 4) if worker_class == "gthread" else 1
+wsgi_app = "app.asgi:application" if "uvicorn" in worker_class.lower() else "app.wsgi:application"
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+timeout = 60
+graceful_timeout = 30
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 2000)
+# so workers started together don't all restart together
+max_requests_jitter = max_requests // 10
+loglevel = "info"
+
+# memory budgets checked by WorkerMonitor; 3 workers + master must fit in 512MB
+worker_max_mb = _env_int("GUNICORN_WORKER_MAX_MB", 140)
+total_max_mb = _env_int("GUNICORN_TOTAL_MAX_MB", 400)
+memory_check_seconds = _env_int("GUNICORN_MEMORY_CHECK_SECONDS", 10)
+worker_min_lifetime = _env_int("GUNICORN_WORKER_MIN_LIFETIME", 60)
+stats_path = os.getenv("GUNICORN_STATS_PATH", "/tmp/connectus-workers.json")
+
+
+def when_ready(server):
+    from dashboard.workers import MB, WorkerMonitor
+
+    if preload_app:
+        # keep the gc from touching (and so un-sharing) the preloaded objects in workers
+        gc.freeze()
+    WorkerMonitor(
+        server,
+        worker_max_bytes=worker_max_mb * MB,
+        total_max_bytes=total_max_mb * MB,
+        stats_path=stats_path,
+        interval=memory_check_seconds,
+        min_lifetime=worker_min_lifetime,
+    ).start()
@@ -0,0 +1,13 @@
+// Compiled by `python manage.py build_css`; only classes found in `content` end up in the stylesheet.
+module.exports = {
+  content: ["./*/templates/**/*.html"],
+  theme: {
+    extend: {
+      colors: {
+        primary: "#667eea",
+        secondary: "#764ba2",
+        accent: "#fda085",
+      },
+    },
+  },
+};